@@ -0,0 +1,163 @@
+"""
+Генерация синтетического набора данных для нагрузочных тестов.
+
+Объекты строятся фабриками без сохранения и записываются пачками
+через ``bulk_create``, поэтому сигналы ``post_save`` не вызываются,
+а память зависит от размера пачки, а не от числа консультаций.
+"""
+
+import random
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+
+import factory.random
+from django.db import transaction
+from django.utils import timezone
+
+from clinics.models import Clinic
+from consultations.models import Consultation
+from consultations.search import build_search_name
+from users.models import CustomUser, Doctor, Patient
+
+from .factories import (
+    ClinicFactory,
+    ConsultationFactory,
+    DoctorFactory,
+    DoctorUserFactory,
+    PatientFactory,
+    PatientUserFactory,
+    UserFactory,
+)
+
+ADMIN_USERNAME = 'benchmark-admin'
+CONSULTATION_DURATION = timedelta(minutes=30)
+CONSULTATION_INTERVAL = timedelta(hours=1)
+
+
+@dataclass
+class DatasetSize:
+    """Размер набора данных."""
+
+    consultations: int
+    doctors: int
+    patients: int
+    clinics: int
+
+    @classmethod
+    def for_consultations(cls, consultations, **sizes):
+        """
+        Размер по числу консультаций: около тысячи консультаций
+        на врача, двадцати на пациента и десяти врачей на клинику.
+        """
+
+        doctors = sizes.get('doctors') or max(10, consultations // 1000)
+        return cls(
+            consultations=consultations,
+            doctors=doctors,
+            patients=sizes.get('patients') or max(10, consultations // 20),
+            clinics=sizes.get('clinics') or max(3, doctors // 10),
+        )
+
+    def as_dict(self):
+        return asdict(self)
+
+
+def existing_size():
+    """Размер уже сохранённого набора данных."""
+
+    return DatasetSize(
+        consultations=Consultation.objects.count(),
+        doctors=Doctor.objects.count(),
+        patients=Patient.objects.count(),
+        clinics=Clinic.objects.count(),
+    )
+
+
+def build_dataset(size, batch_size=5000, seed=0):
+    """Создаёт набор данных указанного размера."""
+
+    factory.random.reseed_random(seed)
+    rng = random.Random(seed)
+
+    with transaction.atomic():
+        admin = UserFactory.build(
+            username=ADMIN_USERNAME,
+            role=CustomUser.UserRole.ADMIN.value,
+            is_staff=True,
+        )
+        admin.save()
+
+        clinics = Clinic.objects.bulk_create(
+            ClinicFactory.build_batch(size.clinics), batch_size=batch_size
+        )
+        doctors = create_profiles(
+            DoctorFactory, DoctorUserFactory, size.doctors, batch_size
+        )
+        patients = create_profiles(
+            PatientFactory, PatientUserFactory, size.patients, batch_size
+        )
+
+        through = Doctor.clinics.through
+        through.objects.bulk_create(
+            (
+                through(doctor_id=doctor.pk, clinic_id=clinic.pk)
+                for doctor in doctors
+                for clinic in rng.sample(clinics, min(len(clinics), 2))
+            ),
+            batch_size=batch_size,
+        )
+
+    create_consultations(
+        size.consultations, doctors, patients, batch_size, rng
+    )
+
+
+def create_profiles(profile_factory, user_factory, count, batch_size):
+    """Создаёт пользователей и их профили врачей или пациентов."""
+
+    users = CustomUser.objects.bulk_create(
+        user_factory.build_batch(count), batch_size=batch_size
+    )
+    return profile_factory._meta.model.objects.bulk_create(
+        (profile_factory.build(user=user) for user in users),
+        batch_size=batch_size,
+    )
+
+
+def create_consultations(count, doctors, patients, batch_size, rng):
+    """
+    Создаёт консультации, распределённые по врачам. Консультации
+    одного врача идут подряд с шагом в час, половина — в прошлом.
+    """
+
+    # ФИО для поиска заполняются так же, как в ``Consultation.save``.
+    doctor_names = {
+        doctor.pk: build_search_name(doctor.user) for doctor in doctors
+    }
+    patient_names = {
+        patient.pk: build_search_name(patient.user) for patient in patients
+    }
+    per_doctor = -(-count // len(doctors))
+    start = timezone.now().replace(minute=0, second=0, microsecond=0)
+    start -= CONSULTATION_INTERVAL * (per_doctor // 2)
+
+    batch = []
+    for index in range(count):
+        doctor = doctors[index % len(doctors)]
+        patient = rng.choice(patients)
+        start_time = start + CONSULTATION_INTERVAL * (index // len(doctors))
+        batch.append(
+            ConsultationFactory.build(
+                doctor=doctor,
+                patient=patient,
+                start_time=start_time,
+                end_time=start_time + CONSULTATION_DURATION,
+                doctor_search_name=doctor_names[doctor.pk],
+                patient_search_name=patient_names[patient.pk],
+            )
+        )
+        if len(batch) >= batch_size:
+            Consultation.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Consultation.objects.bulk_create(batch)
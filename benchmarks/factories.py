@@ -0,0 +1,101 @@
+"""
+Фабрики моделей для синтетических данных.
+
+Фабрики создают объекты без сохранения (``build``): наборы данных
+для нагрузочных тестов записываются пачками через ``bulk_create``.
+"""
+
+from datetime import timedelta
+from functools import cache
+
+import factory
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from clinics.models import Clinic
+from consultations.models import Consultation
+from users.models import CustomUser, Doctor, Patient
+
+LOCALE = 'ru_RU'
+PASSWORD = 'password'
+
+SPECIALIZATIONS = (
+    'Терапевт',
+    'Кардиолог',
+    'Невролог',
+    'Хирург',
+    'Офтальмолог',
+    'Эндокринолог',
+    'Дерматолог',
+    'Педиатр',
+)
+
+
+@cache
+def hashed_password():
+    """Хэш пароля вычисляется один раз: хэширование намеренно медленное."""
+
+    return make_password(PASSWORD)
+
+
+class UserFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = CustomUser
+
+    username = factory.Sequence(lambda n: f'user{n}')
+    first_name = factory.Faker('first_name', locale=LOCALE)
+    last_name = factory.Faker('last_name', locale=LOCALE)
+    patronymic = factory.Faker('middle_name', locale=LOCALE)
+    email = factory.LazyAttribute(lambda user: f'{user.username}@example.com')
+    password = factory.LazyFunction(hashed_password)
+
+
+class DoctorUserFactory(UserFactory):
+    username = factory.Sequence(lambda n: f'doctor{n}')
+    role = CustomUser.UserRole.DOCTOR.value
+
+
+class PatientUserFactory(UserFactory):
+    username = factory.Sequence(lambda n: f'patient{n}')
+    role = CustomUser.UserRole.PATIENT.value
+
+
+class ClinicFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Clinic
+
+    name = factory.Sequence(lambda n: f'Клиника №{n}')
+    legal_address = factory.Faker('address', locale=LOCALE)
+    physical_address = factory.Faker('address', locale=LOCALE)
+
+
+class DoctorFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Doctor
+
+    user = factory.SubFactory(DoctorUserFactory)
+    specialization = factory.Iterator(SPECIALIZATIONS)
+
+
+class PatientFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Patient
+
+    user = factory.SubFactory(PatientUserFactory)
+    phone = factory.Sequence(lambda n: f'+7900{n:07d}')
+    email = factory.Sequence(lambda n: f'patient{n}@example.com')
+
+
+class ConsultationFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Consultation
+
+    start_time = factory.LazyFunction(
+        lambda: timezone.now() + timedelta(days=1)
+    )
+    end_time = factory.LazyAttribute(
+        lambda consultation: consultation.start_time + timedelta(minutes=30)
+    )
+    status = factory.Iterator(Consultation.Status.values)
+    doctor = factory.SubFactory(DoctorFactory)
+    patient = factory.SubFactory(PatientFactory)
@@ -0,0 +1,185 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from benchmarks.dataset import DatasetSize, build_dataset, existing_size
+from benchmarks.runner import (
+    SCENARIOS,
+    BenchmarkError,
+    compare,
+    environment,
+    run_suite,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочные тесты API консультаций на синтетических данных. '
+        'Выполняются в отдельной тестовой базе данных.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--consultations',
+            type=int,
+            default=10_000,
+            help='Число консультаций в наборе данных.',
+        )
+        parser.add_argument('--doctors', type=int, help='Число врачей.')
+        parser.add_argument('--patients', type=int, help='Число пациентов.')
+        parser.add_argument('--clinics', type=int, help='Число клиник.')
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            choices=tuple(SCENARIOS),
+            dest='scenarios',
+            help='Сценарий для замера (можно указать несколько раз).',
+        )
+        parser.add_argument('--iterations', type=int, default=100)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument(
+            '--profile-iterations',
+            type=int,
+            default=20,
+            help='Число запросов для подсчёта SQL-запросов и памяти.',
+        )
+        parser.add_argument(
+            '--warm-cache',
+            action='store_true',
+            help='Не очищать кэш ответов перед каждым запросом.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--keepdb',
+            action='store_true',
+            help='Сохранить тестовую базу и набор данных для повторных '
+            'запусков.',
+        )
+        parser.add_argument(
+            '--output', type=Path, help='Файл для результатов в JSON.'
+        )
+        parser.add_argument(
+            '--compare',
+            type=Path,
+            help='Файл с результатами предыдущего запуска для сравнения.',
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.1,
+            help='Допустимый относительный рост метрик при сравнении.',
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            baseline = json.loads(options['compare'].read_text())
+
+        size = DatasetSize.for_consultations(
+            options['consultations'],
+            doctors=options['doctors'],
+            patients=options['patients'],
+            clinics=options['clinics'],
+        )
+        setup_test_environment()
+        # Отдельное имя, чтобы сохранённый набор данных не удалялся
+        # при запуске тестов.
+        connection.settings_dict['TEST']['NAME'] = (
+            f'benchmark_{connection.settings_dict["NAME"]}'
+        )
+        old_name = connection.creation.create_test_db(
+            verbosity=options['verbosity'],
+            autoclobber=True,
+            serialize=False,
+            keepdb=options['keepdb'],
+        )
+        try:
+            self.prepare_dataset(size, options['seed'])
+            scenarios = run_suite(
+                names=options['scenarios'],
+                iterations=options['iterations'],
+                warmup=options['warmup'],
+                profile_iterations=options['profile_iterations'],
+                cold_cache=not options['warm_cache'],
+                seed=options['seed'],
+                log=self.log_result,
+            )
+            results = {
+                'environment': environment(),
+                'dataset': size.as_dict(),
+                'settings': {
+                    'iterations': options['iterations'],
+                    'warmup': options['warmup'],
+                    'profile_iterations': options['profile_iterations'],
+                    'cold_cache': not options['warm_cache'],
+                    'seed': options['seed'],
+                },
+                'scenarios': scenarios,
+            }
+        except BenchmarkError as error:
+            raise CommandError(error)
+        finally:
+            connection.creation.destroy_test_db(
+                old_name,
+                verbosity=options['verbosity'],
+                keepdb=options['keepdb'],
+            )
+            teardown_test_environment()
+
+        if options['output']:
+            options['output'].parent.mkdir(parents=True, exist_ok=True)
+            options['output'].write_text(
+                json.dumps(results, ensure_ascii=False, indent=2)
+            )
+            self.stdout.write(f'Результаты сохранены в {options["output"]}')
+        if baseline is not None:
+            self.report_comparison(
+                compare(baseline, results, options['threshold'])
+            )
+
+    def prepare_dataset(self, size, seed):
+        current = existing_size()
+        if current.consultations:
+            # Сценарий create добавляет консультации, поэтому их число
+            # в сохранённой базе может быть больше запрошенного.
+            if (
+                current.consultations < size.consultations
+                or current.doctors != size.doctors
+                or current.patients != size.patients
+                or current.clinics != size.clinics
+            ):
+                raise CommandError(
+                    f'Тестовая база уже содержит другой набор данных: '
+                    f'{current.as_dict()}. Запустите без --keepdb.'
+                )
+            self.stdout.write('Используется сохранённый набор данных.')
+            return
+        self.stdout.write(f'Создание набора данных: {size.as_dict()}')
+        build_dataset(size, seed=seed)
+
+    def log_result(self, name, result):
+        time_ms = result['time_ms']
+        self.stdout.write(
+            f'{name:<15} p50 {time_ms["p50"]:>9.2f} мс  '
+            f'p95 {time_ms["p95"]:>9.2f} мс  '
+            f'запросов {result["queries"]["mean"]:>5.1f}  '
+            f'память {result["peak_alloc_kib"]["p95"]:>9.1f} КиБ'
+        )
+
+    def report_comparison(self, rows):
+        regressions = 0
+        for name, metric, old, new, regression in rows:
+            line = f'{name:<15} {metric:<20} {old:>10} -> {new:>10}'
+            if regression:
+                regressions += 1
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+        if regressions:
+            raise CommandError(f'Обнаружено регрессий: {regressions}.')
@@ -0,0 +1,371 @@
+"""
+Замер времени ответа, числа SQL-запросов и выделений памяти.
+
+Запросы выполняются в процессе через ``APIClient`` с JWT-токенами,
+поэтому в замер входят аутентификация, представление, сериализация
+и рендеринг ответа, но не сеть и не WSGI-сервер. Время меряется
+отдельным проходом без ``tracemalloc``, который заметно замедляет
+выполнение.
+"""
+
+import platform
+import random
+import statistics
+import subprocess
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import timedelta
+
+import django
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from consultations.models import Consultation
+from users.authentication import store_token_version
+from users.models import CustomUser, Doctor
+from users.serializers import ClaimsTokenObtainPairSerializer
+
+from .dataset import ADMIN_USERNAME
+
+SAMPLE_SIZE = 100
+
+LIST_URL = 'consultations:consultations-list'
+DETAIL_URL = 'consultations:consultations-detail'
+SEARCH_URL = 'consultations:consultations-ranked-search'
+CHANGE_STATUS_URL = 'consultations:consultations-change-status'
+
+
+class BenchmarkError(Exception):
+    """Запрос сценария завершился неожиданным статусом."""
+
+
+class BenchmarkContext:
+    """
+    Данные, общие для сценариев: выборка пользователей, консультаций
+    и поисковых запросов, а также клиенты с токенами пользователей.
+    """
+
+    def __init__(self, seed=0):
+        self.random = random.Random(seed)
+        self.admin = CustomUser.objects.get(username=ADMIN_USERNAME)
+        self.doctors = list(
+            Doctor.objects.select_related('user').order_by('?')[:SAMPLE_SIZE]
+        )
+        self.consultation_ids = list(
+            Consultation.objects.order_by('?').values_list('pk', flat=True)[
+                :SAMPLE_SIZE
+            ]
+        )
+        # Консультации, статус которых ещё можно сменить: текущий статус
+        # нужен, чтобы выбирать разрешённый переход.
+        self.statuses = dict(
+            Consultation.objects.exclude(
+                status=Consultation.Status.PAID.value
+            )
+            .order_by('?')
+            .values_list('pk', 'status')[:SAMPLE_SIZE]
+        )
+        self.search_terms = sorted(
+            {doctor.user.last_name[:5].lower() for doctor in self.doctors}
+        )
+        self.patient_ids = list(
+            Consultation.objects.order_by('?').values_list(
+                'patient_id', flat=True
+            )[:SAMPLE_SIZE]
+        )
+        latest = Consultation.objects.order_by('-end_time').first()
+        self.free_time = (latest.end_time if latest else timezone.now()) + (
+            timedelta(days=1)
+        )
+        self.clients = {}
+        self.users = {}
+        # Токены выпускаются заранее, чтобы не попадать в замер.
+        for user in (self.admin, *(doctor.user for doctor in self.doctors)):
+            self.client(user)
+
+    def client(self, user):
+        """Клиент с access-токеном пользователя."""
+
+        if user.pk not in self.clients:
+            token = ClaimsTokenObtainPairSerializer.get_token(user)
+            client = APIClient()
+            client.credentials(
+                HTTP_AUTHORIZATION=f'Bearer {token.access_token}'
+            )
+            self.clients[user.pk] = client
+            self.users[user.pk] = user
+            store_token_version(user)
+        return self.clients[user.pk]
+
+    def reset_cache(self):
+        """
+        Очищает кэш, сохраняя версии токенов: иначе в замер попадёт
+        запрос аутентификации к базе данных.
+        """
+
+        cache.clear()
+        for user in self.users.values():
+            store_token_version(user)
+
+    def choice(self, items):
+        return self.random.choice(items)
+
+    def next_transition(self):
+        """Консультация и следующий статус по графу переходов."""
+
+        if not self.statuses:
+            raise BenchmarkError('Не осталось консультаций для смены статуса.')
+        pk = self.choice(sorted(self.statuses))
+        status = self.choice(
+            Consultation.STATUS_TRANSITIONS[self.statuses[pk]]
+        )
+        if Consultation.STATUS_TRANSITIONS[status]:
+            self.statuses[pk] = status
+        else:
+            del self.statuses[pk]
+        return pk, status
+
+    def next_free_slot(self):
+        """Интервал, не пересекающийся ни с одной консультацией."""
+
+        start = self.free_time
+        self.free_time += timedelta(hours=1)
+        return start, start + timedelta(minutes=30)
+
+
+@dataclass
+class Scenario:
+    """Сценарий: функция, выполняющая один запрос, и ожидаемый статус."""
+
+    name: str
+    request: object
+    expected_status: int = 200
+
+
+def list_as_doctor(context):
+    doctor = context.choice(context.doctors)
+    return context.client(doctor.user).get(reverse(LIST_URL))
+
+
+def list_as_admin(context):
+    return context.client(context.admin).get(reverse(LIST_URL))
+
+
+def filter_by_status(context):
+    status = context.choice(Consultation.Status.values)
+    return context.client(context.admin).get(
+        reverse(LIST_URL), {'status': status}
+    )
+
+
+def search(context):
+    term = context.choice(context.search_terms)
+    return context.client(context.admin).get(
+        reverse(LIST_URL), {'search': term}
+    )
+
+
+def ranked_search(context):
+    term = context.choice(context.search_terms)
+    return context.client(context.admin).get(
+        reverse(SEARCH_URL), {'q': term}
+    )
+
+
+def retrieve(context):
+    doctor = context.choice(context.doctors)
+    pk = context.choice(context.consultation_ids)
+    return context.client(doctor.user).get(reverse(DETAIL_URL, args=[pk]))
+
+
+def create(context):
+    doctor = context.choice(context.doctors)
+    start_time, end_time = context.next_free_slot()
+    return context.client(doctor.user).post(
+        reverse(LIST_URL),
+        {
+            'start_time': start_time.isoformat(),
+            'end_time': end_time.isoformat(),
+            'status': Consultation.Status.WAITING.value,
+            'doctor': doctor.pk,
+            'patient': context.choice(context.patient_ids),
+        },
+        format='json',
+    )
+
+
+def change_status(context):
+    pk, status = context.next_transition()
+    return context.client(context.admin).patch(
+        reverse(CHANGE_STATUS_URL, args=[pk]),
+        {'status': status},
+        format='json',
+    )
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario('list', list_as_doctor),
+        Scenario('list_admin', list_as_admin),
+        Scenario('filter', filter_by_status),
+        Scenario('search', search),
+        Scenario('ranked_search', ranked_search),
+        Scenario('retrieve', retrieve),
+        Scenario('create', create, expected_status=201),
+        Scenario('change_status', change_status),
+    )
+}
+
+
+def percentile(values, percent):
+    """Процентиль по методу ближайшего ранга."""
+
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(values, scale=1):
+    return {
+        'p50': round(percentile(values, 50) / scale, 3),
+        'p95': round(percentile(values, 95) / scale, 3),
+        'mean': round(statistics.fmean(values) / scale, 3),
+        'max': round(max(values) / scale, 3),
+    }
+
+
+def perform(scenario, context):
+    response = scenario.request(context)
+    if response.status_code != scenario.expected_status:
+        raise BenchmarkError(
+            f'{scenario.name}: ожидался статус {scenario.expected_status}, '
+            f'получен {response.status_code}.'
+        )
+    return response
+
+
+def run_scenario(
+    scenario, context, iterations, warmup, profile_iterations, cold_cache
+):
+    """
+    Замеряет сценарий и возвращает сводку метрик. При ``cold_cache``
+    кэш ответов очищается перед каждым запросом, и замеряется
+    обращение к базе данных, а не чтение из кэша.
+    """
+
+    context.reset_cache()
+    for _ in range(warmup):
+        perform(scenario, context)
+
+    timings = []
+    for _ in range(iterations):
+        if cold_cache:
+            context.reset_cache()
+        start = time.perf_counter_ns()
+        perform(scenario, context)
+        timings.append(time.perf_counter_ns() - start)
+
+    queries = []
+    allocated = []
+    tracemalloc.start()
+    try:
+        for _ in range(profile_iterations):
+            if cold_cache:
+                context.reset_cache()
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            with CaptureQueriesContext(connection) as captured:
+                perform(scenario, context)
+            _, peak = tracemalloc.get_traced_memory()
+            queries.append(len(captured))
+            allocated.append(peak - before)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'iterations': iterations,
+        'time_ms': summarize(timings, scale=1_000_000),
+        'queries': summarize(queries),
+        'peak_alloc_kib': summarize(allocated, scale=1024),
+    }
+
+
+def run_suite(
+    names=None,
+    iterations=100,
+    warmup=10,
+    profile_iterations=20,
+    cold_cache=True,
+    seed=0,
+    log=None,
+):
+    """Выполняет сценарии и возвращает результаты по именам."""
+
+    context = BenchmarkContext(seed=seed)
+    results = {}
+    for name in names or SCENARIOS:
+        results[name] = run_scenario(
+            SCENARIOS[name],
+            context,
+            iterations=iterations,
+            warmup=warmup,
+            profile_iterations=profile_iterations,
+            cold_cache=cold_cache,
+        )
+        if log is not None:
+            log(name, results[name])
+    return results
+
+
+def environment():
+    """Сведения об окружении для сравнения результатов между коммитами."""
+
+    try:
+        commit = subprocess.run(
+            ('git', 'rev-parse', 'HEAD'),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'created_at': timezone.now().isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': f'{connection.vendor} {connection.pg_version}',
+    }
+
+
+def compare(baseline, current, threshold=0.1):
+    """
+    Сравнивает результаты с базовыми. Возвращает строки
+    ``(сценарий, метрика, было, стало, регрессия)`` для p95 времени,
+    среднего числа запросов и пика выделенной памяти.
+    """
+
+    rows = []
+    for name, result in current['scenarios'].items():
+        before = baseline['scenarios'].get(name)
+        if before is None:
+            continue
+        for metric, key in (
+            ('time_ms', 'p95'),
+            ('queries', 'mean'),
+            ('peak_alloc_kib', 'p95'),
+        ):
+            old = before[metric][key]
+            new = result[metric][key]
+            if metric == 'queries':
+                regression = new > old
+            else:
+                regression = new > old * (1 + threshold)
+            rows.append((name, f'{metric}.{key}', old, new, regression))
+    return rows
@@ -1,12 +1,14 @@
 from django.contrib import admin
 
+from medical_service.replicas import ReplicaAdminMixin
+
 from .models import Clinic
 
 EMPTY_VALUE = '-ПУСТО-'
 
 
 @admin.register(Clinic)
-class ClinicAdmin(admin.ModelAdmin):
+class ClinicAdmin(ReplicaAdminMixin, admin.ModelAdmin):
     """Админка для клиники."""
 
     list_display = ('name', 'legal_address', 'physical_address')
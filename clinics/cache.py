@@ -0,0 +1,45 @@
+"""
+Кэш ответов справочника клиник в памяти процесса.
+
+Справочник клиник меняется редко, а читается часто, поэтому готовые
+ответы хранятся в словаре процесса. Каждый ответ помечен версией
+области ``CLINICS_SCOPE`` из общего кэша. Сигналы об изменении клиник,
+врачей и связей врачей с клиниками очищают словарь текущего процесса
+и увеличивают версию, поэтому другие процессы тоже перестают отдавать
+устаревшие ответы. Проверка версии — одно обращение к общему кэшу
+без SQL-запросов.
+"""
+
+from consultations.cache import bump_version, get_version
+
+CLINICS_SCOPE = 'clinics:directory'
+# Ключ — полный URL запроса, поэтому размер словаря ограничен.
+MAX_ENTRIES = 512
+
+_responses = {}
+
+
+def current_version():
+    return get_version(CLINICS_SCOPE)
+
+
+def get_response(key, version):
+    """Данные ответа, закэшированные под версией ``version``, или ``None``."""
+
+    entry = _responses.get(key)
+    if entry is None or entry[0] != version:
+        return None
+    return entry[1]
+
+
+def set_response(key, version, data):
+    if len(_responses) >= MAX_ENTRIES:
+        _responses.clear()
+    _responses[key] = (version, data)
+
+
+def invalidate():
+    """Сбрасывает кэш справочника во всех процессах."""
+
+    _responses.clear()
+    bump_version(CLINICS_SCOPE)
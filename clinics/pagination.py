@@ -0,0 +1,7 @@
+from medical_service.pagination import KeysetPagination
+
+
+class ClinicPagination(KeysetPagination):
+    """Курсорная пагинация справочника клиник по ``(name, id)``."""
+
+    ordering = ('name', 'id')
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from users.models import CustomUser, Doctor
+
+from .cache import invalidate
+from .models import Clinic
+
+
+@receiver(post_save, sender=Clinic)
+@receiver(post_delete, sender=Clinic)
+@receiver(m2m_changed, sender=Doctor.clinics.through)
+@receiver(post_save, sender=Doctor)
+@receiver(post_delete, sender=Doctor)
+def invalidate_clinic_directory(sender, **kwargs):
+    """Сбрасывает справочник клиник: в него попадают клиники и их врачи."""
+
+    invalidate()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_clinic_directory_names(sender, instance, **kwargs):
+    """Сбрасывает справочник клиник при изменении пользователя-врача."""
+
+    if instance.role == CustomUser.UserRole.DOCTOR.value:
+        invalidate()
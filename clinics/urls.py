@@ -0,0 +1,13 @@
+from django.urls import include, path
+from rest_framework.routers import SimpleRouter
+
+from .views import ClinicViewSet
+
+app_name = 'clinics'
+
+v1_router = SimpleRouter()
+v1_router.register('clinics', ClinicViewSet, basename='clinics')
+
+urlpatterns = [
+    path('v1/', include(v1_router.urls)),
+]
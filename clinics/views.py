@@ -0,0 +1,67 @@
+from django.db.models import Prefetch
+from rest_framework import status, viewsets
+from rest_framework.response import Response
+
+from consultations.cache import changed_recently
+from medical_service.replicas import (
+    ReplicaReadMixin,
+    replica_reads,
+    replica_reads_enabled,
+)
+from users.models import Doctor
+from users.serializers import ClinicWithDoctorsSerializer
+
+from .cache import (
+    CLINICS_SCOPE,
+    current_version,
+    get_response,
+    set_response,
+)
+from .models import Clinic
+from .pagination import ClinicPagination
+
+
+class ClinicViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Справочник клиник с их врачами.
+
+    Врачи загружаются одним ``prefetch_related`` на страницу, поэтому
+    число запросов не зависит от размера страницы. Ответы кэшируются
+    в памяти процесса (см. ``clinics.cache``).
+    """
+
+    serializer_class = ClinicWithDoctorsSerializer
+    pagination_class = ClinicPagination
+
+    def get_queryset(self):
+        return Clinic.objects.prefetch_related(
+            Prefetch(
+                'clinic_doctors',
+                queryset=Doctor.objects.select_related('user'),
+            )
+        )
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key = request.build_absolute_uri()
+        # Версия читается до запроса к базе: если справочник изменится
+        # во время чтения, ответ останется под прежней версией.
+        version = current_version()
+        data = get_response(key, version)
+        if data is not None:
+            return Response(data)
+
+        with replica_reads(
+            replica_reads_enabled() and not changed_recently([CLINICS_SCOPE])
+        ):
+            response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            set_response(key, version, response.data)
+        return response
@@ -1,12 +1,141 @@
+from datetime import timedelta
+
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.utils import get_last_value_from_parameters
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.utils import timezone
+
+from medical_service.pagination import EstimatedCountPaginator
+from medical_service.replicas import ReplicaAdminMixin
 
-from .models import Consultation
+from .models import Consultation, ConsultationQuerySet
+from .search import SEARCH_NAME_FIELDS, filter_search_names
 
 EMPTY_VALUE = '-ПУСТО-'
+AUTOCOMPLETE_FILTER_JS = 'consultations/js/autocomplete_filter.js'
+# Периоды, для которых иерархия дат обходит индекс.
+DATE_HIERARCHY_KINDS = ('year', 'month', 'day')
+
+
+def truncate_period(value, kind):
+    """Начало года, месяца или дня, которому принадлежит ``value``."""
+
+    value = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    if kind in ('year', 'month'):
+        value = value.replace(day=1)
+    if kind == 'year':
+        value = value.replace(month=1)
+    return value
+
+
+def next_period(value, kind):
+    """Начало периода, следующего за периодом с началом ``value``."""
+
+    if kind == 'day':
+        return value + timedelta(days=1)
+    if kind == 'month':
+        return value.replace(
+            year=value.year + value.month // 12, month=value.month % 12 + 1
+        )
+    return value.replace(year=value.year + 1)
+
+
+class DateHierarchyQuerySet(ConsultationQuerySet):
+    """
+    Выборка списка консультаций в админке.
+
+    Иерархия дат админки получает годы, месяцы и дни выборки через
+    ``datetimes()``, которому нужны все строки выборки. Здесь периоды
+    собираются обходом индекса поля: по одному запросу
+    ``ORDER BY поле LIMIT 1`` от начала каждого следующего периода,
+    то есть число запросов равно числу непустых периодов.
+    """
+
+    def first_from(self, field_name, start=None):
+        """Запрос первого значения поля, не меньшего ``start``."""
+
+        queryset = self.filter(**{f'{field_name}__isnull': False})
+        if start is not None:
+            queryset = queryset.filter(**{f'{field_name}__gte': start})
+        return queryset.order_by(field_name).values_list(
+            field_name, flat=True
+        )[:1]
+
+    def datetimes(self, field_name, kind, order='ASC', tzinfo=None):
+        if kind not in DATE_HIERARCHY_KINDS:
+            return super().datetimes(field_name, kind, order, tzinfo)
+
+        tzinfo = tzinfo or timezone.get_current_timezone()
+        # Все запросы обхода — к одной базе.
+        queryset = self.using(self.db)
+        periods = []
+        start = None
+        while True:
+            value = next(iter(queryset.first_from(field_name, start)), None)
+            if value is None:
+                break
+            period = truncate_period(
+                timezone.localtime(value, tzinfo).replace(tzinfo=None), kind
+            )
+            periods.append(timezone.make_aware(period, tzinfo))
+            start = timezone.make_aware(next_period(period, kind), tzinfo)
+        if order == 'DESC':
+            periods.reverse()
+        return periods
+
+
+class AutocompleteFilter(admin.FieldListFilter):
+    """
+    Фильтр по внешнему ключу, значение которого выбирается через
+    автодополнение админки, а не из списка всех связанных объектов.
+
+    Связанная модель должна быть зарегистрирована в админке с
+    ``search_fields``, а админка с фильтром — подключать
+    ``AutocompleteSelect.media`` и ``AUTOCOMPLETE_FILTER_JS``.
+    """
+
+    template = 'admin/consultations/autocomplete_filter.html'
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.lookup_kwarg = f'{field_path}__{field.target_field.name}__exact'
+        self.lookup_val = get_last_value_from_parameters(
+            params, self.lookup_kwarg
+        )
+        super().__init__(
+            field, request, params, model, model_admin, field_path
+        )
+        related_admin = model_admin.admin_site.get_model_admin(
+            field.remote_field.model
+        )
+        self.form_field = field.formfield(
+            queryset=related_admin.get_queryset(request),
+            widget=AutocompleteSelect(field, model_admin.admin_site),
+            required=False,
+        )
+
+    def expected_parameters(self):
+        return [self.lookup_kwarg]
+
+    def choices(self, changelist):
+        yield {
+            'selected': self.lookup_val is not None,
+            'widget': self.form_field.widget.render(
+                self.lookup_kwarg,
+                self.lookup_val,
+                attrs={
+                    'id': f'filter_{self.lookup_kwarg}',
+                    'data-filter-parameter': self.lookup_kwarg,
+                },
+            ),
+            'query_string': changelist.get_query_string(
+                remove=[self.lookup_kwarg]
+            ),
+        }
 
 
 @admin.register(Consultation)
-class ConsultationAdmin(admin.ModelAdmin):
+class ConsultationAdmin(ReplicaAdminMixin, admin.ModelAdmin):
     """Админка для консультации."""
 
     list_display = (
@@ -18,12 +147,45 @@ class ConsultationAdmin(admin.ModelAdmin):
         'doctor',
         'patient',
     )
-    search_fields = (
-        'doctor__user__first_name',
-        'doctor__user__last_name',
-        'patient__user__first_name',
-        'patient__user__last_name',
+    list_select_related = ('doctor__user', 'patient__user')
+    # Поиск идёт по денормализованным ФИО (см. ``get_search_results``).
+    search_fields = SEARCH_NAME_FIELDS
+    list_filter = (
+        'status',
+        ('doctor', AutocompleteFilter),
+        ('patient', AutocompleteFilter),
+        'created_at',
     )
-    list_filter = ('status', 'doctor', 'patient', 'created_at')
+    date_hierarchy = 'start_time'
     ordering = ('-created_at',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = EMPTY_VALUE
+
+    @property
+    def media(self):
+        autocomplete = AutocompleteSelect(
+            Consultation._meta.get_field('doctor'), self.admin_site
+        )
+        return (
+            super().media
+            + autocomplete.media
+            + forms.Media(js=[AUTOCOMPLETE_FILTER_JS])
+        )
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        return DateHierarchyQuerySet(
+            model=queryset.model,
+            query=queryset.query,
+            using=queryset._db,
+            hints=queryset._hints,
+        )
+
+    def get_search_results(self, request, queryset, search_term):
+        # ``icontains`` (``UPPER(...) LIKE``) не использует триграммные
+        # индексы нормализованных полей.
+        queryset = filter_search_names(
+            queryset, search_term.split(), self.get_search_fields(request)
+        )
+        return queryset, False
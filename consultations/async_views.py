@@ -0,0 +1,206 @@
+"""
+Асинхронный путь чтения консультаций для развёртывания под ASGI.
+
+DRF не поддерживает async-представления, поэтому ``AsyncConsultationView``
+выполняет шаги ``APIView.dispatch`` сам: согласование формата ответа,
+асинхронную JWT-аутентификацию, проверку разрешений и ограничений
+частоты и вызов ``alist``/``aretrieve`` у ``ConsultationViewSet``.
+Фильтры, ограничения по роли, сериализация, рендереры (orjson только
+для списка), чтение с реплик и кэширование ответов остаются общими
+с синхронным путём. Запросы на запись передаются синхронному представлению DRF.
+
+``ConsultationEventsView`` отдаёт поток событий об изменении
+консультаций (Server-Sent Events) вместо периодического опроса списка.
+"""
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import NotAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from medical_service.renderers import ORJSONRenderer
+from medical_service.replicas import acan_read_replica, replica_reads
+from users.authentication import ClaimsJWTAuthentication
+
+from .events import get_broker
+from .views import ConsultationViewSet
+
+LIST_ACTIONS = {'get': 'list', 'post': 'create'}
+DETAIL_ACTIONS = {
+    'get': 'retrieve',
+    'put': 'update',
+    'patch': 'partial_update',
+    'delete': 'destroy',
+}
+ASYNC_ACTIONS = {'list': 'alist', 'retrieve': 'aretrieve'}
+
+
+class AsyncAuthenticationMixin:
+    """JWT-аутентификация async-представлений без обращения к базе."""
+
+    authentication_class = ClaimsJWTAuthentication
+
+    async def authenticate(self, request):
+        result = await self.authentication_class().aauthenticate(
+            request._request
+        )
+        if result is None:
+            raise NotAuthenticated()
+        request.user, request.auth = result
+
+
+class AsyncConsultationView(AsyncAuthenticationMixin, View):
+    """Async-представление списка или деталей консультаций."""
+
+    viewset_class = ConsultationViewSet
+    detail = False
+    sync_view = None
+
+    @classmethod
+    def as_view(cls, detail=False, **initkwargs):
+        sync_view = cls.viewset_class.as_view(
+            DETAIL_ACTIONS if detail else LIST_ACTIONS,
+            basename='consultations',
+            detail=detail,
+        )
+        view = super().as_view(
+            detail=detail, sync_view=sync_view, **initkwargs
+        )
+        return csrf_exempt(view)
+
+    async def get(self, request, *args, **kwargs):
+        action = DETAIL_ACTIONS['get'] if self.detail else LIST_ACTIONS['get']
+        drf_request = Request(request)
+
+        viewset = self.viewset_class(
+            request=drf_request,
+            args=args,
+            kwargs=kwargs,
+            action=action,
+            basename='consultations',
+            detail=self.detail,
+        )
+        viewset.headers = viewset.default_response_headers
+        try:
+            await self.initial(viewset, drf_request, *args, **kwargs)
+            handler = getattr(viewset, ASYNC_ACTIONS[action])
+            with replica_reads(await acan_read_replica(drf_request.user)):
+                response = await handler(drf_request, *args, **kwargs)
+        except Exception as exc:
+            response = viewset.handle_exception(exc)
+
+        response = viewset.finalize_response(drf_request, response)
+        if isinstance(drf_request.accepted_renderer, JSONRenderer):
+            return response.render()
+        # Остальные рендереры (Browsable API) обращаются к базе данных.
+        return await sync_to_async(response.render)()
+
+    async def initial(self, viewset, request, *args, **kwargs):
+        """
+        Шаги ``APIView.initial``: согласование формата ответа, версия,
+        асинхронная аутентификация, разрешения и ограничения частоты.
+        """
+
+        viewset.format_kwarg = viewset.get_format_suffix(**kwargs)
+        negotiated = viewset.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = negotiated
+        request.version, request.versioning_scheme = viewset.determine_version(
+            request, *args, **kwargs
+        )
+        await self.authenticate(request)
+        viewset.check_permissions(request)
+        viewset.check_throttles(request)
+
+    async def delegate(self, request, *args, **kwargs):
+        """Передаёт запрос синхронному представлению DRF."""
+
+        return await sync_to_async(self.sync_view)(request, *args, **kwargs)
+
+    post = put = patch = delete = options = delegate
+
+
+class ConsultationEventsView(AsyncAuthenticationMixin, View):
+    """
+    Поток событий об изменении консультаций в формате Server-Sent
+    Events. Врач и пациент получают события только о своих
+    консультациях, как в списке консультаций.
+    """
+
+    viewset_class = ConsultationViewSet
+    renderer_class = ORJSONRenderer
+    # Пауза перед переподключением клиента, мс.
+    retry = 3000
+
+    async def get(self, request, *args, **kwargs):
+        renderer = self.renderer_class()
+        drf_request = Request(request)
+        drf_request.accepted_renderer = renderer
+        drf_request.accepted_media_type = renderer.media_type
+
+        viewset = self.viewset_class(
+            request=drf_request,
+            args=args,
+            kwargs=kwargs,
+            action='list',
+            format_kwarg=None,
+            basename='consultations',
+            detail=False,
+        )
+        viewset.headers = viewset.default_response_headers
+        try:
+            await self.authenticate(drf_request)
+            viewset.check_permissions(drf_request)
+        except Exception as exc:
+            response = viewset.handle_exception(exc)
+            return viewset.finalize_response(drf_request, response).render()
+
+        response = StreamingHttpResponse(
+            self.stream(self.get_audience(drf_request.user), renderer),
+            content_type='text/event-stream',
+        )
+        response['Cache-Control'] = 'no-cache'
+        # Запрещает буферизацию потока в nginx.
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def get_audience(self, user):
+        """
+        Ключ события и идентификатор, по которым отбираются события
+        пользователя, или ``None`` — все события.
+        """
+
+        if self.viewset_class.is_doctor_scoped(user):
+            return 'doctors', user.doctor_id
+        if self.viewset_class.is_patient_scoped(user):
+            return 'patients', user.patient_id
+        return None
+
+    async def stream(self, audience, renderer):
+        async with get_broker().subscribe() as subscription:
+            yield f'retry: {self.retry}\n\n'.encode()
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        anext(subscription),
+                        settings.CONSULTATION_EVENTS_HEARTBEAT,
+                    )
+                except TimeoutError:
+                    # Комментарий не даёт прокси закрыть соединение.
+                    yield b': keepalive\n\n'
+                    continue
+                except StopAsyncIteration:
+                    return
+                if audience is not None:
+                    key, value = audience
+                    if value not in event[key]:
+                        continue
+                yield b'event: %s\ndata: %s\n\n' % (
+                    event['event'].encode(),
+                    renderer.render(event['data']),
+                )
@@ -0,0 +1,167 @@
+"""
+Расчёт свободных слотов врача.
+
+Занятые интервалы читаются одним запросом по GiST-индексу интервалов
+консультаций, после чего свободное время вычисляется в памяти проходом
+по отсортированным интервалам (sweep line): из рабочих часов вычитаются
+занятые интервалы, а остаток нарезается на слоты нужной длительности.
+Результат кэшируется по врачу и параметрам запроса и инвалидируется
+при изменении консультаций или рабочих часов врача.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.fields import DateTimeField
+
+from medical_service.replicas import replica_reads, replica_reads_enabled
+from users.models import WorkingHours
+
+from .cache import changed_recently, doctor_availability_scope, get_version
+from .models import Consultation
+
+AVAILABILITY_CACHE_TIMEOUT = 5 * 60
+
+
+def merge_intervals(intervals):
+    """Объединяет пересекающиеся и смежные интервалы."""
+
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_intervals(intervals, busy):
+    """
+    Вычитает занятые интервалы из свободных.
+
+    Оба списка должны быть отсортированы и не пересекаться внутри себя.
+    Работает за O(n + m) благодаря тому, что указатель по занятым
+    интервалам только движется вперёд.
+    """
+
+    result = []
+    index = 0
+    for start, end in intervals:
+        while index < len(busy) and busy[index][1] <= start:
+            index += 1
+        cursor = start
+        position = index
+        while position < len(busy) and busy[position][0] < end:
+            busy_start, busy_end = busy[position]
+            if busy_start > cursor:
+                result.append((cursor, busy_start))
+            cursor = max(cursor, busy_end)
+            position += 1
+        if cursor < end:
+            result.append((cursor, end))
+    return result
+
+
+def split_into_slots(intervals, duration):
+    """Нарезает интервалы на слоты длительностью ``duration``."""
+
+    slots = []
+    for start, end in intervals:
+        while start + duration <= end:
+            slots.append((start, start + duration))
+            start += duration
+    return slots
+
+
+def get_working_intervals(schedule, start, end):
+    """
+    Разворачивает недельное расписание в интервалы внутри
+    ``[start, end)`` в текущем часовом поясе.
+    """
+
+    tz = timezone.get_current_timezone()
+    by_weekday = defaultdict(list)
+    for hours in schedule:
+        by_weekday[hours.weekday].append((hours.start_time, hours.end_time))
+
+    intervals = []
+    day = timezone.localtime(start, tz).date()
+    last_day = timezone.localtime(end, tz).date()
+    while day <= last_day:
+        for begin, finish in by_weekday[day.weekday()]:
+            interval_start = max(
+                timezone.make_aware(datetime.combine(day, begin), tz), start
+            )
+            interval_end = min(
+                timezone.make_aware(datetime.combine(day, finish), tz), end
+            )
+            if interval_start < interval_end:
+                intervals.append((interval_start, interval_end))
+        day += timedelta(days=1)
+    return merge_intervals(intervals)
+
+
+def get_busy_intervals(doctor_id, start, end):
+    """Занятые интервалы врача, пересекающиеся с ``[start, end)``."""
+
+    rows = (
+        Consultation.objects.overlapping(doctor_id, start, end)
+        .order_by('start_time')
+        .values_list('start_time', 'end_time')
+    )
+    return merge_intervals(rows)
+
+
+def calculate_free_slots(doctor_id, start, end, duration):
+    """Свободные слоты врача без использования кэша."""
+
+    schedule = WorkingHours.objects.filter(doctor_id=doctor_id)
+    working = get_working_intervals(schedule, start, end)
+    if not working:
+        return []
+    busy = get_busy_intervals(doctor_id, start, end)
+    return split_into_slots(subtract_intervals(working, busy), duration)
+
+
+def availability_cache_key(doctor_id, start, end, duration):
+    version = get_version(doctor_availability_scope(doctor_id))
+    seconds = int(duration.total_seconds())
+    return (
+        f'availability:{doctor_id}:{version}:'
+        f'{start.isoformat()}:{end.isoformat()}:{seconds}'
+    )
+
+
+def get_cached_availability(doctor_id, start, end, duration):
+    """Закэшированный ответ или ``None``."""
+
+    return cache.get(availability_cache_key(doctor_id, start, end, duration))
+
+
+def get_availability(doctor_id, start, end, duration):
+    """Свободные слоты врача в виде данных для ответа API."""
+
+    key = availability_cache_key(doctor_id, start, end, duration)
+    data = cache.get(key)
+    if data is None:
+        field = DateTimeField()
+        # Сразу после изменения слоты считаются по основной базе,
+        # чтобы не закэшировать данные отстающей реплики.
+        recent = changed_recently([doctor_availability_scope(doctor_id)])
+        with replica_reads(replica_reads_enabled() and not recent):
+            slots = calculate_free_slots(doctor_id, start, end, duration)
+        data = {
+            'doctor': doctor_id,
+            'duration': int(duration.total_seconds() // 60),
+            'slots': [
+                {
+                    'start_time': field.to_representation(slot_start),
+                    'end_time': field.to_representation(slot_end),
+                }
+                for slot_start, slot_end in slots
+            ],
+        }
+        cache.set(key, data, AVAILABILITY_CACHE_TIMEOUT)
+    return data
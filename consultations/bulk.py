@@ -0,0 +1,288 @@
+"""
+Пакетное создание и обновление консультаций.
+
+Пакет проверяется целиком: врачи, пациенты и обновляемые консультации
+загружаются одним запросом на модель, пересечения по времени ищутся
+одним запросом по GiST-индексу и проходом по отсортированным интервалам
+в памяти. Запись выполняется через ``bulk_create``/``bulk_update``
+в одной транзакции: либо сохраняется весь пакет, либо ничего.
+"""
+
+from collections import defaultdict
+
+from django.db import IntegrityError, connection, transaction
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+from django.db.models import Q
+from psycopg2 import errorcodes
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from users.models import CustomUser, Doctor, Patient
+
+from .models import OVERLAP_ERROR, Consultation, consultation_timespan
+from .search import build_search_name
+from .signals import consultations_bulk_saved
+
+NON_FIELD_ERRORS = api_settings.NON_FIELD_ERRORS_KEY
+
+BULK_UPDATE_FIELDS = (
+    'start_time',
+    'end_time',
+    'status',
+    'doctor',
+    'patient',
+    'doctor_search_name',
+    'patient_search_name',
+)
+
+
+class BulkConflictError(Exception):
+    """Пакет нарушил ограничение при записи из-за параллельных изменений."""
+
+
+class ConsultationBulkItemSerializer(serializers.Serializer):
+    """
+    Проверка одного элемента пакета без обращения к базе данных.
+
+    Элемент с ``id`` обновляет существующую консультацию,
+    без ``id`` — создаёт новую.
+    """
+
+    id = serializers.IntegerField(required=False, min_value=1)
+    start_time = serializers.DateTimeField()
+    end_time = serializers.DateTimeField()
+    # Без статуса новая консультация ожидает подтверждения,
+    # а обновляемая сохраняет текущий статус.
+    status = serializers.ChoiceField(
+        choices=Consultation.Status.choices, required=False
+    )
+    doctor = serializers.IntegerField(min_value=1)
+    patient = serializers.IntegerField(min_value=1)
+
+    def validate(self, data):
+        if data['start_time'] >= data['end_time']:
+            raise serializers.ValidationError(
+                'Время начала должно быть раньше времени окончания.'
+            )
+        return data
+
+
+class ConsultationBulkWriter:
+    """Проверяет и сохраняет пакет консультаций от имени пользователя."""
+
+    max_items = 1000
+
+    def __init__(self, user):
+        self.user = user
+
+    def validate(self, items):
+        """
+        Возвращает пару ``(consultations, errors)``. ``errors`` — список
+        той же длины, что и пакет, с ``None`` для корректных элементов.
+        """
+
+        if not isinstance(items, list) or not items:
+            raise serializers.ValidationError(
+                'Ожидается непустой список консультаций.'
+            )
+        if len(items) > self.max_items:
+            raise serializers.ValidationError(
+                f'Не больше {self.max_items} консультаций за запрос.'
+            )
+
+        errors = [None] * len(items)
+        rows = [None] * len(items)
+        for index, item in enumerate(items):
+            serializer = ConsultationBulkItemSerializer(data=item)
+            if serializer.is_valid():
+                rows[index] = serializer.validated_data
+            else:
+                errors[index] = serializer.errors
+
+        valid = [row for row in rows if row is not None]
+        doctors = Doctor.objects.select_related('user').in_bulk(
+            {row['doctor'] for row in valid}
+        )
+        patients = Patient.objects.select_related('user').in_bulk(
+            {row['patient'] for row in valid}
+        )
+        existing = Consultation.objects.in_bulk(
+            {row['id'] for row in valid if 'id' in row}
+        )
+
+        consultations = [None] * len(items)
+        for index, row in enumerate(rows):
+            if row is None:
+                continue
+            try:
+                consultations[index] = self.build(
+                    row, doctors, patients, existing
+                )
+            except serializers.ValidationError as error:
+                errors[index] = error.detail
+
+        self.check_duplicates(consultations, errors)
+        self.check_overlaps(consultations, errors)
+        return consultations, errors
+
+    def build(self, row, doctors, patients, existing):
+        """Собирает объект консультации из проверенного элемента."""
+
+        doctor = doctors.get(row['doctor'])
+        patient = patients.get(row['patient'])
+        item_errors = {}
+        if doctor is None:
+            item_errors['doctor'] = ['Врач не найден.']
+        if patient is None:
+            item_errors['patient'] = ['Пациент не найден.']
+        if 'id' in row and row['id'] not in existing:
+            item_errors['id'] = ['Консультация не найдена.']
+        if item_errors:
+            raise serializers.ValidationError(item_errors)
+
+        if doctor.user_id == patient.user_id:
+            raise serializers.ValidationError(
+                {
+                    NON_FIELD_ERRORS: [
+                        'Доктор и пациент не могут быть одним и тем же '
+                        'человеком.'
+                    ]
+                }
+            )
+
+        if 'id' in row:
+            consultation = existing[row['id']]
+            if not self.can_change(consultation):
+                raise serializers.ValidationError(
+                    {'id': ['Недостаточно прав для изменения консультации.']}
+                )
+            status = row.get('status', consultation.status)
+            if status != consultation.status and not (
+                Consultation.can_transition(consultation.status, status)
+            ):
+                raise serializers.ValidationError(
+                    {
+                        'status': [
+                            f'Переход из статуса {consultation.status} '
+                            f'в {status} не разрешён.'
+                        ]
+                    }
+                )
+        else:
+            consultation = Consultation()
+            status = row.get('status', Consultation.Status.WAITING.value)
+
+        consultation.start_time = row['start_time']
+        consultation.end_time = row['end_time']
+        consultation.status = status
+        consultation.doctor = doctor
+        consultation.patient = patient
+        consultation.doctor_search_name = build_search_name(doctor.user)
+        consultation.patient_search_name = build_search_name(patient.user)
+        return consultation
+
+    def can_change(self, consultation):
+        """Изменять консультацию может админ или её врач."""
+
+        if self.user.role == CustomUser.UserRole.ADMIN.value:
+            return True
+        doctor_id = self.user.doctor_id
+        return doctor_id is not None and consultation.doctor_id == doctor_id
+
+    @staticmethod
+    def check_duplicates(consultations, errors):
+        """Одна консультация не может обновляться дважды в пакете."""
+
+        seen = set()
+        for index, consultation in enumerate(consultations):
+            if consultation is None or consultation.pk is None:
+                continue
+            if consultation.pk in seen:
+                errors[index] = {'id': ['Консультация повторяется в пакете.']}
+                consultations[index] = None
+            seen.add(consultation.pk)
+
+    @staticmethod
+    def check_overlaps(consultations, errors):
+        """
+        Ищет пересечения внутри пакета и с уже сохранёнными
+        консультациями. Сохранённые консультации загружаются одним
+        запросом: по одному условию пересечения с интервалом пакета
+        на каждого врача.
+        """
+
+        by_doctor = defaultdict(list)
+        for index, consultation in enumerate(consultations):
+            if consultation is not None:
+                by_doctor[consultation.doctor_id].append(
+                    (consultation.start_time, consultation.end_time, index)
+                )
+        if not by_doctor:
+            return
+
+        condition = Q()
+        for doctor_id, intervals in by_doctor.items():
+            condition |= Q(
+                doctor_id=doctor_id,
+                timespan__overlap=DateTimeTZRange(
+                    min(start for start, _, _ in intervals),
+                    max(end for _, end, _ in intervals),
+                ),
+            )
+        updated_ids = {
+            consultation.pk
+            for consultation in consultations
+            if consultation is not None and consultation.pk is not None
+        }
+        stored = (
+            Consultation.objects.annotate(timespan=consultation_timespan())
+            .filter(condition)
+            .exclude(pk__in=updated_ids)
+            .values_list('doctor_id', 'start_time', 'end_time')
+        )
+        for doctor_id, start, end in stored:
+            by_doctor[doctor_id].append((start, end, None))
+
+        for intervals in by_doctor.values():
+            intervals.sort(key=lambda interval: interval[:2])
+            latest_end, latest_index = None, None
+            for start, end, index in intervals:
+                if latest_end is not None and start < latest_end:
+                    for conflict in (index, latest_index):
+                        if conflict is not None:
+                            errors[conflict] = {
+                                NON_FIELD_ERRORS: [OVERLAP_ERROR]
+                            }
+                if latest_end is None or end > latest_end:
+                    latest_end, latest_index = end, index
+
+        for index, error in enumerate(errors):
+            if error is not None:
+                consultations[index] = None
+
+    def save(self, consultations):
+        """
+        Сохраняет проверенный пакет в одной транзакции.
+        Возвращает списки созданных и обновлённых консультаций.
+        """
+
+        created = [item for item in consultations if item.pk is None]
+        updated = [item for item in consultations if item.pk is not None]
+        try:
+            with transaction.atomic():
+                Consultation.objects.bulk_create(created)
+                Consultation.objects.bulk_update(updated, BULK_UPDATE_FIELDS)
+                # Ограничение-исключение отложено: пакет проверяется
+                # целиком, а нарушение возникает здесь, а не при
+                # фиксации внешней транзакции.
+                connection.check_constraints()
+                # Статистика обновляется в той же транзакции.
+                consultations_bulk_saved.send(
+                    sender=Consultation, created=created, updated=updated
+                )
+        except IntegrityError as error:
+            pgcode = getattr(error.__cause__, 'pgcode', None)
+            if pgcode == errorcodes.EXCLUSION_VIOLATION:
+                raise BulkConflictError(OVERLAP_ERROR)
+            raise
+        return created, updated
@@ -0,0 +1,244 @@
+"""
+Версионирование закэшированных данных.
+
+Вместо поиска и удаления конкретных ключей каждая область кэша
+(например, расписание одного врача) имеет счётчик версии. Версия входит
+в ключи кэша, поэтому инвалидация — это один ``incr`` счётчика, а старые
+записи просто перестают читаться и вытесняются по TTL.
+"""
+
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from medical_service.replicas import (
+    replica_reads,
+    replica_reads_enabled,
+    replica_staleness,
+)
+
+VERSION_KEY_PREFIX = 'version'
+CHANGED_AT_KEY_PREFIX = 'changed_at'
+
+
+def version_key(scope):
+    return f'{VERSION_KEY_PREFIX}:{scope}'
+
+
+def get_version(scope):
+    """Возвращает текущую версию области кэша."""
+
+    key = version_key(scope)
+    version = cache.get(key)
+    if version is None:
+        # Начальное значение берётся из времени, чтобы после вытеснения
+        # счётчика версия не совпала с одной из уже использованных.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key, 0)
+    return version
+
+
+async def aget_version(scope):
+    """Асинхронный вариант ``get_version``."""
+
+    key = version_key(scope)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        version = await cache.aget(key, 0)
+    return version
+
+
+def get_versions(scopes):
+    """Текущие версии нескольких областей за одно обращение к кэшу."""
+
+    keys = {version_key(scope): scope for scope in scopes}
+    found = cache.get_many(keys)
+    return [
+        found[key] if key in found else get_version(scope)
+        for key, scope in keys.items()
+    ]
+
+
+async def aget_versions(scopes):
+    """Асинхронный вариант ``get_versions``."""
+
+    keys = {version_key(scope): scope for scope in scopes}
+    found = await cache.aget_many(keys)
+    return [
+        found[key] if key in found else await aget_version(scope)
+        for key, scope in keys.items()
+    ]
+
+
+def changed_at_key(scope):
+    return f'{CHANGED_AT_KEY_PREFIX}:{scope}'
+
+
+def bump_version(*scopes):
+    """Инвалидирует данные указанных областей кэша."""
+
+    for scope in scopes:
+        key = version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+    # Время изменения нужно, чтобы не кэшировать под новой версией
+    # данные, прочитанные с ещё не догнавшей реплики.
+    now = time.time()
+    cache.set_many(
+        {changed_at_key(scope): now for scope in scopes},
+        timeout=replica_staleness(),
+    )
+
+
+def changed_recently(scopes):
+    """Менялась ли хотя бы одна область за время возможного отставания."""
+
+    return bool(cache.get_many(map(changed_at_key, scopes)))
+
+
+async def achanged_recently(scopes):
+    """Асинхронный вариант ``changed_recently``."""
+
+    return bool(await cache.aget_many(map(changed_at_key, scopes)))
+
+
+def doctor_availability_scope(doctor_id):
+    return f'availability:doctor:{doctor_id}'
+
+
+# Все консультации: список администратора и пользователей без профиля.
+ALL_CONSULTATIONS_SCOPE = 'consultations:all'
+# Связанные данные, попадающие в ответ через ``expand``:
+# пользователи, профили врачей и пациентов, клиники.
+RELATED_DATA_SCOPE = 'consultations:related'
+
+
+def doctor_consultations_scope(doctor_id):
+    return f'consultations:doctor:{doctor_id}'
+
+
+def patient_consultations_scope(patient_id):
+    return f'consultations:patient:{patient_id}'
+
+
+def consultation_scope(consultation_id):
+    return f'consultation:{consultation_id}'
+
+
+def consultation_scopes(consultation):
+    """
+    Области кэша, затрагиваемые изменением консультации, включая
+    прежних врача и пациента, если консультация была переназначена.
+    """
+
+    scopes = {ALL_CONSULTATIONS_SCOPE, consultation_scope(consultation.pk)}
+    for field, scope in (
+        ('doctor_id', doctor_consultations_scope),
+        ('patient_id', patient_consultations_scope),
+    ):
+        values = {
+            getattr(consultation, field),
+            consultation.get_loaded_value(field),
+        }
+        values.discard(None)
+        scopes.update(map(scope, values))
+    return scopes
+
+
+class CachedResponseMixin:
+    """
+    Кэширование ответов ``list``/``retrieve`` с поддержкой ETag.
+
+    ETag вычисляется из URL запроса, формата ответа и версий областей
+    кэша пользователя, поэтому проверка ``If-None-Match`` не требует
+    ни SQL-запросов, ни сериализации. Одинаковый ETag гарантирует
+    одинаковое тело ответа, поэтому он используется и как ключ кэша.
+    """
+
+    response_cache_timeout = 5 * 60
+
+    def get_cache_scopes(self):
+        """Области кэша, от которых зависит ответ текущего действия."""
+
+        raise NotImplementedError
+
+    @staticmethod
+    def build_etag(request, scopes, versions):
+        parts = [
+            request.build_absolute_uri(),
+            request.accepted_renderer.format,
+            request.user.role,
+            *map('{}={}'.format, scopes, versions),
+        ]
+        digest = hashlib.sha256('\n'.join(parts).encode('utf-8'))
+        return quote_etag(digest.hexdigest())
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        scopes = sorted(self.get_cache_scopes())
+        etag = self.build_etag(request, scopes, get_versions(scopes))
+        if self.is_not_modified(request, etag):
+            return self.not_modified_response(etag)
+
+        key = f'response:{etag}'
+        data = cache.get(key)
+        if data is not None:
+            return Response(data, headers=self.get_cache_headers(etag))
+
+        # Ответ кэшируется под текущей версией, поэтому сразу после
+        # изменения он читается из основной базы, а не с реплики.
+        with replica_reads(
+            replica_reads_enabled() and not changed_recently(scopes)
+        ):
+            response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, self.response_cache_timeout)
+            self.add_cache_headers(response, etag)
+        return response
+
+    async def acached_response(self, handler, request, *args, **kwargs):
+        """Асинхронный вариант ``cached_response`` для async-обработчика."""
+
+        scopes = sorted(self.get_cache_scopes())
+        etag = self.build_etag(request, scopes, await aget_versions(scopes))
+        if self.is_not_modified(request, etag):
+            return self.not_modified_response(etag)
+
+        key = f'response:{etag}'
+        data = await cache.aget(key)
+        if data is not None:
+            return Response(data, headers=self.get_cache_headers(etag))
+
+        with replica_reads(
+            replica_reads_enabled() and not await achanged_recently(scopes)
+        ):
+            response = await handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            await cache.aset(key, response.data, self.response_cache_timeout)
+            self.add_cache_headers(response, etag)
+        return response
+
+    @staticmethod
+    def is_not_modified(request, etag):
+        if_none_match = request.headers.get('If-None-Match')
+        return bool(if_none_match) and etag in parse_etags(if_none_match)
+
+    @staticmethod
+    def get_cache_headers(etag):
+        return {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+
+    def not_modified_response(self, etag):
+        return Response(
+            status=status.HTTP_304_NOT_MODIFIED,
+            headers=self.get_cache_headers(etag),
+        )
+
+    def add_cache_headers(self, response, etag):
+        for header, value in self.get_cache_headers(etag).items():
+            response[header] = value
@@ -0,0 +1,233 @@
+"""
+События об изменении консультаций для подписчиков (см. поток
+``ConsultationEventsView``).
+
+После фиксации транзакции, в которой консультация создана, изменена
+или удалена, событие публикуется через брокер
+``CONSULTATION_EVENTS_BROKER``:
+
+- ``InMemoryBroker`` рассылает события подписчикам своего процесса
+  (для тестов и развёртывания в один процесс);
+- ``PostgresBroker`` публикует события через ``NOTIFY``, а каждый
+  процесс держит одно соединение с ``LISTEN`` и рассылает полученные
+  события своим подписчикам.
+
+Событие содержит представление консультации (для удалённой — только
+``id``) и врачей и пациентов, которым оно адресовано, включая прежних
+при переназначении: по ним поток ограничивает события так же, как
+``ConsultationViewSet.get_queryset``.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+import psycopg2
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils.module_loading import import_string
+
+from .serializers import ConsultationSerializer
+
+logger = logging.getLogger(__name__)
+
+CREATED = 'created'
+UPDATED = 'updated'
+DELETED = 'deleted'
+NOTIFY_CHANNEL = 'consultation_events'
+SUBSCRIPTION_QUEUE_SIZE = 1000
+
+
+def build_event(event_type, consultation):
+    """Событие об изменении консультации, готовое к JSON."""
+
+    if event_type == DELETED:
+        data = {'id': consultation.pk}
+    else:
+        data = ConsultationSerializer(consultation).data
+    audience = {}
+    for field, key in (('doctor_id', 'doctors'), ('patient_id', 'patients')):
+        values = {
+            getattr(consultation, field),
+            consultation.get_loaded_value(field),
+        }
+        values.discard(None)
+        audience[key] = sorted(values)
+    return {'event': event_type, 'data': data, **audience}
+
+
+def publish(event_type, *consultations, using=DEFAULT_DB_ALIAS):
+    """Публикует события после фиксации текущей транзакции."""
+
+    events = [
+        build_event(event_type, consultation) for consultation in consultations
+    ]
+    if events:
+        transaction.on_commit(
+            lambda: get_broker().publish(*events), using=using
+        )
+
+
+@lru_cache
+def load_broker(path):
+    return import_string(path)()
+
+
+def get_broker():
+    """Брокер событий процесса."""
+
+    return load_broker(settings.CONSULTATION_EVENTS_BROKER)
+
+
+class Subscription:
+    """Очередь событий одного подписчика в его цикле событий."""
+
+    closed = object()
+
+    def __init__(self, maxsize=SUBSCRIPTION_QUEUE_SIZE):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        event = await self.queue.get()
+        if event is self.closed:
+            raise StopAsyncIteration
+        return event
+
+    def push(self, event):
+        """Передаёт событие из любого потока."""
+
+        try:
+            self.loop.call_soon_threadsafe(self.put, event)
+        except RuntimeError:
+            # Цикл событий подписчика уже закрыт.
+            pass
+
+    def close(self):
+        self.push(self.closed)
+
+    def put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Подписчик не успевает читать: поток закрывается,
+            # и клиент переподключается.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(self.closed)
+
+
+class InMemoryBroker:
+    """Рассылает события подписчикам текущего процесса."""
+
+    def __init__(self):
+        self.subscriptions = set()
+        self.lock = threading.Lock()
+
+    def publish(self, *events):
+        self.fan_out(events)
+
+    def fan_out(self, events):
+        with self.lock:
+            subscriptions = list(self.subscriptions)
+        for subscription in subscriptions:
+            for event in events:
+                subscription.push(event)
+
+    @asynccontextmanager
+    async def subscribe(self):
+        """Подписка на события: асинхронный итератор событий."""
+
+        subscription = Subscription()
+        with self.lock:
+            self.subscriptions.add(subscription)
+        try:
+            await self.subscribed()
+            yield subscription
+        finally:
+            with self.lock:
+                self.subscriptions.discard(subscription)
+            await self.unsubscribed()
+
+    async def subscribed(self):
+        """Вызывается после добавления подписчика."""
+
+    async def unsubscribed(self):
+        """Вызывается после удаления подписчика."""
+
+
+class PostgresBroker(InMemoryBroker):
+    """
+    Брокер на ``LISTEN``/``NOTIFY`` PostgreSQL. Соединение с ``LISTEN``
+    открывается при первой подписке в процессе и закрывается
+    с последней; уведомления читаются в цикле событий без потоков.
+    """
+
+    using = DEFAULT_DB_ALIAS
+
+    def __init__(self):
+        super().__init__()
+        self.listener = None
+        self.listener_lock = asyncio.Lock()
+
+    def publish(self, *events):
+        with connections[self.using].cursor() as cursor:
+            for event in events:
+                cursor.execute(
+                    'SELECT pg_notify(%s, %s)',
+                    [NOTIFY_CHANNEL, json.dumps(event, ensure_ascii=False)],
+                )
+
+    async def subscribed(self):
+        async with self.listener_lock:
+            if self.listener is None:
+                loop = asyncio.get_running_loop()
+                self.listener = await loop.run_in_executor(None, self.listen)
+                loop.add_reader(self.listener.fileno(), self.read_notifies)
+
+    async def unsubscribed(self):
+        async with self.listener_lock:
+            with self.lock:
+                if self.subscriptions:
+                    return
+            self.stop_listening()
+
+    def listen(self):
+        params = connections[self.using].get_connection_params()
+        listener = psycopg2.connect(**params)
+        listener.autocommit = True
+        with listener.cursor() as cursor:
+            cursor.execute(f'LISTEN {NOTIFY_CHANNEL}')
+        return listener
+
+    def read_notifies(self):
+        try:
+            self.listener.poll()
+        except psycopg2.Error:
+            logger.warning('Соединение LISTEN потеряно.', exc_info=True)
+            self.stop_listening()
+            # Подписчики переподключатся и откроют соединение заново.
+            with self.lock:
+                subscriptions = list(self.subscriptions)
+            for subscription in subscriptions:
+                subscription.close()
+            return
+        events = []
+        while self.listener.notifies:
+            notify = self.listener.notifies.pop(0)
+            events.append(json.loads(notify.payload))
+        if events:
+            self.fan_out(events)
+
+    def stop_listening(self):
+        if self.listener is None:
+            return
+        asyncio.get_running_loop().remove_reader(self.listener.fileno())
+        self.listener.close()
+        self.listener = None
@@ -0,0 +1,41 @@
+"""Раскрытие связанных объектов консультации по параметру ``expand``."""
+
+EXPAND_QUERY_PARAM = 'expand'
+
+# Для каждого раскрываемого поля: связи для select_related
+# и prefetch_related, без которых сериализация ушла бы в N+1.
+EXPANSIONS = {
+    'doctor': (('doctor__user',), ()),
+    'patient': (('patient__user',), ()),
+    'clinics': (('doctor__user',), ('doctor__clinics',)),
+}
+
+
+def parse_expand(request):
+    """Возвращает множество запрошенных и поддерживаемых раскрытий."""
+
+    if request is None:
+        return frozenset()
+    value = request.query_params.get(EXPAND_QUERY_PARAM, '')
+    names = {name.strip() for name in value.split(',')}
+    return frozenset(names & EXPANSIONS.keys())
+
+
+def apply_expansions(queryset, expand):
+    """
+    Добавляет к выборке select_related/prefetch_related так, чтобы
+    число запросов не зависело от количества строк на странице.
+    """
+
+    select_related = set()
+    prefetch_related = set()
+    for name in expand:
+        select, prefetch = EXPANSIONS[name]
+        select_related.update(select)
+        prefetch_related.update(prefetch)
+
+    if select_related:
+        queryset = queryset.select_related(*sorted(select_related))
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*sorted(prefetch_related))
+    return queryset
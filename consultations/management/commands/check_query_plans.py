@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from consultations.query_plans import check_query_plans
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет EXPLAIN для запросов списка консультаций по всем '
+        'ролям, фильтрам и сортировкам и завершается ошибкой, если '
+        'в плане есть последовательное чтение консультаций или '
+        'сортировка.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Алиас базы данных для EXPLAIN.',
+        )
+        parser.add_argument(
+            '--planner-defaults',
+            action='store_true',
+            help='Не запрещать планировщику последовательное чтение '
+            'и сортировку (для базы с реальным объёмом данных).',
+        )
+
+    def handle(self, *args, **options):
+        failures = check_query_plans(
+            force_index=not options['planner_defaults'],
+            using=options['database'],
+        )
+        for name, problems in failures.items():
+            self.stderr.write(f'{name}: {"; ".join(problems)}')
+        if failures:
+            raise CommandError(
+                f'Запросов без подходящего индекса: {len(failures)}.'
+            )
+        self.stdout.write(
+            self.style.SUCCESS('Все запросы используют индексы.')
+        )
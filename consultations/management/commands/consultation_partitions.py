@@ -0,0 +1,81 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from consultations.partitions import (
+    ARCHIVE_SCHEMA,
+    PARTITIONS_AHEAD,
+    PartitionError,
+    add_months,
+    detach_partition,
+    ensure_partitions,
+    month_start,
+    partitions_before,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт помесячные секции таблицы консультаций на несколько '
+        'месяцев вперёд и отсоединяет или архивирует старые секции.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ahead',
+            type=int,
+            default=PARTITIONS_AHEAD,
+            help='На сколько месяцев вперёд создать секции.',
+        )
+        parser.add_argument(
+            '--detach-older-than',
+            type=int,
+            metavar='MONTHS',
+            help='Отсоединить секции месяцев старше указанного числа '
+            'месяцев.',
+        )
+        parser.add_argument(
+            '--archive',
+            action='store_true',
+            help=f'Перенести отсоединённые секции в схему {ARCHIVE_SCHEMA}.',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Отсоединять секции с незавершёнными консультациями.',
+        )
+
+    def handle(self, *args, **options):
+        if options['ahead'] < 0:
+            raise CommandError('--ahead не может быть отрицательным.')
+        current = month_start(timezone.now())
+
+        for name in ensure_partitions(
+            current, add_months(current, options['ahead'])
+        ):
+            self.stdout.write(f'Создана секция {name}.')
+
+        months = options['detach_older_than']
+        if months is None:
+            return
+        if months < 1:
+            raise CommandError('--detach-older-than должно быть больше 0.')
+
+        skipped = 0
+        for name in partitions_before(add_months(current, -months)).values():
+            try:
+                detach_partition(
+                    name, archive=options['archive'], force=options['force']
+                )
+            except PartitionError as error:
+                skipped += 1
+                self.stderr.write(self.style.WARNING(str(error)))
+                continue
+            if options['archive']:
+                self.stdout.write(f'Секция {name} перенесена в архив.')
+            else:
+                self.stdout.write(f'Секция {name} отсоединена.')
+        if skipped:
+            raise CommandError(
+                f'Не отсоединено секций: {skipped}. '
+                'Используйте --force, чтобы отсоединить их.'
+            )
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from consultations.stats import REBUILD_CHUNK_SIZE, rebuild_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает статистику консультаций с нуля порциями '
+        'по несколько врачей.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=REBUILD_CHUNK_SIZE,
+            help='Число врачей в одной порции.',
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('Размер порции должен быть положительным.')
+        self.verbosity = options['verbosity']
+        doctors = rebuild_stats(
+            chunk_size=options['chunk_size'], log=self.log_progress
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Статистика пересчитана для врачей: {doctors}.'
+            )
+        )
+
+    def log_progress(self, done):
+        if self.verbosity > 1:
+            self.stdout.write(f'Обработано врачей: {done}')
@@ -0,0 +1,75 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from consultations.reminders import (
+    REMINDER_BATCH_SIZE,
+    REMINDER_WINDOW,
+    ReminderScheduler,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет напоминания о консультациях, которые скоро начнутся. '
+        'Несколько запусков можно выполнять параллельно.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lead-hours',
+            type=int,
+            help=(
+                'За сколько часов до начала отправлять напоминания '
+                '(по умолчанию REMINDER_LEAD_TIME).'
+            ),
+        )
+        parser.add_argument(
+            '--window-minutes',
+            type=int,
+            default=int(REMINDER_WINDOW.total_seconds() // 60),
+            help='Ширина окна по времени начала консультаций.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=REMINDER_BATCH_SIZE,
+            help='Число консультаций в одной порции.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            help=(
+                'Повторять отправку каждые N секунд '
+                '(по умолчанию — один проход).'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        for option in ('lead_hours', 'window_minutes', 'batch_size'):
+            if options[option] is not None and options[option] < 1:
+                raise CommandError(
+                    f'Значение --{option.replace("_", "-")} должно быть '
+                    'положительным.'
+                )
+        if options['interval'] is not None and options['interval'] < 1:
+            raise CommandError('Интервал должен быть положительным.')
+
+        lead_time = (
+            timedelta(hours=options['lead_hours'])
+            if options['lead_hours']
+            else None
+        )
+        while True:
+            sent = ReminderScheduler(
+                lead_time=lead_time,
+                window=timedelta(minutes=options['window_minutes']),
+                batch_size=options['batch_size'],
+            ).run()
+            self.stdout.write(
+                self.style.SUCCESS(f'Отправлено напоминаний: {sent}.')
+            )
+            if options['interval'] is None:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.6 on 2026-10-17 01:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consultations', '0002_initial'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='consultation',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, verbose_name='Дата создания консультации'),
+        ),
+        migrations.AddIndex(
+            model_name='consultation',
+            index=models.Index(fields=['created_at', 'id'], name='consult_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consultation',
+            index=models.Index(fields=['doctor', 'created_at', 'id'], name='consult_doctor_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consultation',
+            index=models.Index(fields=['patient', 'created_at', 'id'], name='consult_patient_created_idx'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.1.6 on 2026-10-17 01:57
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+def build_search_name(user):
+    parts = (user.last_name, user.first_name, user.patronymic)
+    name = ' '.join(part for part in parts if part)
+    return ' '.join(name.lower().replace('ё', 'е').split())
+
+
+def fill_search_names(apps, schema_editor):
+    Consultation = apps.get_model('consultations', 'Consultation')
+    Doctor = apps.get_model('users', 'Doctor')
+    Patient = apps.get_model('users', 'Patient')
+
+    for doctor in Doctor.objects.select_related('user').iterator():
+        Consultation.objects.filter(doctor_id=doctor.pk).update(
+            doctor_search_name=build_search_name(doctor.user)
+        )
+    for patient in Patient.objects.select_related('user').iterator():
+        Consultation.objects.filter(patient_id=patient.pk).update(
+            patient_search_name=build_search_name(patient.user)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consultations', '0003_consultation_keyset_indexes'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='consultation',
+            name='doctor_search_name',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='ФИО врача для поиска'),
+        ),
+        migrations.AddField(
+            model_name='consultation',
+            name='patient_search_name',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='ФИО пациента для поиска'),
+        ),
+        migrations.RunPython(fill_search_names, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='consultation',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['doctor_search_name'], name='consult_doctor_search_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='consultation',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['patient_search_name'], name='consult_patient_search_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.6 on 2026-10-17 01:58
+
+import consultations.models
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consultations', '0004_consultation_search_names'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.RemoveConstraint(
+            model_name='consultation',
+            name='unique_doctor_consultation_time',
+        ),
+        migrations.AddConstraint(
+            model_name='consultation',
+            constraint=models.CheckConstraint(condition=models.Q(('start_time__lt', models.F('end_time'))), name='consultation_start_before_end', violation_error_message='Время начала должно быть раньше времени окончания.'),
+        ),
+        migrations.AddConstraint(
+            model_name='consultation',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(expressions=((consultations.models.TsTzRange('start_time', 'end_time', django.contrib.postgres.fields.ranges.RangeBoundary()), '&&'), ('doctor', '=')), name='exclude_doctor_overlapping_consultations', violation_error_message='У врача уже есть консультация в это время.'),
+        ),
+    ]
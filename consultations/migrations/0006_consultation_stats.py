@@ -0,0 +1,31 @@
+# Generated by Django 5.1.6 on 2026-10-17 02:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consultations', '0005_consultation_no_overlap'),
+        ('users', '0003_customuser_token_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConsultationStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='День приема')),
+                ('status', models.CharField(choices=[('Confirmed', 'Подтверждена'), ('Waiting', 'Ожидает'), ('Started', 'Начата'), ('Finished', 'Завершена'), ('Paid', 'Оплачена')], max_length=15, verbose_name='Статус консультации')),
+                ('count', models.IntegerField(default=0, verbose_name='Число консультаций')),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='consultation_stats', to='users.doctor', verbose_name='Врач')),
+            ],
+            options={
+                'verbose_name': 'Статистика консультаций',
+                'verbose_name_plural': 'Статистика консультаций',
+                'indexes': [models.Index(fields=['day'], name='consult_stats_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('doctor', 'day', 'status'), name='consult_stats_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,203 @@
+from datetime import date, datetime
+from datetime import timezone as dt_timezone
+
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.db import migrations
+from django.utils import timezone
+
+# Миграция не зависит от кода приложения: помощники секционирования
+# повторены здесь в виде на момент миграции.
+PARTITIONS_AHEAD = 3
+OVERLAP_CONSTRAINT_SQL = (
+    'ALTER TABLE {table} ADD CONSTRAINT {name} EXCLUDE USING gist '
+    "(TSTZRANGE(start_time, end_time, '[)') WITH &&, doctor_id WITH =)"
+)
+FK_SUFFIX = '_fk_%(to_table)s_%(to_column)s'
+
+
+def month_start(value):
+    if isinstance(value, datetime):
+        value = value.astimezone(dt_timezone.utc).date()
+    return value.replace(day=1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def add_overlap_constraint(cursor, quote, table):
+    cursor.execute(
+        OVERLAP_CONSTRAINT_SQL.format(
+            table=quote(table), name=quote(f'{table}_no_overlap')
+        )
+    )
+
+
+def create_empty_partition(cursor, quote, table, month):
+    name = f'{table}_y{month.year:04d}m{month.month:02d}'
+    bounds = [
+        datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+        for value in (month, add_months(month, 1))
+    ]
+    cursor.execute(
+        f'CREATE TABLE {quote(name)} PARTITION OF {quote(table)} '
+        f'FOR VALUES FROM (%s) TO (%s)',
+        bounds,
+    )
+    add_overlap_constraint(cursor, quote, name)
+
+
+def create_default_partition(cursor, quote, table):
+    name = f'{table}_default'
+    cursor.execute(
+        f'CREATE TABLE {quote(name)} PARTITION OF {quote(table)} DEFAULT'
+    )
+    add_overlap_constraint(cursor, quote, name)
+
+
+def partition_consultations(apps, schema_editor):
+    """
+    Пересоздаёт таблицу консультаций секционированной по месяцам
+    ``start_time`` и переносит в неё данные. Индексы и ограничения
+    создаются после переноса данных.
+    """
+
+    model = apps.get_model('consultations', 'Consultation')
+    quote = schema_editor.quote_name
+    table = model._meta.db_table
+    old_table = f'{table}_unpartitioned'
+    sequence = f'{table}_id_seq'
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE {quote(table)} RENAME TO {quote(old_table)}')
+        cursor.execute(
+            f'CREATE TABLE {quote(table)} (LIKE {quote(old_table)}) '
+            f'PARTITION BY RANGE (start_time)'
+        )
+
+        cursor.execute(f'SELECT MIN(start_time) FROM {quote(old_table)}')
+        (first_start,) = cursor.fetchone()
+        current = month_start(timezone.now())
+        month = min(month_start(first_start or current), current)
+        while month <= add_months(current, PARTITIONS_AHEAD):
+            create_empty_partition(cursor, quote, table, month)
+            month = add_months(month, 1)
+        create_default_partition(cursor, quote, table)
+
+        cursor.execute(
+            f'INSERT INTO {quote(table)} SELECT * FROM {quote(old_table)}'
+        )
+        cursor.execute(f'DROP TABLE {quote(old_table)}')
+
+        # Столбец идентичности не поддерживается секционированными
+        # таблицами во всех версиях PostgreSQL, поэтому id берётся
+        # из последовательности, принадлежащей столбцу.
+        cursor.execute(
+            f'CREATE SEQUENCE {quote(sequence)} OWNED BY {quote(table)}.id'
+        )
+        cursor.execute(
+            f'ALTER TABLE {quote(table)} '
+            f'ALTER COLUMN id SET DEFAULT nextval(%s::regclass)',
+            [sequence],
+        )
+        cursor.execute(
+            f'SELECT setval(%s, COALESCE(MAX(id), 0) + 1, false) '
+            f'FROM {quote(table)}',
+            [sequence],
+        )
+        cursor.execute(
+            f'ALTER TABLE {quote(table)} ADD CONSTRAINT '
+            f'{quote(f"{table}_pkey")} PRIMARY KEY (id, start_time)'
+        )
+
+    for sql in schema_editor._model_indexes_sql(model):
+        schema_editor.execute(sql)
+    for name in ('doctor', 'patient'):
+        field = model._meta.get_field(name)
+        schema_editor.execute(
+            schema_editor._create_fk_sql(model, field, FK_SUFFIX)
+        )
+    # Ограничение-исключение создано в каждой секции.
+    for constraint in model._meta.constraints:
+        if not isinstance(constraint, ExclusionConstraint):
+            schema_editor.add_constraint(model, constraint)
+
+
+def unpartition_consultations(apps, schema_editor):
+    """Возвращает обычную таблицу консультаций с теми же данными."""
+
+    model = apps.get_model('consultations', 'Consultation')
+    quote = schema_editor.quote_name
+    table = model._meta.db_table
+    partitioned = f'{table}_partitioned'
+    columns = ', '.join(
+        quote(field.column) for field in model._meta.local_fields
+    )
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f'ALTER TABLE {quote(table)} RENAME TO {quote(partitioned)}'
+        )
+        cursor.execute(
+            f'ALTER SEQUENCE {quote(f"{table}_id_seq")} '
+            f'RENAME TO {quote(f"{partitioned}_id_seq")}'
+        )
+        # Имена индексов и ограничений освобождаются для новой таблицы.
+        cursor.execute(
+            "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass "
+            "AND contype IN ('p', 'f', 'c')",
+            [partitioned],
+        )
+        for (name,) in cursor.fetchall():
+            cursor.execute(
+                f'ALTER TABLE {quote(partitioned)} '
+                f'DROP CONSTRAINT {quote(name)}'
+            )
+        cursor.execute(
+            'SELECT indexrelid::regclass::text FROM pg_index '
+            'WHERE indrelid = %s::regclass',
+            [partitioned],
+        )
+        for (name,) in cursor.fetchall():
+            cursor.execute(f'DROP INDEX {name}')
+
+    schema_editor.create_model(model)
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote(table)} ({columns}) '
+            f'SELECT {columns} FROM {quote(partitioned)}'
+        )
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+            f'COALESCE(MAX(id), 0) + 1, false) FROM {quote(table)}',
+            [table],
+        )
+        cursor.execute(f'DROP TABLE {quote(partitioned)} CASCADE')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consultations', '0006_consultation_stats'),
+    ]
+
+    operations = [
+        # Ограничение-исключение создаётся в каждой секции, а не на
+        # секционированной таблице, поэтому из состояния модели оно
+        # удаляется без изменения схемы.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(
+                    partition_consultations, unpartition_consultations
+                ),
+            ],
+            state_operations=[
+                migrations.RemoveConstraint(
+                    model_name='consultation',
+                    name='exclude_doctor_overlapping_consultations',
+                ),
+            ],
+        ),
+    ]
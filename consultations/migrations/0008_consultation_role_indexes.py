@@ -0,0 +1,37 @@
+# Generated by Django 5.1.6 on 2026-10-17 02:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consultations', '0007_partition_consultations'),
+        ('users', '0003_customuser_token_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='consultation',
+            name='doctor',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='doctor_consultations', to='users.doctor', verbose_name='Врач'),
+        ),
+        migrations.AlterField(
+            model_name='consultation',
+            name='patient',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='patient_consultations', to='users.patient', verbose_name='Пациент'),
+        ),
+        migrations.AddIndex(
+            model_name='consultation',
+            index=models.Index(condition=models.Q(('status__in', ('Waiting', 'Confirmed', 'Started'))), fields=['status', 'created_at', 'id'], name='consult_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consultation',
+            index=models.Index(condition=models.Q(('status__in', ('Waiting', 'Confirmed', 'Started'))), fields=['doctor', 'status', 'created_at', 'id'], name='consult_doctor_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consultation',
+            index=models.Index(condition=models.Q(('status__in', ('Waiting', 'Confirmed', 'Started'))), fields=['patient', 'status', 'created_at', 'id'], name='consult_patient_active_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.6 on 2026-10-17 03:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consultations', '0008_consultation_role_indexes'),
+        ('users', '0004_customuser_name_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConsultationReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel', models.CharField(choices=[('email', 'E-mail'), ('sms', 'SMS')], max_length=10, verbose_name='Канал')),
+                ('recipient', models.CharField(max_length=254, verbose_name='Получатель')),
+                ('sent_at', models.DateTimeField(auto_now_add=True, verbose_name='Время отправки')),
+            ],
+            options={
+                'verbose_name': 'Напоминание о консультации',
+                'verbose_name_plural': 'Напоминания о консультациях',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='consultation',
+            index=models.Index(condition=models.Q(('status__in', ('Waiting', 'Confirmed'))), fields=['start_time', 'id'], name='consult_reminder_due_idx'),
+        ),
+        migrations.AddField(
+            model_name='consultationreminder',
+            name='consultation',
+            field=models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='consultations.consultation', verbose_name='Консультация'),
+        ),
+        migrations.AddConstraint(
+            model_name='consultationreminder',
+            constraint=models.UniqueConstraint(fields=('consultation', 'channel'), name='consult_reminder_unique'),
+        ),
+    ]
@@ -0,0 +1,130 @@
+# Generated by Django 5.1.6 on 2026-10-17 03:22
+
+from django.db import migrations, models
+
+# Номер транзакции (xid8) как bigint: номера возрастают и не
+# переполняются.
+CURRENT_XID = 'pg_current_xact_id()::text::bigint'
+
+# Изменения не отслеживаются, например, при переносе строк между
+# секциями (см. consultations.partitions.create_partition).
+TRACKING_OFF = "current_setting('consultations.track_changes', true) = 'off'"
+
+CREATE_TRIGGERS_SQL = f"""
+UPDATE consultations_consultation SET updated_at = created_at;
+
+CREATE FUNCTION consultations_track_change() RETURNS trigger AS $$
+BEGIN
+    IF {TRACKING_OFF} THEN
+        RETURN NEW;
+    END IF;
+    NEW.sync_xid := {CURRENT_XID};
+    NEW.updated_at := now();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION consultations_record_tombstone() RETURNS trigger AS $$
+BEGIN
+    IF {TRACKING_OFF} THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO consultations_consultationtombstone
+            (consultation_id, doctor_id, patient_id, reassigned,
+             sync_xid, deleted_at)
+        VALUES
+            (OLD.id, OLD.doctor_id, OLD.patient_id, false,
+             {CURRENT_XID}, now());
+    ELSIF NEW.doctor_id IS DISTINCT FROM OLD.doctor_id
+            OR NEW.patient_id IS DISTINCT FROM OLD.patient_id THEN
+        INSERT INTO consultations_consultationtombstone
+            (consultation_id, doctor_id, patient_id, reassigned,
+             sync_xid, deleted_at)
+        VALUES
+            (OLD.id, NULLIF(OLD.doctor_id, NEW.doctor_id),
+             NULLIF(OLD.patient_id, NEW.patient_id), true,
+             {CURRENT_XID}, now());
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER consultations_track_change
+    BEFORE INSERT OR UPDATE ON consultations_consultation
+    FOR EACH ROW EXECUTE FUNCTION consultations_track_change();
+
+CREATE TRIGGER consultations_record_tombstone
+    AFTER DELETE OR UPDATE OF doctor_id, patient_id
+    ON consultations_consultation
+    FOR EACH ROW EXECUTE FUNCTION consultations_record_tombstone();
+"""
+
+DROP_TRIGGERS_SQL = """
+DROP TRIGGER consultations_record_tombstone ON consultations_consultation;
+DROP TRIGGER consultations_track_change ON consultations_consultation;
+DROP FUNCTION consultations_record_tombstone();
+DROP FUNCTION consultations_track_change();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consultations', '0009_consultation_reminders'),
+        ('users', '0004_customuser_name_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConsultationTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('consultation_id', models.BigIntegerField(verbose_name='Консультация')),
+                ('doctor_id', models.BigIntegerField(null=True, verbose_name='Врач')),
+                ('patient_id', models.BigIntegerField(null=True, verbose_name='Пациент')),
+                ('reassigned', models.BooleanField(default=False, verbose_name='Переназначение')),
+                ('sync_xid', models.BigIntegerField(verbose_name='Транзакция удаления')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, verbose_name='Время удаления')),
+            ],
+            options={
+                'verbose_name': 'Удалённая консультация',
+                'verbose_name_plural': 'Удалённые консультации',
+            },
+        ),
+        migrations.AddField(
+            model_name='consultation',
+            name='sync_xid',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Транзакция изменения'),
+        ),
+        migrations.AddField(
+            model_name='consultation',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата изменения консультации'),
+        ),
+        migrations.AddIndex(
+            model_name='consultation',
+            index=models.Index(fields=['sync_xid', 'id'], name='consult_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consultation',
+            index=models.Index(fields=['doctor', 'sync_xid', 'id'], name='consult_doctor_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consultation',
+            index=models.Index(fields=['patient', 'sync_xid', 'id'], name='consult_patient_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consultationtombstone',
+            index=models.Index(condition=models.Q(('reassigned', False)), fields=['sync_xid', 'id'], name='consult_tomb_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consultationtombstone',
+            index=models.Index(condition=models.Q(('doctor_id__isnull', False)), fields=['doctor_id', 'sync_xid', 'id'], name='consult_tomb_doctor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consultationtombstone',
+            index=models.Index(condition=models.Q(('patient_id__isnull', False)), fields=['patient_id', 'sync_xid', 'id'], name='consult_tomb_patient_idx'),
+        ),
+        migrations.RunSQL(CREATE_TRIGGERS_SQL, DROP_TRIGGERS_SQL),
+    ]
@@ -0,0 +1,50 @@
+from django.db import migrations
+
+OVERLAP_EXCLUSION = (
+    "EXCLUDE USING gist (TSTZRANGE(start_time, end_time, ''[)'') WITH &&, "
+    'doctor_id WITH =)'
+)
+
+
+def recreate_overlap_constraints(deferrable):
+    """
+    SQL, пересоздающий ограничения-исключения в секциях консультаций.
+    Изменить отложенность ограничения-исключения через ``ALTER
+    CONSTRAINT`` нельзя.
+    """
+
+    mode = ' DEFERRABLE INITIALLY DEFERRED' if deferrable else ''
+    return f"""
+DO $$
+DECLARE
+    partition name;
+BEGIN
+    FOR partition IN
+        SELECT child.relname FROM pg_inherits
+        JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = 'consultations_consultation'::regclass
+    LOOP
+        EXECUTE format(
+            'ALTER TABLE %1$I DROP CONSTRAINT %2$I, '
+            'ADD CONSTRAINT %2$I {OVERLAP_EXCLUSION}{mode}',
+            partition,
+            partition || '_no_overlap'
+        );
+    END LOOP;
+END;
+$$;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consultations', '0010_consultation_sync'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            recreate_overlap_constraints(deferrable=True),
+            recreate_overlap_constraints(deferrable=False),
+        ),
+    ]
@@ -0,0 +1,86 @@
+from django.db import migrations
+
+# Проверки сериализуются рекомендательными блокировками транзакции:
+# (пространство ключей, хэш значения).
+OVERLAP_LOCK = "hashtext('consultations.doctor')"
+ID_LOCK = "hashtext('consultations.id')"
+
+CREATE_TRIGGERS_SQL = f"""
+CREATE FUNCTION consultations_check_overlap() RETURNS trigger AS $$
+BEGIN
+    -- Строка изменена позже в той же транзакции: её проверит
+    -- событие последнего изменения.
+    IF NOT EXISTS (
+        SELECT 1 FROM consultations_consultation
+        WHERE id = NEW.id
+            AND start_time = NEW.start_time
+            AND end_time = NEW.end_time
+            AND doctor_id = NEW.doctor_id
+    ) THEN
+        RETURN NULL;
+    END IF;
+    -- После блокировки запрос видит консультации врача, которые
+    -- зафиксировали параллельные транзакции.
+    PERFORM pg_advisory_xact_lock(
+        {OVERLAP_LOCK}, hashtext(NEW.doctor_id::text)
+    );
+    IF EXISTS (
+        SELECT 1 FROM consultations_consultation
+        WHERE doctor_id = NEW.doctor_id
+            AND id <> NEW.id
+            AND TSTZRANGE(start_time, end_time, '[)')
+                && TSTZRANGE(NEW.start_time, NEW.end_time, '[)')
+    ) THEN
+        RAISE EXCEPTION 'Консультация % пересекается с другой '
+            'консультацией врача %.', NEW.id, NEW.doctor_id
+            USING ERRCODE = 'exclusion_violation',
+                CONSTRAINT = 'consultations_no_overlap';
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION consultations_check_unique_id() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock({ID_LOCK}, hashtext(NEW.id::text));
+    IF (
+        SELECT count(*) FROM consultations_consultation WHERE id = NEW.id
+    ) > 1 THEN
+        RAISE EXCEPTION 'Консультация % уже существует.', NEW.id
+            USING ERRCODE = 'unique_violation',
+                CONSTRAINT = 'consultations_unique_id';
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE CONSTRAINT TRIGGER consultations_no_overlap
+    AFTER INSERT OR UPDATE OF start_time, end_time, doctor_id
+    ON consultations_consultation
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION consultations_check_overlap();
+
+CREATE CONSTRAINT TRIGGER consultations_unique_id
+    AFTER INSERT OR UPDATE OF id
+    ON consultations_consultation
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION consultations_check_unique_id();
+"""
+
+DROP_TRIGGERS_SQL = """
+DROP TRIGGER consultations_unique_id ON consultations_consultation;
+DROP TRIGGER consultations_no_overlap ON consultations_consultation;
+DROP FUNCTION consultations_check_unique_id();
+DROP FUNCTION consultations_check_overlap();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consultations', '0011_deferrable_overlap_constraints'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_TRIGGERS_SQL, DROP_TRIGGERS_SQL),
+    ]
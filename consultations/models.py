@@ -1,9 +1,64 @@
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.fields import DateTimeRangeField, RangeBoundary
+from django.contrib.postgres.indexes import GinIndex
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, router, transaction
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+from django.db.models.signals import post_save
+
+from .search import SEARCH_NAME_FIELDS, build_search_name
 
 User = get_user_model()
 
+OVERLAP_ERROR = 'У врача уже есть консультация в это время.'
+# Поля, от которых зависят денормализованные ФИО.
+PARTICIPANT_FIELDS = {'doctor', 'doctor_id', 'patient', 'patient_id'}
+STATUS_CONFLICT_ERROR = 'Статус консультации уже изменён.'
+# Статусы незавершённых консультаций. Рабочие списки врачей, пациентов
+# и администраторов фильтруют по ним, поэтому для них построены
+# частичные индексы: завершённые консультации составляют большую часть
+# таблицы и в эти индексы не попадают.
+ACTIVE_STATUSES = ('Waiting', 'Confirmed', 'Started')
+# Статусы консультаций, о которых отправляются напоминания.
+REMINDER_STATUSES = ('Waiting', 'Confirmed')
+
+
+class InvalidStatusTransition(Exception):
+    """Переход в этот статус из текущего не разрешён."""
+
+
+class StatusConflict(Exception):
+    """Статус консультации изменился после того, как её прочитали."""
+
+
+class TsTzRange(models.Func):
+    """Интервал времени ``tstzrange(start, end, '[)')``."""
+
+    function = 'TSTZRANGE'
+    output_field = DateTimeRangeField()
+
+
+def consultation_timespan():
+    """Выражение интервала консультации, совпадающее с индексом GiST."""
+
+    return TsTzRange('start_time', 'end_time', RangeBoundary())
+
+
+class ConsultationQuerySet(models.QuerySet):
+    """QuerySet консультаций."""
+
+    def overlapping(self, doctor, start_time, end_time):
+        """
+        Консультации врача, пересекающиеся с интервалом
+        ``[start_time, end_time)``. Запрос использует тот же GiST-индекс,
+        что и ограничение-исключение.
+        """
+
+        return self.annotate(timespan=consultation_timespan()).filter(
+            doctor=doctor,
+            timespan__overlap=DateTimeTZRange(start_time, end_time),
+        )
+
 
 class Consultation(models.Model):
     """Модель консультации на прием к врачу."""
@@ -15,10 +70,24 @@ class Consultation(models.Model):
         FINISHED = 'Finished', 'Завершена'
         PAID = 'Paid', 'Оплачена'
 
+    # Разрешённые переходы: статус -> следующие статусы.
+    STATUS_TRANSITIONS = {
+        Status.WAITING: (Status.CONFIRMED,),
+        Status.CONFIRMED: (Status.STARTED,),
+        Status.STARTED: (Status.FINISHED,),
+        Status.FINISHED: (Status.PAID,),
+        Status.PAID: (),
+    }
+
     created_at = models.DateTimeField(
         'Дата создания консультации',
         auto_now_add=True,
-        db_index=True,
+    )
+    # При изменении запросом ``update()`` дату обновляет триггер
+    # (см. ``sync``).
+    updated_at = models.DateTimeField(
+        'Дата изменения консультации',
+        auto_now=True,
     )
     start_time = models.DateTimeField('Время начала приема', db_index=True)
     end_time = models.DateTimeField('Время окончания приема')
@@ -33,28 +102,215 @@ class Consultation(models.Model):
         verbose_name='Врач',
         on_delete=models.CASCADE,
         related_name='doctor_consultations',
+        # Поиск по врачу обслуживает составной индекс с ``doctor``.
+        db_index=False,
     )
     patient = models.ForeignKey(
         'users.Patient',
         verbose_name='Пациент',
         on_delete=models.CASCADE,
         related_name='patient_consultations',
+        # Поиск по пациенту обслуживает составной индекс с ``patient``.
+        db_index=False,
+    )
+    doctor_search_name = models.TextField(
+        'ФИО врача для поиска',
+        blank=True,
+        default='',
+        editable=False,
+    )
+    patient_search_name = models.TextField(
+        'ФИО пациента для поиска',
+        blank=True,
+        default='',
+        editable=False,
     )
+    # Транзакция последнего изменения; заполняется триггером
+    # для ленты изменений (см. ``sync``).
+    sync_xid = models.BigIntegerField(
+        'Транзакция изменения', default=0, editable=False
+    )
+
+    objects = ConsultationQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Консультация'
         verbose_name_plural = 'Консультации'
         ordering = ('-created_at',)
+        indexes = (
+            models.Index(
+                fields=['created_at', 'id'],
+                name='consult_created_idx',
+            ),
+            models.Index(
+                fields=['doctor', 'created_at', 'id'],
+                name='consult_doctor_created_idx',
+            ),
+            models.Index(
+                fields=['patient', 'created_at', 'id'],
+                name='consult_patient_created_idx',
+            ),
+            models.Index(
+                fields=['status', 'created_at', 'id'],
+                name='consult_active_created_idx',
+                condition=models.Q(status__in=ACTIVE_STATUSES),
+            ),
+            models.Index(
+                fields=['doctor', 'status', 'created_at', 'id'],
+                name='consult_doctor_active_idx',
+                condition=models.Q(status__in=ACTIVE_STATUSES),
+            ),
+            models.Index(
+                fields=['patient', 'status', 'created_at', 'id'],
+                name='consult_patient_active_idx',
+                condition=models.Q(status__in=ACTIVE_STATUSES),
+            ),
+            # Лента изменений (см. ``sync``).
+            models.Index(
+                fields=['sync_xid', 'id'],
+                name='consult_sync_idx',
+            ),
+            models.Index(
+                fields=['doctor', 'sync_xid', 'id'],
+                name='consult_doctor_sync_idx',
+            ),
+            models.Index(
+                fields=['patient', 'sync_xid', 'id'],
+                name='consult_patient_sync_idx',
+            ),
+            # Планировщик напоминаний проходит консультации окнами
+            # по времени начала (см. ``reminders``).
+            models.Index(
+                fields=['start_time', 'id'],
+                name='consult_reminder_due_idx',
+                condition=models.Q(status__in=REMINDER_STATUSES),
+            ),
+            GinIndex(
+                fields=['doctor_search_name'],
+                name='consult_doctor_search_idx',
+                opclasses=['gin_trgm_ops'],
+            ),
+            GinIndex(
+                fields=['patient_search_name'],
+                name='consult_patient_search_idx',
+                opclasses=['gin_trgm_ops'],
+            ),
+        )
+        # Пересечения консультаций врача запрещают ограничения-исключения
+        # секций и триггер ``consultations_no_overlap``, который проверяет
+        # все секции (см. ``partitions``).
         constraints = (
-            models.UniqueConstraint(
-                fields=['doctor', 'start_time'],
-                name='unique_doctor_consultation_time',
+            models.CheckConstraint(
+                condition=models.Q(start_time__lt=models.F('end_time')),
+                name='consultation_start_before_end',
+                violation_error_message=(
+                    'Время начала должно быть раньше времени окончания.'
+                ),
             ),
         )
 
     def __str__(self):
         return f'Консультация {self.id} со статусом {self.status}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Значения на момент загрузки нужны обработчикам сигналов,
+        # чтобы инвалидировать данные и прежнего врача/пациента.
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def get_loaded_value(self, field):
+        """Значение поля на момент загрузки из базы данных."""
+
+        return getattr(self, '_loaded_values', {}).get(field)
+
+    @classmethod
+    def can_transition(cls, old_status, new_status):
+        return new_status in cls.STATUS_TRANSITIONS.get(old_status, ())
+
+    def transition_to(self, status):
+        """
+        Переводит консультацию в следующий статус одним условным
+        ``UPDATE ... WHERE id = ... AND status = <текущий статус>``.
+
+        Если статус успел измениться параллельно, строка не обновляется
+        и возникает ``StatusConflict``. После перехода в той же
+        транзакции отправляется ``post_save`` с
+        ``update_fields={'status'}``.
+        """
+
+        if not self.can_transition(self.status, status):
+            raise InvalidStatusTransition(
+                f'Переход из статуса {self.status} в {status} не разрешён.'
+            )
+        using = router.db_for_write(Consultation, instance=self)
+        old_status = self.status
+        # Переход и обработчики post_save фиксируются вместе. Без
+        # точки сохранения: конфликт не ошибка базы данных и внешнюю
+        # транзакцию не помечает для отката.
+        with transaction.atomic(using=using, savepoint=False):
+            updated = (
+                Consultation.objects.using(using)
+                .filter(pk=self.pk, status=old_status)
+                .update(status=status)
+            )
+            if updated:
+                self.status = status
+                try:
+                    post_save.send(
+                        sender=Consultation,
+                        instance=self,
+                        created=False,
+                        update_fields=frozenset({'status'}),
+                        raw=False,
+                        using=using,
+                    )
+                except Exception:
+                    self.status = old_status
+                    raise
+        if not updated:
+            raise StatusConflict(STATUS_CONFLICT_ERROR)
+        self._state.db = using
+        if hasattr(self, '_loaded_values'):
+            self._loaded_values['status'] = status
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        saves_participants = update_fields is None or bool(
+            PARTICIPANT_FIELDS & set(update_fields)
+        )
+        if saves_participants and self.participants_changed():
+            self.refresh_search_names()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, *SEARCH_NAME_FIELDS}
+        using = kwargs.get('using') or router.db_for_write(
+            Consultation, instance=self
+        )
+        # post_save (статистика, события) выполняется в транзакции
+        # записи, а не после её фиксации.
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+
+    def participants_changed(self):
+        """
+        Новая ли консультация или сменились ли её врач или пациент
+        с момента загрузки. Только тогда нужно пересчитать ФИО.
+        """
+
+        if self._state.adding:
+            return True
+        return any(
+            getattr(self, field) != self.get_loaded_value(field)
+            for field in ('doctor_id', 'patient_id')
+        )
+
+    def refresh_search_names(self):
+        """Обновляет денормализованные ФИО врача и пациента."""
+
+        self.doctor_search_name = build_search_name(self.doctor.user)
+        self.patient_search_name = build_search_name(self.patient.user)
+
     def clean(self):
         super().clean()
 
@@ -77,3 +333,133 @@ class Consultation(models.Model):
             raise ValidationError(
                 'Доктор и пациент не могут быть одним и тем же человеком.'
             )
+
+        if (
+            self.start_time
+            and self.end_time
+            and Consultation.objects.overlapping(
+                self.doctor, self.start_time, self.end_time
+            )
+            .exclude(pk=self.pk)
+            .exists()
+        ):
+            raise ValidationError(OVERLAP_ERROR)
+
+
+class ConsultationStats(models.Model):
+    """
+    Число консультаций врача за день по статусам. Обновляется
+    при сохранении и удалении консультаций (см. ``stats``).
+    """
+
+    doctor = models.ForeignKey(
+        'users.Doctor',
+        verbose_name='Врач',
+        on_delete=models.CASCADE,
+        related_name='consultation_stats',
+    )
+    day = models.DateField('День приема')
+    status = models.CharField(
+        'Статус консультации',
+        max_length=15,
+        choices=Consultation.Status.choices,
+    )
+    count = models.IntegerField('Число консультаций', default=0)
+
+    class Meta:
+        verbose_name = 'Статистика консультаций'
+        verbose_name_plural = 'Статистика консультаций'
+        indexes = (
+            models.Index(fields=['day'], name='consult_stats_day_idx'),
+        )
+        constraints = (
+            models.UniqueConstraint(
+                fields=['doctor', 'day', 'status'],
+                name='consult_stats_unique',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.doctor_id} {self.day} {self.status}: {self.count}'
+
+
+class ConsultationTombstone(models.Model):
+    """
+    Удаление консультации для ленты изменений. Записи создаёт триггер
+    при удалении консультации, а также при переназначении другому
+    врачу или пациенту: тогда запись адресована только прежнему
+    врачу или пациенту (см. ``sync``).
+    """
+
+    consultation_id = models.BigIntegerField('Консультация')
+    doctor_id = models.BigIntegerField('Врач', null=True)
+    patient_id = models.BigIntegerField('Пациент', null=True)
+    reassigned = models.BooleanField('Переназначение', default=False)
+    sync_xid = models.BigIntegerField('Транзакция удаления')
+    deleted_at = models.DateTimeField('Время удаления', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Удалённая консультация'
+        verbose_name_plural = 'Удалённые консультации'
+        indexes = (
+            models.Index(
+                fields=['sync_xid', 'id'],
+                name='consult_tomb_sync_idx',
+                condition=models.Q(reassigned=False),
+            ),
+            models.Index(
+                fields=['doctor_id', 'sync_xid', 'id'],
+                name='consult_tomb_doctor_idx',
+                condition=models.Q(doctor_id__isnull=False),
+            ),
+            models.Index(
+                fields=['patient_id', 'sync_xid', 'id'],
+                name='consult_tomb_patient_idx',
+                condition=models.Q(patient_id__isnull=False),
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.consultation_id} удалена в {self.deleted_at}'
+
+
+class ConsultationReminder(models.Model):
+    """
+    Отправленное напоминание о консультации. По одной записи на канал:
+    запись создаётся до отправки в транзакции, которая блокирует
+    консультацию, поэтому напоминание не отправляется дважды.
+    """
+
+    class Channel(models.TextChoices):
+        EMAIL = 'email', 'E-mail'
+        SMS = 'sms', 'SMS'
+
+    # На секционированную таблицу консультаций нельзя ссылаться внешним
+    # ключом базы данных, связь поддерживается только приложением.
+    consultation = models.ForeignKey(
+        Consultation,
+        verbose_name='Консультация',
+        on_delete=models.CASCADE,
+        related_name='reminders',
+        db_constraint=False,
+        # Индекс по консультации — префикс уникального ограничения.
+        db_index=False,
+    )
+    channel = models.CharField(
+        'Канал', max_length=10, choices=Channel.choices
+    )
+    recipient = models.CharField('Получатель', max_length=254)
+    sent_at = models.DateTimeField('Время отправки', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Напоминание о консультации'
+        verbose_name_plural = 'Напоминания о консультациях'
+        constraints = (
+            models.UniqueConstraint(
+                fields=['consultation', 'channel'],
+                name='consult_reminder_unique',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.consultation_id} {self.channel}: {self.recipient}'
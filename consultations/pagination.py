@@ -0,0 +1,7 @@
+from medical_service.pagination import KeysetPagination
+
+
+class ConsultationPagination(KeysetPagination):
+    """Курсорная пагинация списка консультаций по ``(created_at, id)``."""
+
+    ordering = ('-created_at', '-id')
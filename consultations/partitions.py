@@ -0,0 +1,278 @@
+"""
+Помесячное секционирование таблицы консультаций.
+
+Таблица консультаций секционирована по ``start_time`` (``PARTITION BY
+RANGE``): по секции на календарный месяц (UTC) и секция по умолчанию
+для консультаций вне созданных месяцев. Индексы и внешние ключи
+объявлены на родительской таблице и наследуются секциями.
+
+Ограничения PostgreSQL для секционированных таблиц:
+
+- первичный ключ включает ключ секционирования: ``(id, start_time)``,
+  поэтому уникальность ``id`` проверяет триггер-ограничение
+  ``consultations_unique_id``;
+- ограничение-исключение на пересечение консультаций врача создаётся
+  в каждой секции, а пересечения консультаций из разных секций
+  запрещает триггер-ограничение ``consultations_no_overlap``: под
+  рекомендательной блокировкой врача он ищет пересечения во всех
+  секциях. Оба триггера (миграция ``0012``) отложены до конца
+  транзакции, как и ограничения-исключения;
+- на таблицу консультаций нельзя ссылаться внешними ключами.
+
+Секции создаются заранее командой ``consultation_partitions``,
+она же отсоединяет и архивирует старые секции. Консультации
+отсоединённой секции вычитаются из статистики, а лента изменений
+получает записи об их удалении.
+"""
+
+import re
+from collections import Counter
+from datetime import date, datetime, timezone
+
+from django.db import connection, transaction
+from django.utils import timezone as django_timezone
+
+from .cache import RELATED_DATA_SCOPE, bump_version
+from .models import Consultation, ConsultationTombstone
+from .stats import apply_deltas
+from .sync import TRACK_CHANGES_SETTING
+
+PARTITIONED_TABLE = Consultation._meta.db_table
+DEFAULT_PARTITION = f'{PARTITIONED_TABLE}_default'
+ARCHIVE_SCHEMA = 'consultations_archive'
+PARTITIONS_AHEAD = 3
+# Секции, в которых все консультации в этих статусах, можно
+# отсоединять без --force.
+ARCHIVED_STATUSES = (
+    Consultation.Status.FINISHED.value,
+    Consultation.Status.PAID.value,
+)
+
+PARTITION_NAME_RE = re.compile(
+    re.escape(PARTITIONED_TABLE) + r'_y(?P<year>\d{4})m(?P<month>\d{2})'
+)
+
+# Ограничение отложено до конца транзакции, чтобы пакет мог занять
+# время, которое освобождают другие консультации того же пакета.
+OVERLAP_CONSTRAINT_SQL = (
+    'ALTER TABLE {table} ADD CONSTRAINT {name} EXCLUDE USING gist '
+    "(TSTZRANGE(start_time, end_time, '[)') WITH &&, doctor_id WITH =) "
+    'DEFERRABLE INITIALLY DEFERRED'
+)
+
+
+class PartitionError(Exception):
+    """Секцию нельзя отсоединить."""
+
+
+def month_start(value):
+    """Первое число месяца даты или времени (UTC)."""
+
+    if isinstance(value, datetime):
+        value = value.astimezone(timezone.utc).date()
+    return value.replace(day=1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_bounds(month):
+    """Границы секции месяца: ``[начало месяца, начало следующего)``."""
+
+    return tuple(
+        datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+        for value in (month, add_months(month, 1))
+    )
+
+
+def partition_name(month):
+    return f'{PARTITIONED_TABLE}_y{month.year:04d}m{month.month:02d}'
+
+
+def quote(name):
+    return connection.ops.quote_name(name)
+
+
+def monthly_partitions():
+    """Помесячные секции таблицы консультаций: месяц -> имя таблицы."""
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT child.relname FROM pg_inherits '
+            'JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid '
+            'WHERE pg_inherits.inhparent = %s::regclass',
+            [PARTITIONED_TABLE],
+        )
+        names = [name for (name,) in cursor.fetchall()]
+
+    partitions = {}
+    for name in names:
+        match = PARTITION_NAME_RE.fullmatch(name)
+        if match:
+            month = date(int(match['year']), int(match['month']), 1)
+            partitions[month] = name
+    return dict(sorted(partitions.items()))
+
+
+def add_overlap_constraint(cursor, table):
+    cursor.execute(
+        OVERLAP_CONSTRAINT_SQL.format(
+            table=quote(table), name=quote(f'{table}_no_overlap')
+        )
+    )
+
+
+def create_empty_partition(cursor, month):
+    """Создаёт пустую секцию месяца (при секционировании таблицы)."""
+
+    name = partition_name(month)
+    cursor.execute(
+        f'CREATE TABLE {quote(name)} PARTITION OF {quote(PARTITIONED_TABLE)} '
+        f'FOR VALUES FROM (%s) TO (%s)',
+        month_bounds(month),
+    )
+    add_overlap_constraint(cursor, name)
+
+
+def create_default_partition(cursor):
+    cursor.execute(
+        f'CREATE TABLE {quote(DEFAULT_PARTITION)} '
+        f'PARTITION OF {quote(PARTITIONED_TABLE)} DEFAULT'
+    )
+    add_overlap_constraint(cursor, DEFAULT_PARTITION)
+
+
+def create_partition(month):
+    """
+    Создаёт секцию месяца. Консультации этого месяца, попавшие
+    в секцию по умолчанию, переносятся в новую секцию.
+    """
+
+    name = partition_name(month)
+    lower, upper = month_bounds(month)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TABLE {quote(name)} '
+            f'(LIKE {quote(PARTITIONED_TABLE)} INCLUDING DEFAULTS '
+            f'INCLUDING CONSTRAINTS)'
+        )
+        # Новые консультации месяца не должны попасть в секцию
+        # по умолчанию, пока строки переносятся.
+        cursor.execute(
+            f'LOCK TABLE {quote(DEFAULT_PARTITION)} IN EXCLUSIVE MODE'
+        )
+        # Перенос не изменяет консультации: триггеры ленты изменений
+        # не должны записывать удаление и новую транзакцию изменения.
+        cursor.execute(f"SET LOCAL {TRACK_CHANGES_SETTING} = 'off'")
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM {quote(DEFAULT_PARTITION)} '
+            f'WHERE start_time >= %s AND start_time < %s RETURNING *) '
+            f'INSERT INTO {quote(name)} SELECT * FROM moved',
+            [lower, upper],
+        )
+        cursor.execute(f"SET LOCAL {TRACK_CHANGES_SETTING} = 'on'")
+        add_overlap_constraint(cursor, name)
+        cursor.execute(
+            f'ALTER TABLE {quote(PARTITIONED_TABLE)} ATTACH PARTITION '
+            f'{quote(name)} FOR VALUES FROM (%s) TO (%s)',
+            [lower, upper],
+        )
+    return name
+
+
+def ensure_partitions(first_month, last_month):
+    """Создаёт недостающие секции месяцев ``first_month``–``last_month``."""
+
+    existing = monthly_partitions()
+    created = []
+    month = month_start(first_month)
+    while month <= last_month:
+        if month not in existing:
+            created.append(create_partition(month))
+        month = add_months(month, 1)
+    return created
+
+
+def partitions_before(month):
+    """Секции месяцев раньше ``month``."""
+
+    return {
+        partition_month: name
+        for partition_month, name in monthly_partitions().items()
+        if partition_month < month
+    }
+
+
+def has_active_consultations(name):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT EXISTS (SELECT 1 FROM {quote(name)} '
+            f'WHERE status NOT IN %s)',
+            [ARCHIVED_STATUSES],
+        )
+        return cursor.fetchone()[0]
+
+
+def forget_detached_rows(cursor, name):
+    """
+    Записывает удаление консультаций отсоединённой секции ``name``
+    в ленту изменений и вычитает их из статистики.
+    """
+
+    tombstones = ConsultationTombstone._meta.db_table
+    cursor.execute(
+        f'INSERT INTO {quote(tombstones)} '
+        f'(consultation_id, doctor_id, patient_id, reassigned, sync_xid, '
+        f'deleted_at) '
+        f'SELECT id, doctor_id, patient_id, false, '
+        f'pg_current_xact_id()::text::bigint, now() FROM {quote(name)}'
+    )
+    cursor.execute(
+        f'SELECT doctor_id, (start_time AT TIME ZONE %s)::date, status, '
+        f'count(*) FROM {quote(name)} GROUP BY 1, 2, 3',
+        [django_timezone.get_current_timezone_name()],
+    )
+    apply_deltas(
+        Counter(
+            {
+                (doctor_id, day, status): -count
+                for doctor_id, day, status, count in cursor.fetchall()
+            }
+        )
+    )
+
+
+def detach_partition(name, archive=False, force=False):
+    """
+    Отсоединяет секцию: её консультации пропадают из приложения,
+    но таблица остаётся в базе данных. С ``archive`` таблица
+    переносится в схему ``ARCHIVE_SCHEMA``.
+
+    В той же транзакции консультации секции вычитаются из статистики,
+    а лента изменений получает записи об их удалении.
+    """
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if not force and has_active_consultations(name):
+            raise PartitionError(
+                f'В секции {name} есть незавершённые консультации.'
+            )
+        cursor.execute(
+            f'ALTER TABLE {quote(PARTITIONED_TABLE)} '
+            f'DETACH PARTITION {quote(name)}'
+        )
+        # Отсоединённая секция заблокирована до конца транзакции,
+        # поэтому её строки уже не изменятся.
+        forget_detached_rows(cursor, name)
+        if archive:
+            cursor.execute(
+                f'CREATE SCHEMA IF NOT EXISTS {quote(ARCHIVE_SCHEMA)}'
+            )
+            cursor.execute(
+                f'ALTER TABLE {quote(name)} '
+                f'SET SCHEMA {quote(ARCHIVE_SCHEMA)}'
+            )
+    # Ответы API могли содержать консультации отсоединённой секции.
+    bump_version(RELATED_DATA_SCOPE)
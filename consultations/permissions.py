@@ -68,9 +68,10 @@ class IsConsultationOwnerOrAdmin(BasePermission):
         if request.user.role == CustomUser.UserRole.ADMIN.value:
             return True
 
-        if request.user.role == CustomUser.UserRole.DOCTOR.value and hasattr(
-            request.user, 'doctor_profile'
+        if (
+            request.user.role == CustomUser.UserRole.DOCTOR.value
+            and request.user.doctor_id is not None
         ):
-            return obj.doctor == request.user.doctor_profile
+            return obj.doctor_id == request.user.doctor_id
 
         return False
@@ -0,0 +1,264 @@
+"""
+Проверка планов запросов к консультациям.
+
+Для каждого поддерживаемого сочетания роли, фильтра по статусу,
+сортировки и страницы списка (а также для страницы списка в админке
+с фильтрами и поиском, обхода иерархии дат админки, деталей
+консультации, справочников врачей и пациентов, ленты
+изменений и порции планировщика напоминаний) строится
+запрос тем же кодом, что и в API, и выполняется ``EXPLAIN``. Запрос
+считается регрессией, если в плане есть последовательное чтение
+таблицы консультаций (или её секций) или сортировка: значит, ни один
+индекс не выдаёт строки в нужном порядке, и стоимость запроса растёт
+вместе с таблицей.
+
+На маленькой базе (в тестах) планировщик предпочитает
+последовательное чтение даже при подходящем индексе, поэтому по
+умолчанию последовательное чтение и сортировка запрещаются
+(``enable_seqscan``/``enable_sort``). Если индекса нет, планировщик
+всё равно выбирает их, и проверка это замечает. На базе с реальным
+объёмом данных проверку можно выполнить с настройками планировщика
+по умолчанию.
+"""
+
+import json
+from datetime import datetime, timezone
+from itertools import product
+
+from django.contrib.admin import site
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from users.authentication import (
+    DOCTOR_ID_CLAIM,
+    PATIENT_ID_CLAIM,
+    ROLE_CLAIM,
+    ClaimsUser,
+)
+from users.models import CustomUser, Doctor, Patient
+from users.pagination import DirectoryPagination
+
+from .models import Consultation, ConsultationReminder
+from .sync import CHANGED, START_POSITION, SYNC_PAGE_SIZE, page_querysets
+
+ROLES = tuple(CustomUser.UserRole.values)
+STATUS_FILTERS = (None, *Consultation.Status.values)
+ORDERINGS = ('-created_at', 'created_at')
+CONSULTATIONS_TABLE = Consultation._meta.db_table
+SORT_NODES = ('Sort', 'Incremental Sort')
+FORCE_INDEX_SETTINGS = ('enable_seqscan', 'enable_sort')
+# Идентификаторы в проверяемых запросах: планы не зависят от значений.
+SAMPLE_ID = 1
+SAMPLE_TIME = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def plan_cases():
+    """
+    Сочетания параметров, для которых проверяется план:
+    ``(название, queryset)``.
+    """
+
+    for role, status, ordering, cursor in product(
+        ROLES, STATUS_FILTERS, ORDERINGS, (False, True)
+    ):
+        name = (
+            f'list role={role} status={status or "-"} '
+            f'ordering={ordering} cursor={"yes" if cursor else "no"}'
+        )
+        yield name, list_queryset(role, status, ordering, cursor)
+
+    for field, value in (
+        ('status', Consultation.Status.WAITING.value),
+        ('doctor__id__exact', SAMPLE_ID),
+        ('patient__id__exact', SAMPLE_ID),
+        ('created_at__gte', SAMPLE_TIME),
+        (None, None),
+    ):
+        filters = {field: value} if field else {}
+        yield (
+            f'admin {field or "-"}',
+            admin_changelist_queryset(**filters),
+        )
+    yield 'admin search', admin_changelist_queryset(search='иван')
+    for start in (None, SAMPLE_TIME):
+        yield (
+            f'admin date hierarchy start={"yes" if start else "no"}',
+            admin_date_hierarchy_queryset(start),
+        )
+
+    yield 'detail', Consultation.objects.filter(pk=SAMPLE_ID)
+
+    for model in (Doctor, Patient):
+        yield f'directory {model._meta.model_name}', directory_queryset(model)
+
+    for role, cursor in product(ROLES, (False, True)):
+        for queryset, kind in changes_querysets(role, cursor):
+            yield (
+                f'changes role={role} kind={kind} '
+                f'cursor={"yes" if cursor else "no"}',
+                queryset,
+            )
+
+    for cursor in (False, True):
+        yield (
+            f'reminders cursor={"yes" if cursor else "no"}',
+            reminder_queryset(cursor),
+        )
+
+
+def list_queryset(role, status=None, ordering='-created_at', cursor=False):
+    """Выборка страницы списка консультаций для пользователя с ролью."""
+
+    params = {'ordering': ordering}
+    if status:
+        params['status'] = status
+    view = role_view('list', role, params)
+    queryset = view.filter_queryset(view.get_queryset())
+
+    # Те же шаги, что в ``KeysetPagination.prepare``, без построения
+    # ссылок на страницы.
+    paginator = view.paginator
+    paginator.page_size = paginator.get_page_size(view.request)
+    paginator.ordering = paginator.get_ordering(view.request, queryset, view)
+    paginator.cursor = None
+    if cursor:
+        paginator.cursor = {
+            'position': [datetime.now(timezone.utc).isoformat(), SAMPLE_ID],
+            'reverse': False,
+        }
+    queryset = paginator.build_queryset(queryset)
+    return queryset[: paginator.page_size + 1]
+
+
+def role_view(action, role, params=None):
+    """Представление консультаций для пользователя с ролью."""
+
+    from .views import ConsultationViewSet
+
+    view = ConsultationViewSet(
+        action=action, format_kwarg=None, args=(), kwargs={}
+    )
+    view.request = Request(RequestFactory().get('/', params or {}))
+    view.request.user = ClaimsUser(
+        {
+            'user_id': SAMPLE_ID,
+            ROLE_CLAIM: role,
+            DOCTOR_ID_CLAIM: SAMPLE_ID,
+            PATIENT_ID_CLAIM: SAMPLE_ID,
+        }
+    )
+    return view
+
+
+def changes_querysets(role, cursor=False):
+    """Выборки страницы ленты изменений для пользователя с ролью."""
+
+    view = role_view('changes', role)
+    position = (SAMPLE_ID, CHANGED, SAMPLE_ID) if cursor else START_POSITION
+    return page_querysets(
+        view.get_queryset(),
+        view.get_tombstones(),
+        position,
+        horizon=SAMPLE_ID * 2,
+        limit=SYNC_PAGE_SIZE + 1,
+    )
+
+
+def admin_changelist_queryset(search=None, **filters):
+    """Выборка страницы списка консультаций в админке."""
+
+    model_admin = site.get_model_admin(Consultation)
+    ordering = [*model_admin.ordering, '-pk']
+    queryset = Consultation.objects.filter(**filters)
+    if search:
+        queryset, _ = model_admin.get_search_results(None, queryset, search)
+    queryset = queryset.order_by(*ordering)
+    return queryset[: model_admin.list_per_page + 1]
+
+
+def admin_date_hierarchy_queryset(start=None):
+    """Запрос обхода ``start_time`` иерархией дат в админке."""
+
+    queryset = site.get_model_admin(Consultation).get_queryset(None)
+    return queryset.first_from('start_time', start)
+
+
+def directory_queryset(model):
+    """Выборка страницы справочника врачей или пациентов."""
+
+    queryset = model.objects.select_related('user').order_by(
+        *DirectoryPagination.ordering
+    )
+    return queryset[: DirectoryPagination.page_size + 1]
+
+
+def reminder_queryset(cursor=False):
+    """Порция консультаций, которую забирает планировщик напоминаний."""
+
+    from .reminders import ReminderScheduler
+
+    scheduler = ReminderScheduler(
+        backends=dict.fromkeys(ConsultationReminder.Channel.values)
+    )
+    start = datetime.now(timezone.utc)
+    return scheduler.claim(
+        start,
+        start + scheduler.window,
+        (start, SAMPLE_ID) if cursor else None,
+    )
+
+
+def explain(queryset, force_index=True, using=DEFAULT_DB_ALIAS):
+    """План запроса в формате JSON."""
+
+    with transaction.atomic(using=using), connections[using].cursor() as c:
+        # Запросы с ``select_for_update`` строятся только в транзакции.
+        sql, params = queryset.query.sql_with_params()
+        if force_index:
+            for setting in FORCE_INDEX_SETTINGS:
+                c.execute(f'SET LOCAL {setting} = off')
+        c.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        (plan,) = c.fetchone()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get('Plans', ()):
+        yield from plan_nodes(child)
+
+
+def is_consultations_relation(name):
+    return name == CONSULTATIONS_TABLE or name.startswith(
+        f'{CONSULTATIONS_TABLE}_'
+    )
+
+
+def plan_problems(plan):
+    """Последовательные чтения консультаций и сортировки в плане."""
+
+    problems = []
+    for node in plan_nodes(plan):
+        node_type = node['Node Type']
+        if node_type == 'Seq Scan' and is_consultations_relation(
+            node.get('Relation Name', '')
+        ):
+            problems.append(f'Seq Scan on {node["Relation Name"]}')
+        elif node_type in SORT_NODES:
+            keys = ', '.join(node.get('Sort Key', ()))
+            problems.append(f'{node_type} by {keys}')
+    return problems
+
+
+def check_query_plans(force_index=True, using=DEFAULT_DB_ALIAS):
+    """Проблемы планов по сочетаниям: ``{название: [проблемы]}``."""
+
+    failures = {}
+    for name, queryset in plan_cases():
+        problems = plan_problems(explain(queryset, force_index, using))
+        if problems:
+            failures[name] = problems
+    return failures
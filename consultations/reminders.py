@@ -0,0 +1,315 @@
+"""
+Напоминания пациентам о консультациях.
+
+Планировщик (команда ``send_reminders``) проходит индекс по
+``start_time`` окнами от текущего момента до ``REMINDER_LEAD_TIME``
+вперёд, не сканируя таблицу целиком. В каждом окне консультации без
+отправленных напоминаний забираются порциями через
+``SELECT ... FOR UPDATE SKIP LOCKED``: несколько планировщиков,
+запущенных параллельно, делят консультации между собой и не ждут друг
+друга.
+
+Гарантия доставки — не более одного раза. Сообщения порции сначала
+занимаются записями ``ConsultationReminder`` в транзакции, которая
+держит блокировку консультаций, и только после её фиксации
+отправляются через бэкенды каналов (``REMINDER_BACKENDS``). Записи
+сообщений, которые бэкенд не доставил, удаляются, и они отправляются
+при следующем запуске. Если процесс упадёт между фиксацией и
+отправкой, напоминание потеряется, но дважды не уйдёт.
+"""
+
+import json
+import logging
+import sys
+from collections import namedtuple
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import REMINDER_STATUSES, Consultation, ConsultationReminder
+
+logger = logging.getLogger(__name__)
+
+REMINDER_BATCH_SIZE = 100
+REMINDER_WINDOW = timedelta(hours=1)
+REMINDER_SUBJECT = 'Напоминание о консультации'
+
+ReminderMessage = namedtuple(
+    'ReminderMessage', ('consultation_id', 'channel', 'recipient', 'text')
+)
+
+
+class BaseReminderBackend:
+    """Бэкенд отправки напоминаний одного канала."""
+
+    def send_messages(self, messages):
+        """Отправляет сообщения и возвращает доставленные."""
+
+        raise NotImplementedError
+
+
+class ConsoleBackend(BaseReminderBackend):
+    """Выводит напоминания в поток (по умолчанию — stdout)."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send_messages(self, messages):
+        for message in messages:
+            self.stream.write(
+                f'[{message.channel}] {message.recipient}: {message.text}\n'
+            )
+        self.stream.flush()
+        return list(messages)
+
+
+class FileBackend(BaseReminderBackend):
+    """
+    Дописывает напоминания в файл ``REMINDER_FILE_PATH`` по одному
+    JSON-объекту на строку.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or settings.REMINDER_FILE_PATH
+
+    def send_messages(self, messages):
+        with open(self.path, 'a', encoding='utf-8') as stream:
+            for message in messages:
+                stream.write(
+                    json.dumps(message._asdict(), ensure_ascii=False) + '\n'
+                )
+        return list(messages)
+
+
+class EmailBackend(BaseReminderBackend):
+    """Отправляет напоминания через почтовый бэкенд Django."""
+
+    def send_messages(self, messages):
+        delivered = []
+        # Одно соединение на порцию.
+        with get_connection() as connection:
+            for message in messages:
+                email = EmailMessage(
+                    REMINDER_SUBJECT,
+                    message.text,
+                    to=[message.recipient],
+                    connection=connection,
+                )
+                try:
+                    email.send()
+                except Exception:
+                    logger.warning(
+                        'Не удалось отправить напоминание %s на %s.',
+                        message.consultation_id,
+                        message.recipient,
+                        exc_info=True,
+                    )
+                else:
+                    delivered.append(message)
+        return delivered
+
+
+def load_backends():
+    """Бэкенды каналов из настройки ``REMINDER_BACKENDS``."""
+
+    return {
+        channel: import_string(path)()
+        for channel, path in settings.REMINDER_BACKENDS.items()
+    }
+
+
+class ReminderScheduler:
+    """Напоминания о консультациях, которые скоро начнутся."""
+
+    recipient_fields = {
+        ConsultationReminder.Channel.EMAIL: 'email',
+        ConsultationReminder.Channel.SMS: 'phone',
+    }
+
+    def __init__(
+        self,
+        lead_time=None,
+        window=REMINDER_WINDOW,
+        batch_size=REMINDER_BATCH_SIZE,
+        backends=None,
+    ):
+        self.lead_time = lead_time or settings.REMINDER_LEAD_TIME
+        self.window = window
+        self.batch_size = batch_size
+        self.backends = load_backends() if backends is None else backends
+
+    def run(self, now=None):
+        """
+        Отправляет напоминания о консультациях, которые начинаются
+        в течение ``lead_time`` от ``now``, и возвращает число
+        отправленных сообщений.
+        """
+
+        now = now or timezone.now()
+        self.sent = 0
+        end = now + self.lead_time
+        start = now
+        while start < end:
+            stop = min(start + self.window, end)
+            self.run_window(start, stop)
+            start = stop
+        return self.sent
+
+    def run_window(self, start, stop):
+        # Курсор (start_time, id) продвигается и мимо консультаций,
+        # сообщения которых не удалось доставить: они достанутся
+        # следующему запуску.
+        cursor = None
+        while True:
+            cursor = self.send_batch(start, stop, cursor)
+            if cursor is None:
+                return
+
+    def due(self, start, stop):
+        """Консультации окна ``[start, stop)`` без напоминаний."""
+
+        reminders = ConsultationReminder.objects.filter(
+            consultation=OuterRef('pk')
+        )
+        return (
+            Consultation.objects.filter(
+                start_time__gte=start,
+                start_time__lt=stop,
+                status__in=REMINDER_STATUSES,
+            )
+            .annotate(
+                **{
+                    f'{channel}_sent': Exists(
+                        reminders.filter(channel=channel)
+                    )
+                    for channel in self.backends
+                }
+            )
+            .filter(
+                reduce(
+                    or_,
+                    (
+                        Q(**{f'{channel}_sent': False})
+                        for channel in self.backends
+                    ),
+                )
+            )
+        )
+
+    def claim(self, start, stop, cursor=None):
+        """
+        Порция консультаций окна после курсора ``(start_time, id)``,
+        которые не заблокированы другими планировщиками.
+        """
+
+        queryset = self.due(start, stop)
+        if cursor is not None:
+            start_time, pk = cursor
+            queryset = queryset.filter(
+                Q(start_time__gt=start_time)
+                | Q(start_time=start_time, pk__gt=pk)
+            )
+        return (
+            queryset.select_related('patient', 'doctor__user')
+            .select_for_update(skip_locked=True, of=('self',))
+            .order_by('start_time', 'pk')[: self.batch_size]
+        )
+
+    def send_batch(self, start, stop, cursor=None):
+        """
+        Забирает порцию консультаций окна, отправляет напоминания
+        и возвращает курсор для следующей порции или ``None``,
+        если окно пройдено.
+        """
+
+        with transaction.atomic():
+            consultations = list(self.claim(start, stop, cursor))
+            if not consultations:
+                return None
+
+            # Строки заблокированы, поэтому этот запрос видит записи
+            # планировщика, который отпустил их после снимка выборки.
+            recorded = set(
+                ConsultationReminder.objects.filter(
+                    consultation__in=consultations
+                ).values_list('consultation_id', 'channel')
+            )
+            batches = {}
+            for channel in self.backends:
+                messages = [
+                    self.build_message(consultation, channel)
+                    for consultation in consultations
+                    if (consultation.pk, channel) not in recorded
+                ]
+                if messages:
+                    batches[channel] = messages
+            # Сообщения занимаются записями до отправки: после фиксации
+            # их не выберет ни этот, ни другой планировщик.
+            ConsultationReminder.objects.bulk_create(
+                ConsultationReminder(
+                    consultation_id=message.consultation_id,
+                    channel=message.channel,
+                    recipient=message.recipient,
+                )
+                for messages in batches.values()
+                for message in messages
+            )
+
+        undelivered = []
+        for channel, messages in batches.items():
+            try:
+                delivered = set(self.backends[channel].send_messages(messages))
+            except Exception:
+                logger.warning(
+                    'Не удалось отправить напоминания по каналу %s.',
+                    channel,
+                    exc_info=True,
+                )
+                delivered = set()
+            self.sent += len(delivered)
+            undelivered.extend(
+                message for message in messages if message not in delivered
+            )
+        self.release(undelivered)
+
+        last = consultations[-1]
+        if len(consultations) < self.batch_size:
+            return None
+        return last.start_time, last.pk
+
+    def release(self, messages):
+        """Удаляет записи недоставленных сообщений для повторной отправки."""
+
+        if not messages:
+            return
+        ConsultationReminder.objects.filter(
+            reduce(
+                or_,
+                (
+                    Q(
+                        consultation_id=message.consultation_id,
+                        channel=message.channel,
+                    )
+                    for message in messages
+                ),
+            )
+        ).delete()
+
+    def build_message(self, consultation, channel):
+        doctor = consultation.doctor.user
+        start_time = timezone.localtime(consultation.start_time)
+        text = (
+            f'Консультация у врача {doctor.last_name} {doctor.first_name} '
+            f'{start_time:%d.%m.%Y} в {start_time:%H:%M}.'
+        )
+        recipient = getattr(
+            consultation.patient, self.recipient_fields[channel]
+        )
+        return ReminderMessage(consultation.pk, channel, str(recipient), text)
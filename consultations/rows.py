@@ -0,0 +1,97 @@
+"""
+Быстрое представление списка консультаций без сериализатора.
+
+``ConsultationSerializer`` создаёт экземпляр модели на каждую строку
+и для каждого поля вызывает ``get_attribute``/``to_representation``.
+Для списка без ``expand`` те же данные читаются через ``values()``,
+а преобразование каждого поля выбирается один раз по полям
+сериализатора. Представление совпадает с представлением
+сериализатора (это проверяется тестами).
+"""
+
+from operator import itemgetter
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from rest_framework import fields, relations
+from rest_framework.settings import ISO_8601, api_settings
+
+
+class RowRepresentation:
+    """Преобразует строки ``values()`` в представление сериализатора."""
+
+    def __init__(self, serializer):
+        opts = serializer.Meta.model._meta
+        self.accessors = []
+        columns = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            try:
+                column = opts.get_field(field.source).attname
+            except FieldDoesNotExist:
+                raise ImproperlyConfigured(
+                    f'Поле {name} не соответствует полю модели.'
+                )
+            columns.append(column)
+            self.accessors.append(
+                (name, self.accessor(column, self.converter(field)))
+            )
+        self.columns = tuple(columns)
+
+    def __call__(self, rows):
+        accessors = self.accessors
+        return [{name: get(row) for name, get in accessors} for row in rows]
+
+    @staticmethod
+    def accessor(column, convert):
+        get = itemgetter(column)
+        if convert is None:
+            return get
+
+        def get_converted(row):
+            value = get(row)
+            return None if value is None else convert(value)
+
+        return get_converted
+
+    @classmethod
+    def converter(cls, field):
+        """
+        Преобразование значения столбца в значение поля сериализатора;
+        ``None`` — значение столбца используется как есть.
+        """
+
+        if isinstance(field, relations.PrimaryKeyRelatedField):
+            if field.pk_field is None:
+                return None
+            return field.pk_field.to_representation
+        if isinstance(field, fields.ChoiceField):
+            choices = field.choice_strings_to_values
+            return lambda value: choices.get(str(value), value)
+        if isinstance(field, fields.DateTimeField):
+            return cls.datetime_converter(field)
+        if type(field) is fields.IntegerField:
+            return int
+        return field.to_representation
+
+    @staticmethod
+    def datetime_converter(field):
+        """
+        ``DateTimeField.to_representation`` для формата ISO 8601
+        с часовым поясом, вычисленным один раз.
+        """
+
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        tz = getattr(field, 'timezone', None) or field.default_timezone()
+        if output_format is None or output_format.lower() != ISO_8601:
+            return field.to_representation
+        if tz is None:
+            return field.to_representation
+
+        def convert(value):
+            value = value.astimezone(tz).isoformat()
+            if value.endswith('+00:00'):
+                return value[:-6] + 'Z'
+            return value
+
+        return convert
@@ -0,0 +1,91 @@
+"""
+Поиск консультаций по ФИО врача и пациента.
+
+ФИО денормализованы в поля ``doctor_search_name`` и ``patient_search_name``
+консультации в нормализованном виде (нижний регистр, «ё» → «е»), поэтому
+поиск не требует JOIN с пользователями и обслуживается GIN-индексами
+pg_trgm как для подстрочного ``LIKE '%...%'``, так и для ранжирования
+по триграммному сходству.
+"""
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import Q
+from django.db.models.functions import Greatest
+from rest_framework import filters
+
+SEARCH_NAME_FIELDS = ('doctor_search_name', 'patient_search_name')
+
+# Поля пользователя, из которых собирается ФИО для поиска.
+USER_NAME_FIELDS = ('last_name', 'first_name', 'patronymic')
+
+
+def normalize_search_text(value):
+    """Приводит строку к виду, в котором хранятся поисковые поля."""
+
+    return ' '.join(value.lower().replace('ё', 'е').split())
+
+
+def build_search_name(user):
+    """Собирает нормализованное ФИО пользователя."""
+
+    parts = (getattr(user, field) for field in USER_NAME_FIELDS)
+    return normalize_search_text(' '.join(part for part in parts if part))
+
+
+def filter_search_names(queryset, terms, fields=SEARCH_NAME_FIELDS):
+    """
+    Оставляет консультации, в ФИО которых входит каждый из терминов.
+    Термин сравнивается в нормализованном виде, поэтому условие
+    ``LIKE '%...%'`` обслуживается триграммными индексами полей.
+    """
+
+    for term in terms:
+        term = normalize_search_text(term)
+        condition = Q()
+        for field in fields:
+            condition |= Q(**{f'{field}__contains': term})
+        queryset = queryset.filter(condition)
+    return queryset
+
+
+def rank_search(queryset, query):
+    """
+    Отбирает консультации, похожие на запрос, и сортирует их
+    по убыванию триграммного сходства со словами ФИО.
+    """
+
+    query = normalize_search_text(query)
+    condition = Q()
+    for field in SEARCH_NAME_FIELDS:
+        condition |= Q(**{f'{field}__trigram_word_similar': query})
+    return (
+        queryset.filter(condition)
+        .annotate(
+            rank=Greatest(
+                *(
+                    TrigramWordSimilarity(query, field)
+                    for field in SEARCH_NAME_FIELDS
+                )
+            )
+        )
+        .order_by('-rank', '-created_at', '-id')
+    )
+
+
+class ConsultationSearchFilter(filters.SearchFilter):
+    """
+    Подстрочный поиск по денормализованным полям ФИО.
+
+    В отличие от стандартного ``SearchFilter`` не использует ``icontains``
+    (``UPPER(...) LIKE``), а сравнивает нормализованный термин
+    с нормализованным полем, что позволяет использовать триграммный индекс.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+
+        if not search_fields or not search_terms:
+            return queryset
+
+        return filter_search_names(queryset, search_terms, search_fields)
@@ -1,18 +1,37 @@
+from datetime import timedelta
+
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+from django.utils.functional import cached_property
+from psycopg2 import errorcodes
 from rest_framework import serializers
 
 from users.models import Doctor, Patient
+from users.serializers import (
+    DoctorSerializer,
+    DoctorWithClinicsSerializer,
+    PatientSerializer,
+)
 
-from .models import Consultation
+from .models import OVERLAP_ERROR, Consultation
+from .stats import STATS_GROUPS
+from .sync import (
+    SYNC_MAX_PAGE_SIZE,
+    SYNC_PAGE_SIZE,
+    START_POSITION,
+    InvalidSyncToken,
+    decode_token,
+)
 
 
 class ConsultationSerializer(serializers.ModelSerializer):
     """Сериализатор для консультаций."""
 
     doctor = serializers.PrimaryKeyRelatedField(
-        queryset=Doctor.objects.all(), required=True
+        queryset=Doctor.objects.select_related('user'), required=True
     )
     patient = serializers.PrimaryKeyRelatedField(
-        queryset=Patient.objects.all(), required=True
+        queryset=Patient.objects.select_related('user'), required=True
     )
     status = serializers.ChoiceField(choices=Consultation.Status.choices)
 
@@ -28,17 +47,172 @@ class ConsultationSerializer(serializers.ModelSerializer):
             'patient',
         )
 
+    @cached_property
+    def expanded_fields(self):
+        """
+        Сериализаторы для полей, раскрытых параметром ``expand``.
+
+        Создаются один раз на сериализатор, а не на каждую строку.
+        """
+
+        expand = self.context.get('expand', ())
+        fields = {}
+        if 'clinics' in expand:
+            fields['doctor'] = DoctorWithClinicsSerializer(
+                context=self.context
+            )
+        elif 'doctor' in expand:
+            fields['doctor'] = DoctorSerializer(context=self.context)
+        if 'patient' in expand:
+            fields['patient'] = PatientSerializer(context=self.context)
+        return fields
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        for name, serializer in self.expanded_fields.items():
+            data[name] = serializer.to_representation(
+                getattr(instance, name)
+            )
+        return data
+
     def validate(self, data):
         """Дополнительная проверка валидности."""
 
-        if data['start_time'] >= data['end_time']:
+        start_time = self.get_value(data, 'start_time')
+        end_time = self.get_value(data, 'end_time')
+        doctor = self.get_value(data, 'doctor')
+        patient = self.get_value(data, 'patient')
+
+        if start_time >= end_time:
             raise serializers.ValidationError(
                 'Время начала должно быть раньше времени окончания.'
             )
 
-        if data['doctor'].user == data['patient'].user:
+        status = data.get('status')
+        if (
+            self.instance is not None
+            and status is not None
+            and status != self.instance.status
+            and not Consultation.can_transition(self.instance.status, status)
+        ):
+            raise serializers.ValidationError(
+                {
+                    'status': f'Переход из статуса {self.instance.status} '
+                    f'в {status} не разрешён.'
+                }
+            )
+
+        if doctor.user_id == patient.user_id:
             raise serializers.ValidationError(
                 'Доктор и пациент не могут быть одним и тем же человеком.'
             )
 
+        conflicts = Consultation.objects.overlapping(
+            doctor, start_time, end_time
+        )
+        if self.instance is not None:
+            conflicts = conflicts.exclude(pk=self.instance.pk)
+        if conflicts.exists():
+            raise serializers.ValidationError(OVERLAP_ERROR)
+
         return data
+
+    def get_value(self, data, field):
+        """Значение поля из данных запроса или из текущего объекта."""
+
+        if field in data:
+            return data[field]
+        return getattr(self.instance, field)
+
+    def save(self, **kwargs):
+        """
+        Сохраняет консультацию. Если пересекающаяся консультация была
+        создана параллельно после проверки в validate, нарушение
+        ограничения-исключения превращается в ошибку валидации.
+        """
+
+        try:
+            with transaction.atomic():
+                instance = super().save(**kwargs)
+                # Ограничение-исключение отложено до конца транзакции.
+                connection.check_constraints()
+                return instance
+        except IntegrityError as error:
+            pgcode = getattr(error.__cause__, 'pgcode', None)
+            if pgcode == errorcodes.EXCLUSION_VIOLATION:
+                raise serializers.ValidationError(OVERLAP_ERROR)
+            raise
+
+
+class ConsultationChangeSerializer(ConsultationSerializer):
+    """Консультация в ленте изменений."""
+
+    class Meta(ConsultationSerializer.Meta):
+        fields = (*ConsultationSerializer.Meta.fields, 'updated_at')
+
+
+class ChangesQuerySerializer(serializers.Serializer):
+    """Параметры запроса ленты изменений консультаций."""
+
+    since = serializers.CharField(required=False)
+    page_size = serializers.IntegerField(
+        required=False,
+        default=SYNC_PAGE_SIZE,
+        min_value=1,
+        max_value=SYNC_MAX_PAGE_SIZE,
+    )
+
+    def validate_since(self, value):
+        try:
+            return decode_token(value)
+        except InvalidSyncToken as error:
+            raise serializers.ValidationError(str(error))
+
+    def validate(self, data):
+        return {
+            'position': data.get('since', START_POSITION),
+            'page_size': data['page_size'],
+        }
+
+
+class StatsQuerySerializer(serializers.Serializer):
+    """Параметры запроса статистики консультаций."""
+
+    max_range = timedelta(days=366)
+    default_range = timedelta(days=30)
+
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    group_by = serializers.CharField(required=False, default='doctor,day')
+    doctor = serializers.IntegerField(required=False, min_value=1)
+    clinic = serializers.IntegerField(required=False, min_value=1)
+
+    def validate_group_by(self, value):
+        group_by = list(dict.fromkeys(filter(None, value.split(','))))
+        unknown = set(group_by) - set(STATS_GROUPS)
+        if not group_by or unknown:
+            raise serializers.ValidationError(
+                'Допустимые значения: ' + ', '.join(STATS_GROUPS) + '.'
+            )
+        return group_by
+
+    def validate(self, data):
+        end = data.get('date_to') or timezone.localdate()
+        start = data.get('date_from') or end - self.default_range
+
+        if start > end:
+            raise serializers.ValidationError(
+                'Начало периода должно быть не позже его окончания.'
+            )
+        if end - start > self.max_range:
+            raise serializers.ValidationError(
+                'Период не может быть длиннее 366 дней.'
+            )
+
+        return {
+            'start': start,
+            'end': end,
+            'group_by': data['group_by'],
+            'doctor_id': data.get('doctor'),
+            'clinic_id': data.get('clinic'),
+        }
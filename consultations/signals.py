@@ -0,0 +1,157 @@
+from django.conf import settings
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from clinics.models import Clinic
+from users.models import Doctor, Patient, WorkingHours
+
+from . import events
+from .cache import (
+    RELATED_DATA_SCOPE,
+    bump_version,
+    consultation_scopes,
+    doctor_availability_scope,
+)
+from .models import Consultation
+from .search import USER_NAME_FIELDS, build_search_name
+from .stats import record_changes
+
+# Отправляется после пакетной записи консультаций, для которой
+# post_save не вызывается. Аргументы: created, updated — списки объектов.
+consultations_bulk_saved = Signal()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def update_consultation_search_names(
+    sender, instance, created, update_fields, **kwargs
+):
+    """Обновляет денормализованные ФИО в консультациях пользователя."""
+
+    if created:
+        return
+    if update_fields is not None and not set(USER_NAME_FIELDS) & set(
+        update_fields
+    ):
+        return
+
+    name = build_search_name(instance)
+    Consultation.objects.filter(doctor__user=instance).exclude(
+        doctor_search_name=name
+    ).update(doctor_search_name=name)
+    Consultation.objects.filter(patient__user=instance).exclude(
+        patient_search_name=name
+    ).update(patient_search_name=name)
+
+
+@receiver(post_save, sender=Consultation)
+@receiver(post_delete, sender=Consultation)
+def invalidate_consultation_availability(sender, instance, **kwargs):
+    """Сбрасывает кэш свободных слотов врача консультации."""
+
+    doctor_ids = {instance.doctor_id, instance.get_loaded_value('doctor_id')}
+    doctor_ids.discard(None)
+    bump_version(*map(doctor_availability_scope, doctor_ids))
+
+
+@receiver(consultations_bulk_saved, sender=Consultation)
+def invalidate_bulk_availability(sender, created, updated, **kwargs):
+    """Сбрасывает кэш свободных слотов врачей из пакета."""
+
+    doctor_ids = set()
+    for consultation in (*created, *updated):
+        doctor_ids.add(consultation.doctor_id)
+        doctor_ids.add(consultation.get_loaded_value('doctor_id'))
+    doctor_ids.discard(None)
+    bump_version(*map(doctor_availability_scope, doctor_ids))
+
+
+@receiver(post_save, sender=WorkingHours)
+@receiver(post_delete, sender=WorkingHours)
+def invalidate_working_hours_availability(sender, instance, **kwargs):
+    """Сбрасывает кэш свободных слотов при изменении рабочих часов."""
+
+    bump_version(doctor_availability_scope(instance.doctor_id))
+
+
+@receiver(post_save, sender=Consultation)
+@receiver(post_delete, sender=Consultation)
+def invalidate_consultation_responses(sender, instance, **kwargs):
+    """Сбрасывает закэшированные ответы со списками консультаций."""
+
+    bump_version(*consultation_scopes(instance))
+
+
+@receiver(consultations_bulk_saved, sender=Consultation)
+def invalidate_bulk_responses(sender, created, updated, **kwargs):
+    """Сбрасывает закэшированные ответы для консультаций из пакета."""
+
+    scopes = set()
+    for consultation in (*created, *updated):
+        scopes.update(consultation_scopes(consultation))
+    bump_version(*scopes)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+@receiver(post_save, sender=Doctor)
+@receiver(post_delete, sender=Doctor)
+@receiver(post_save, sender=Patient)
+@receiver(post_delete, sender=Patient)
+@receiver(post_save, sender=Clinic)
+@receiver(post_delete, sender=Clinic)
+@receiver(m2m_changed, sender=Doctor.clinics.through)
+def invalidate_related_responses(sender, **kwargs):
+    """
+    Сбрасывает ответы, в которые связанные данные попадают
+    через ``expand``.
+    """
+
+    bump_version(RELATED_DATA_SCOPE)
+
+
+@receiver(post_save, sender=Consultation)
+def update_consultation_stats(sender, instance, created, **kwargs):
+    """Обновляет статистику консультаций."""
+
+    if created:
+        record_changes(created=[instance])
+    else:
+        record_changes(updated=[instance])
+
+
+@receiver(post_delete, sender=Consultation)
+def remove_consultation_stats(sender, instance, **kwargs):
+    """Исключает удалённую консультацию из статистики."""
+
+    record_changes(deleted=[instance])
+
+
+@receiver(consultations_bulk_saved, sender=Consultation)
+def update_bulk_stats(sender, created, updated, **kwargs):
+    """Обновляет статистику по консультациям из пакета."""
+
+    record_changes(created=created, updated=updated)
+
+
+@receiver(post_save, sender=Consultation)
+def publish_consultation_saved(sender, instance, created, using, **kwargs):
+    """Публикует событие о создании или изменении консультации."""
+
+    events.publish(
+        events.CREATED if created else events.UPDATED, instance, using=using
+    )
+
+
+@receiver(post_delete, sender=Consultation)
+def publish_consultation_deleted(sender, instance, using, **kwargs):
+    """Публикует событие об удалении консультации."""
+
+    events.publish(events.DELETED, instance, using=using)
+
+
+@receiver(consultations_bulk_saved, sender=Consultation)
+def publish_bulk_saved(sender, created, updated, **kwargs):
+    """Публикует события о консультациях из пакета."""
+
+    events.publish(events.CREATED, *created)
+    events.publish(events.UPDATED, *updated)
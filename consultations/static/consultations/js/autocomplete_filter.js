@@ -0,0 +1,19 @@
+'use strict';
+// Фильтры списка админки с автодополнением: выбор значения
+// перезагружает список с новым параметром фильтра с первой страницы.
+{
+    const $ = django.jQuery;
+
+    $(document).ready(function() {
+        $('select[data-filter-parameter]').on('change', function() {
+            const params = new URLSearchParams(window.location.search);
+            params.delete('p');
+            if (this.value) {
+                params.set(this.dataset.filterParameter, this.value);
+            } else {
+                params.delete(this.dataset.filterParameter);
+            }
+            window.location.search = params.toString();
+        });
+    });
+}
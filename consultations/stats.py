@@ -0,0 +1,211 @@
+"""
+Статистика консультаций по врачам, клиникам и дням.
+
+Таблица ``ConsultationStats`` хранит число консультаций врача за день
+(по времени начала приема) в каждом статусе. Она обновляется
+инкрементально: создание, удаление, смена статуса, врача или дня дают
+изменения счётчиков, которые записываются одним запросом в транзакции
+записи консультаций: ``Consultation.save``, удаление, пакетная запись
+и ``transition_to`` выполняются атомарно вместе с обработчиками
+сигналов.
+Статистика клиник считается по текущим клиникам врачей.
+
+Изменения в обход моделей (``QuerySet.update``, SQL) в статистику
+не попадают: её можно пересчитать командой
+``rebuild_consultation_stats``.
+"""
+
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from users.models import Doctor
+
+from .models import Consultation, ConsultationStats
+
+STATS_GROUPS = {
+    'doctor': 'doctor_id',
+    'clinic': 'doctor__clinics',
+    'day': 'day',
+}
+REBUILD_CHUNK_SIZE = 100
+
+
+def stats_key(doctor_id, start_time, status):
+    return doctor_id, timezone.localdate(start_time), status
+
+
+def current_stats_key(consultation):
+    return stats_key(
+        consultation.doctor_id, consultation.start_time, consultation.status
+    )
+
+
+def saved_stats_key(consultation):
+    """
+    Ключ, под которым консультация учтена в статистике, или ``None``,
+    если он неизвестен.
+    """
+
+    if hasattr(consultation, '_stats_key'):
+        return consultation._stats_key
+    values = [
+        consultation.get_loaded_value(field)
+        for field in ('doctor_id', 'start_time', 'status')
+    ]
+    if None in values:
+        return None
+    return stats_key(*values)
+
+
+def record_changes(created=(), updated=(), deleted=()):
+    """Обновляет статистику по созданным, изменённым и удалённым."""
+
+    deltas = Counter()
+    for consultation in created:
+        deltas[current_stats_key(consultation)] += 1
+    for consultation in updated:
+        saved = saved_stats_key(consultation)
+        if saved is not None:
+            deltas[saved] -= 1
+        deltas[current_stats_key(consultation)] += 1
+    for consultation in deleted:
+        deltas[
+            saved_stats_key(consultation) or current_stats_key(consultation)
+        ] -= 1
+
+    apply_deltas(deltas)
+    # Повторное сохранение того же объекта должно учитывать новый ключ.
+    for consultation in (*created, *updated):
+        consultation._stats_key = current_stats_key(consultation)
+
+
+def apply_deltas(deltas):
+    """
+    Прибавляет изменения к счётчикам одним запросом. Уменьшаются только
+    существующие строки: при каскадном удалении врача его статистика
+    может быть уже удалена.
+    """
+
+    changes = sorted(
+        (key, delta) for key, delta in deltas.items() if delta != 0
+    )
+    decrements = [(*key, delta) for key, delta in changes if delta < 0]
+    increments = [(*key, delta) for key, delta in changes if delta > 0]
+    if not changes:
+        return
+
+    table = connection.ops.quote_name(ConsultationStats._meta.db_table)
+    sql, params = [], []
+    if decrements:
+        sql.append(
+            f'WITH decremented AS ('
+            f'UPDATE {table} AS stats '
+            f'SET count = stats.count + changes.delta '
+            f'FROM (VALUES {values_sql(decrements)}) '
+            f'AS changes (doctor_id, day, status, delta) '
+            f'WHERE stats.doctor_id = changes.doctor_id '
+            f'AND stats.day = changes.day '
+            f'AND stats.status = changes.status'
+            f')'
+        )
+        params.extend(value for row in decrements for value in row)
+    if increments:
+        sql.append(
+            f'INSERT INTO {table} (doctor_id, day, status, count) '
+            f'VALUES {values_sql(increments)} '
+            f'ON CONFLICT (doctor_id, day, status) '
+            f'DO UPDATE SET count = {table}.count + EXCLUDED.count'
+        )
+        params.extend(value for row in increments for value in row)
+    else:
+        sql.append('SELECT 1')
+
+    with connection.cursor() as cursor:
+        cursor.execute(' '.join(sql), params)
+
+
+def values_sql(rows):
+    return ', '.join(['(%s, %s::date, %s, %s)'] * len(rows))
+
+
+def rebuild_stats(chunk_size=REBUILD_CHUNK_SIZE, log=None):
+    """
+    Пересчитывает статистику с нуля порциями по ``chunk_size`` врачей.
+    Каждая порция пересчитывается в своей транзакции под блокировкой
+    таблицы статистики, поэтому параллельные изменения консультаций
+    не теряются. Возвращает число обработанных врачей.
+    """
+
+    table = connection.ops.quote_name(ConsultationStats._meta.db_table)
+    done = 0
+    last_id = 0
+    while True:
+        doctor_ids = list(
+            Doctor.objects.filter(pk__gt=last_id)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:chunk_size]
+        )
+        if not doctor_ids:
+            break
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE'
+                )
+            ConsultationStats.objects.filter(
+                doctor_id__in=doctor_ids
+            ).delete()
+            rows = (
+                Consultation.objects.filter(doctor_id__in=doctor_ids)
+                .annotate(day=TruncDate('start_time'))
+                .values('doctor_id', 'day', 'status')
+                .annotate(count=Count('pk'))
+                .order_by()
+            )
+            ConsultationStats.objects.bulk_create(
+                ConsultationStats(**row) for row in rows
+            )
+        done += len(doctor_ids)
+        last_id = doctor_ids[-1]
+        if log is not None:
+            log(done)
+    return done
+
+
+def stats_rows(start, end, group_by, doctor_id=None, clinic_id=None):
+    """
+    Строки статистики за дни ``start``–``end`` включительно,
+    сгруппированные по полям ``group_by`` из ``STATS_GROUPS``.
+    """
+
+    queryset = ConsultationStats.objects.filter(day__range=(start, end))
+    if doctor_id is not None:
+        queryset = queryset.filter(doctor_id=doctor_id)
+    if clinic_id is not None:
+        queryset = queryset.filter(doctor__clinics=clinic_id)
+    elif 'clinic' in group_by:
+        queryset = queryset.filter(doctor__clinics__isnull=False)
+
+    fields = [STATS_GROUPS[name] for name in group_by]
+    counts = {
+        status: Sum('count', filter=Q(status=status), default=0)
+        for status in Consultation.Status.values
+    }
+    rows = (
+        queryset.values(*fields)
+        .annotate(total=Sum('count'), **counts)
+        .filter(total__gt=0)
+        .order_by(*fields)
+    )
+    return [
+        {
+            **{name: row[STATS_GROUPS[name]] for name in group_by},
+            'counts': {status: row[status] for status in counts},
+            'total': row['total'],
+        }
+        for row in rows
+    ]
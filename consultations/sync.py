@@ -0,0 +1,142 @@
+"""
+Лента изменений консультаций для синхронизации клиентов.
+
+Триггеры базы данных (миграция ``0010_consultation_sync``) записывают
+в ``Consultation.sync_xid`` номер транзакции последнего изменения,
+а при удалении консультации или её переназначении другому врачу или
+пациенту создают ``ConsultationTombstone``. Триггеры срабатывают и для
+запросов ``update()``/``delete()`` без сигналов.
+
+Перенос консультации в секцию другого месяца PostgreSQL выполняет как
+удаление и вставку строки, поэтому в той же транзакции появляется
+и удаление, и изменение консультации.
+
+Токен синхронизации — позиция ``(номер транзакции, вид, ключ)``
+в ленте: удаления транзакции идут раньше изменений, поэтому клиент
+применяет удаления страницы, затем изменения, и консультация из такой
+транзакции остаётся у клиента. Строки транзакций,
+которые ещё могут быть не зафиксированы, в ленту не попадают: лента
+ограничена ``xmin`` текущего снимка — все транзакции с меньшими
+номерами завершены. Поэтому токен возрастает монотонно, и изменение
+не пропадает, даже если транзакции фиксируются не в порядке номеров.
+Долгая транзакция задерживает ленту, но не приводит к потерям.
+
+Каждая выборка — диапазон индекса ``(…, sync_xid, id)`` консультаций
+или удалений с ``LIMIT``.
+"""
+
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from heapq import merge
+from itertools import islice
+
+from django.db import connections
+from django.db.models import Q
+
+TRACK_CHANGES_SETTING = 'consultations.track_changes'
+SYNC_PAGE_SIZE = 100
+SYNC_MAX_PAGE_SIZE = 1000
+# Вид записи в позиции ленты: удаления транзакции идут раньше изменений.
+DELETED, CHANGED = 0, 1
+START_POSITION = (0, DELETED, 0)
+
+SYNC_HORIZON_SQL = 'SELECT pg_snapshot_xmin(pg_current_snapshot())::text'
+
+
+class InvalidSyncToken(Exception):
+    """Токен синхронизации нельзя разобрать."""
+
+
+def encode_token(position):
+    data = json.dumps(list(position), separators=(',', ':'))
+    return urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+
+
+def decode_token(token):
+    try:
+        position = json.loads(urlsafe_b64decode(token.encode('ascii')))
+    except (TypeError, ValueError, UnicodeError):
+        raise InvalidSyncToken('Некорректный токен синхронизации.')
+    if (
+        not isinstance(position, list)
+        or len(position) != len(START_POSITION)
+        or not all(type(value) is int for value in position)
+    ):
+        raise InvalidSyncToken('Некорректный токен синхронизации.')
+    return tuple(position)
+
+
+def sync_horizon(using):
+    """Номер транзакции, все транзакции до которого завершены."""
+
+    with connections[using].cursor() as cursor:
+        cursor.execute(SYNC_HORIZON_SQL)
+        (horizon,) = cursor.fetchone()
+    return int(horizon)
+
+
+def after(queryset, position, kind):
+    """Записи вида ``kind``, которые идут в ленте после ``position``."""
+
+    xid, position_kind, key = position
+    condition = Q(sync_xid__gt=xid)
+    if position_kind < kind:
+        condition |= Q(sync_xid=xid)
+    elif position_kind == kind:
+        condition |= Q(sync_xid=xid, pk__gt=key)
+    return queryset.filter(condition)
+
+
+def page_querysets(consultations, tombstones, position, horizon, limit):
+    """Выборки удалений и изменений страницы: ``[(queryset, вид)]``."""
+
+    return [
+        (
+            after(queryset, position, kind)
+            .filter(sync_xid__lt=horizon)
+            .order_by('sync_xid', 'pk')[:limit],
+            kind,
+        )
+        for queryset, kind in (
+            (tombstones, DELETED),
+            (consultations, CHANGED),
+        )
+    ]
+
+
+def changes_page(consultations, tombstones, position, page_size):
+    """
+    Страница ленты после ``position``: ``(изменённые консультации,
+    id удалённых консультаций, позиция следующей страницы, есть ли
+    ещё записи)``. Выборки ``consultations`` и ``tombstones`` уже
+    ограничены по роли пользователя.
+    """
+
+    # Все выборки — в одной базе с горизонтом ленты.
+    using = consultations.db
+    horizon = sync_horizon(using)
+    limit = page_size + 1
+    streams = [
+        [((row.sync_xid, kind, row.pk), row) for row in queryset]
+        for queryset, kind in page_querysets(
+            consultations.using(using),
+            tombstones.using(using),
+            position,
+            horizon,
+            limit,
+        )
+    ]
+    page = list(islice(merge(*streams, key=lambda item: item[0]), limit))
+
+    has_more = len(page) > page_size
+    page = page[:page_size]
+    if has_more:
+        next_position = page[-1][0]
+    else:
+        # Реплика может отставать от базы, выдавшей прежний токен.
+        next_position = max(position, (horizon, DELETED, 0))
+    changed = [row for (_, kind, _), row in page if kind == CHANGED]
+    deleted = [
+        row.consultation_id for (_, kind, _), row in page if kind == DELETED
+    ]
+    return changed, deleted, next_position, has_more
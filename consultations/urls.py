@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
+from .async_views import AsyncConsultationView, ConsultationEventsView
 from .views import ConsultationViewSet
 
 app_name = 'consultations'
@@ -10,6 +12,40 @@ v1_router.register(
     'consultations', ConsultationViewSet, basename='consultations'
 )
 
-urlpatterns = [
-    path('v1/', include(v1_router.urls)),
+async_read_urlpatterns = [
+    path('consultations/', AsyncConsultationView.as_view()),
+    path(
+        'consultations/<int:pk>/',
+        AsyncConsultationView.as_view(detail=True),
+    ),
 ]
+
+events_urlpatterns = [
+    path(
+        'consultations/events/',
+        ConsultationEventsView.as_view(),
+        name='consultation-events',
+    ),
+]
+
+async_urlpatterns = events_urlpatterns + async_read_urlpatterns
+
+
+def build_urlpatterns():
+    """Маршруты приложения с учётом способа запуска."""
+
+    patterns = [
+        path('v1/', include(v1_router.urls)),
+    ]
+    # Маршруты идут перед роутером: его ``consultations/<pk>/``
+    # совпадает и с ``consultations/events/``.
+    if settings.ASYNC_READ_PATH:
+        patterns.insert(0, path('v1/', include(async_read_urlpatterns)))
+    # Поток событий работает только под ASGI, но не зависит от того,
+    # включены ли асинхронные представления чтения.
+    if settings.RUNNING_UNDER_ASGI:
+        patterns.insert(0, path('v1/', include(events_urlpatterns)))
+    return patterns
+
+
+urlpatterns = build_urlpatterns()
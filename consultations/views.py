@@ -1,55 +1,216 @@
+from django.conf import settings
+from django.http import Http404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
-from .models import Consultation
+from medical_service.renderers import ORJSONRenderer
+from medical_service.replicas import ReplicaReadMixin
+
+from .bulk import BulkConflictError, ConsultationBulkWriter
+from .cache import (
+    ALL_CONSULTATIONS_SCOPE,
+    RELATED_DATA_SCOPE,
+    CachedResponseMixin,
+    consultation_scope,
+    doctor_consultations_scope,
+    patient_consultations_scope,
+)
+from .expansion import apply_expansions, parse_expand
+from .export import EXPORT_FORMATS, export_response
+from .models import (
+    Consultation,
+    ConsultationTombstone,
+    InvalidStatusTransition,
+    StatusConflict,
+)
+from .pagination import ConsultationPagination
 from .permissions import (
+    IsAdmin,
     IsAdminOrDoctor,
     IsConsultationOwnerOrAdmin,
     IsDoctorOrPatient,
 )
-from .serializers import ConsultationSerializer
+from .rows import RowRepresentation
+from .search import ConsultationSearchFilter, rank_search
+from .serializers import (
+    ChangesQuerySerializer,
+    ConsultationChangeSerializer,
+    ConsultationSerializer,
+    StatsQuerySerializer,
+)
+from .stats import stats_rows
+from .sync import changes_page, encode_token
 
 
-class ConsultationViewSet(viewsets.ModelViewSet):
+class ConsultationViewSet(
+    ReplicaReadMixin, CachedResponseMixin, viewsets.ModelViewSet
+):
     """ViewSet для консультации."""
 
     queryset = Consultation.objects.all()
     serializer_class = ConsultationSerializer
+    pagination_class = ConsultationPagination
     permission_classes = (IsAuthenticated,)
     filter_backends = (
         DjangoFilterBackend,
-        filters.SearchFilter,
+        ConsultationSearchFilter,
         filters.OrderingFilter,
     )
-    search_fields = (
-        'doctor__user__first_name',
-        'doctor__user__last_name',
-        'doctor__user__patronymic',
-        'patient__user__first_name',
-        'patient__user__last_name',
-        'patient__user__patronymic',
-    )
+    search_fields = ('doctor_search_name', 'patient_search_name')
     filterset_fields = ('status',)
     ordering_fields = ('created_at',)
     ordering = ('-created_at',)
+    # Действия, в которых выборка ограничивается консультациями
+    # текущего врача или пациента.
+    scoped_actions = ('list', 'ranked_search', 'export', 'changes')
+    ranked_search_limit = 20
+    ranked_search_max_limit = 100
 
     def get_queryset(self):
         qs = Consultation.objects.all()
 
-        if self.action == 'list':
+        if self.action in self.scoped_actions:
             user = self.request.user
-            if user.role == user.UserRole.DOCTOR.value and hasattr(
-                user, 'doctor_profile'
-            ):
-                qs = qs.filter(doctor=user.doctor_profile)
-            elif user.role == user.UserRole.PATIENT.value and hasattr(
-                user, 'patient_profile'
-            ):
-                qs = qs.filter(patient=user.patient_profile)
-        return qs
+            if self.is_doctor_scoped(user):
+                qs = qs.filter(doctor_id=user.doctor_id)
+            elif self.is_patient_scoped(user):
+                qs = qs.filter(patient_id=user.patient_id)
+        return apply_expansions(qs, self.get_expand())
+
+    @staticmethod
+    def is_doctor_scoped(user):
+        return (
+            user.role == user.UserRole.DOCTOR.value
+            and user.doctor_id is not None
+        )
+
+    @staticmethod
+    def is_patient_scoped(user):
+        return (
+            user.role == user.UserRole.PATIENT.value
+            and user.patient_id is not None
+        )
+
+    def get_tombstones(self):
+        """Удаления консультаций для ленты изменений пользователя."""
+
+        user = self.request.user
+        if self.is_doctor_scoped(user):
+            return ConsultationTombstone.objects.filter(
+                doctor_id=user.doctor_id
+            )
+        if self.is_patient_scoped(user):
+            return ConsultationTombstone.objects.filter(
+                patient_id=user.patient_id
+            )
+        # Переназначенная консультация для остальных не удалена.
+        return ConsultationTombstone.objects.filter(reassigned=False)
+
+    def get_cache_scopes(self):
+        scopes = {RELATED_DATA_SCOPE}
+        user = self.request.user
+        if self.action == 'retrieve':
+            scopes.add(consultation_scope(self.kwargs[self.lookup_field]))
+        elif self.is_doctor_scoped(user):
+            scopes.add(doctor_consultations_scope(user.doctor_id))
+        elif self.is_patient_scoped(user):
+            scopes.add(patient_consultations_scope(user.patient_id))
+        else:
+            scopes.add(ALL_CONSULTATIONS_SCOPE)
+        return scopes
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        # В списке нет чисел с плавающей точкой, которые orjson
+        # записывает иначе, чем JSONRenderer.
+        if self.action != 'list':
+            return renderers
+        return [
+            ORJSONRenderer() if type(renderer) is JSONRenderer else renderer
+            for renderer in renderers
+        ]
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(self._list, request, *args, **kwargs)
+
+    def _list(self, request, *args, **kwargs):
+        if not self.use_fast_list():
+            return super().list(request, *args, **kwargs)
+        rows = RowRepresentation(self.get_serializer())
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset.values(*rows.columns))
+        return self.get_paginated_response(rows(page))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    async def alist(self, request, *args, **kwargs):
+        """Асинхронный вариант ``list`` для ASGI."""
+
+        return await self.acached_response(
+            self._alist, request, *args, **kwargs
+        )
+
+    async def _alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        if not self.use_fast_list():
+            page = await self.paginator.apaginate_queryset(
+                queryset, request, view=self
+            )
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        rows = RowRepresentation(self.get_serializer())
+        page = await self.paginator.apaginate_queryset(
+            queryset.values(*rows.columns), request, view=self
+        )
+        return self.get_paginated_response(rows(page))
+
+    def use_fast_list(self):
+        """
+        Строится ли список из ``values()`` без сериализатора
+        (см. ``consultations.rows``). Раскрытые связанные объекты
+        сериализуются как обычно.
+        """
+
+        return settings.FAST_LIST_PATH and not self.get_expand()
+
+    async def aretrieve(self, request, *args, **kwargs):
+        """Асинхронный вариант ``retrieve`` для ASGI."""
+
+        return await self.acached_response(
+            self._aretrieve, request, *args, **kwargs
+        )
+
+    async def _aretrieve(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            instance = await queryset.aget(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        except (Consultation.DoesNotExist, TypeError, ValueError):
+            raise Http404
+        self.check_object_permissions(request, instance)
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
+
+    def get_expand(self):
+        """Связанные объекты, запрошенные параметром ``expand``."""
+
+        return parse_expand(self.request)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['expand'] = self.get_expand()
+        return context
 
     def get_permissions(self):
         """Разрешения в зависимости от действия."""
@@ -65,8 +226,6 @@ class ConsultationViewSet(viewsets.ModelViewSet):
                 IsAuthenticated,
                 IsConsultationOwnerOrAdmin,
             ]
-        else:
-            self.permission_classes = [IsAuthenticated]
 
         return super().get_permissions()
 
@@ -81,17 +240,156 @@ class ConsultationViewSet(viewsets.ModelViewSet):
         permission_classes=[IsAuthenticated, IsAdminOrDoctor],
     )
     def change_status(self, request, pk=None):
-        """Метод для смены статуса консультации."""
+        """
+        Метод для смены статуса консультации.
+
+        Разрешены только переходы ``Consultation.STATUS_TRANSITIONS``.
+        Статус меняется условным ``UPDATE``: если его успели изменить
+        параллельно, возвращается ``409``.
+        """
 
         consultation = self.get_object()
         new_status = request.data.get('status')
-        valid_statuses = [choice[0] for choice in Consultation.Status.choices]
 
-        if new_status not in valid_statuses:
+        if new_status not in Consultation.Status.values:
             return Response({'detail': 'Недопустимый статус.'}, status=400)
 
-        consultation.status = new_status
-        consultation.save()
+        try:
+            consultation.transition_to(new_status)
+        except InvalidStatusTransition as error:
+            return Response({'detail': str(error)}, status=400)
+        except StatusConflict as error:
+            return Response({'detail': str(error)}, status=409)
         serializer = self.get_serializer(consultation)
 
         return Response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=['post'],
+        permission_classes=[IsAuthenticated, IsAdminOrDoctor],
+    )
+    def bulk(self, request):
+        """
+        Пакетное создание и обновление консультаций.
+
+        Принимает список консультаций; элементы с ``id`` обновляются,
+        остальные создаются. Если хотя бы один элемент некорректен,
+        ничего не сохраняется, а в ``errors`` возвращается список ошибок
+        по позициям пакета (``null`` для корректных элементов).
+        """
+
+        writer = ConsultationBulkWriter(request.user)
+        consultations, errors = writer.validate(request.data)
+        if any(errors):
+            return Response({'errors': errors}, status=400)
+
+        try:
+            created, _ = writer.save(consultations)
+        except BulkConflictError as error:
+            return Response({'detail': str(error)}, status=409)
+
+        serializer = self.get_serializer(consultations, many=True)
+        return Response(
+            {'results': serializer.data}, status=201 if created else 200
+        )
+
+    @action(detail=False, methods=['get'], url_path='search')
+    def ranked_search(self, request):
+        """
+        Ранжированный поиск по ФИО врача и пациента.
+
+        Возвращает не больше ``limit`` консультаций, отсортированных
+        по убыванию сходства с запросом ``q``.
+        """
+
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({'q': 'Укажите поисковый запрос.'})
+        try:
+            limit = int(
+                request.query_params.get('limit', self.ranked_search_limit)
+            )
+        except ValueError:
+            raise ValidationError({'limit': 'Ожидается целое число.'})
+        limit = max(1, min(limit, self.ranked_search_max_limit))
+
+        consultations = list(rank_search(self.get_queryset(), query)[:limit])
+        serializer = self.get_serializer(consultations, many=True)
+        results = [
+            {**item, 'rank': consultation.rank}
+            for item, consultation in zip(serializer.data, consultations)
+        ]
+        return Response({'results': results})
+
+    @action(
+        detail=False,
+        methods=['get'],
+        permission_classes=[IsAuthenticated, IsAdmin],
+    )
+    def stats(self, request):
+        """
+        Число консультаций по статусам за период ``date_from``–``date_to``
+        с группировкой ``group_by`` по врачам, клиникам и дням.
+
+        Читается из таблицы статистики, а не из консультаций.
+        """
+
+        serializer = StatsQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return Response({'results': stats_rows(**serializer.validated_data)})
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Потоковая выгрузка консультаций в CSV или NDJSON.
+
+        Формат задаётся параметром ``file_format`` (по умолчанию ``csv``),
+        фильтры и ограничения по роли те же, что и у списка.
+        """
+
+        file_format = request.query_params.get('file_format', 'csv')
+        if file_format not in EXPORT_FORMATS:
+            raise ValidationError(
+                {
+                    'file_format': 'Допустимые форматы: '
+                    + ', '.join(EXPORT_FORMATS)
+                    + '.'
+                }
+            )
+        queryset = self.filter_queryset(self.get_queryset())
+        # Тело ответа читается уже после выхода из представления,
+        # поэтому база данных выбирается заранее.
+        return export_response(queryset.using(queryset.db), file_format)
+
+    @action(
+        detail=False,
+        methods=['get'],
+        serializer_class=ConsultationChangeSerializer,
+    )
+    def changes(self, request):
+        """
+        Лента изменений консультаций после токена ``since``
+        (без токена — с начала).
+
+        Возвращает изменённые консультации, ``id`` удалённых (клиент
+        применяет сначала удаления, затем изменения) и токен для
+        следующего запроса. Пока ``has_more`` истинно, следующая
+        страница запрашивается сразу.
+        """
+
+        serializer = ChangesQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        changed, deleted, position, has_more = changes_page(
+            self.get_queryset(),
+            self.get_tombstones(),
+            **serializer.validated_data,
+        )
+        return Response(
+            {
+                'changed': self.get_serializer(changed, many=True).data,
+                'deleted': deleted,
+                'token': encode_token(position),
+                'has_more': has_more,
+            }
+        )
@@ -12,5 +12,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'medical_service.settings')
+os.environ['RUNNING_UNDER_ASGI'] = 'True'
+# Под ASGI список и детали консультаций обслуживаются async-представлениями.
+os.environ.setdefault('ASYNC_READ_PATH', 'True')
 
 application = get_asgi_application()
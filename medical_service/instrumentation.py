@@ -0,0 +1,133 @@
+"""
+Учёт SQL-запросов, выполненных при обработке запроса.
+
+``QueryRecorder`` подключается к соединениям через ``execute_wrapper``,
+поэтому работает и без ``DEBUG``: считает запросы, суммарное время
+в базе данных и повторы. Повтором считается запрос с тем же SQL
+и параметрами, похожим — с тем же SQL и другими параметрами
+(типичный признак N+1).
+"""
+
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+QUERY_COUNT_HEADER = 'X-DB-Query-Count'
+QUERY_TIME_HEADER = 'X-DB-Time-Ms'
+DUPLICATE_QUERIES_HEADER = 'X-DB-Duplicate-Queries'
+SIMILAR_QUERIES_HEADER = 'X-DB-Similar-Queries'
+
+
+class QueryRecorder:
+    """Контекстный менеджер, записывающий запросы ко всем базам данных."""
+
+    def __init__(self):
+        self.queries = []
+        self._stack = None
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                {
+                    'alias': context['connection'].alias,
+                    'sql': sql,
+                    'params': repr(params),
+                    'time': time.perf_counter() - start,
+                }
+            )
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def total_time(self):
+        """Суммарное время запросов в секундах."""
+
+        return sum(query['time'] for query in self.queries)
+
+    @property
+    def duplicates(self):
+        """Число запросов, повторяющих уже выполненный запрос."""
+
+        return self._repeats(
+            (query['sql'], query['params']) for query in self.queries
+        )
+
+    @property
+    def similar(self):
+        """Число запросов, повторяющих SQL с другими параметрами."""
+
+        return self._repeats(query['sql'] for query in self.queries)
+
+    @staticmethod
+    def _repeats(keys):
+        return sum(count - 1 for count in Counter(keys).values())
+
+    def report(self):
+        """Текст выполненных запросов для сообщений об ошибках."""
+
+        return '\n'.join(
+            f'{index}. {query["sql"]}'
+            for index, query in enumerate(self.queries, start=1)
+        )
+
+
+class QueryInstrumentationMiddleware:
+    """
+    В режиме ``DEBUG`` добавляет к ответу заголовки с числом
+    SQL-запросов, временем в базе данных и числом повторов.
+
+    Для потоковых ответов учитываются только запросы до начала
+    передачи тела.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.DEBUG:
+            return self.get_response(request)
+
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+        return self.add_headers(response, recorder)
+
+    async def __acall__(self, request):
+        if not settings.DEBUG:
+            return await self.get_response(request)
+
+        with QueryRecorder() as recorder:
+            response = await self.get_response(request)
+        return self.add_headers(response, recorder)
+
+    @staticmethod
+    def add_headers(response, recorder):
+        response[QUERY_COUNT_HEADER] = recorder.count
+        response[QUERY_TIME_HEADER] = f'{recorder.total_time * 1000:.2f}'
+        response[DUPLICATE_QUERIES_HEADER] = recorder.duplicates
+        response[SIMILAR_QUERIES_HEADER] = recorder.similar
+        return response
@@ -0,0 +1,290 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date, datetime
+
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Курсорная (keyset) пагинация.
+
+    Позиция страницы кодируется значениями полей сортировки последней
+    (или первой) записи, а выборка следующей страницы строится условием
+    ``(field, id) < (value, pk)``. В отличие от OFFSET стоимость запроса
+    не зависит от глубины страницы при наличии составного индекса
+    по полям сортировки.
+    """
+
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Некорректный курсор.'
+
+    # Сортировка по умолчанию. Последним полем всегда должен идти
+    # уникальный ключ, поэтому ``id`` добавляется автоматически.
+    ordering = ('-id',)
+    tiebreaker = 'id'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.prepare(queryset, request, view)
+        return self.build_page(list(queryset[: self.page_size + 1]))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Асинхронный вариант ``paginate_queryset``."""
+
+        queryset = self.prepare(queryset, request, view)
+        return self.build_page(
+            [item async for item in queryset[: self.page_size + 1]]
+        )
+
+    def prepare(self, queryset, request, view):
+        """Читает параметры запроса и возвращает выборку страницы."""
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request, queryset.model)
+        return self.build_queryset(queryset)
+
+    def build_queryset(self, queryset):
+        """Применяет сортировку и условие курсора к выборке."""
+
+        reverse = self.cursor is not None and self.cursor['reverse']
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(self._invert(field) for field in ordering)
+        queryset = queryset.order_by(*ordering)
+        if self.cursor is not None:
+            queryset = queryset.filter(
+                self._keyset_filter(ordering, self.cursor['position'])
+            )
+        return queryset
+
+    def build_page(self, results):
+        """Отсекает лишнюю запись и вычисляет наличие соседних страниц."""
+
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+
+        if self.cursor is not None and self.cursor['reverse']:
+            results.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                'next': self.get_next_link(),
+                'previous': self.get_previous_link(),
+                'results': data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Возвращает сортировку с обязательным уникальным полем в конце.
+
+        Если у представления подключён ``OrderingFilter``, учитывается
+        параметр ``ordering`` из запроса.
+        """
+
+        ordering = None
+        for backend in getattr(view, 'filter_backends', ()):
+            if issubclass(backend, OrderingFilter):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        ordering = tuple(ordering or self.ordering)
+
+        fields = [field.lstrip('-') for field in ordering]
+        if self.tiebreaker not in fields:
+            descending = ordering[-1].startswith('-')
+            ordering += (
+                f'-{self.tiebreaker}' if descending else self.tiebreaker,
+            )
+        return ordering
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(
+            self.get_position(self.page[-1]), reverse=False
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(
+            self.get_position(self.page[0]), reverse=True
+        )
+
+    def decode_cursor(self, request, model):
+        """
+        Читает курсор из запроса и приводит значения позиции к типам
+        полей сортировки ``model``.
+        """
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            position = cursor['p']
+            reverse = bool(cursor.get('r'))
+            if not isinstance(position, list) or len(position) != len(
+                self.ordering
+            ):
+                raise ValueError('Длина позиции не совпадает с сортировкой.')
+            position = [
+                self._get_field(model, field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, position)
+            ]
+            # Условие ``field < NULL`` построить нельзя.
+            if None in position:
+                raise ValueError('Пустое значение в позиции курсора.')
+        except (
+            TypeError,
+            ValueError,
+            KeyError,
+            UnicodeError,
+            ValidationError,
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return {'position': position, 'reverse': reverse}
+
+    def encode_cursor(self, position, reverse):
+        cursor = {'p': position}
+        if reverse:
+            cursor['r'] = 1
+        data = json.dumps(cursor, separators=(',', ':'))
+        encoded = urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def get_position(self, item):
+        """Значения полей сортировки для объекта или строки ``values()``."""
+
+        position = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            if isinstance(item, dict):
+                value = item[name]
+            else:
+                value = item
+                for part in name.split('__'):
+                    value = getattr(value, part)
+            if isinstance(value, (datetime, date)):
+                value = value.isoformat()
+            position.append(value)
+        return position
+
+    @staticmethod
+    def _get_field(model, name):
+        """Поле модели по пути вида ``user__last_name``."""
+
+        *relations, name = name.split('__')
+        for relation in relations:
+            model = model._meta.get_field(relation).related_model
+        return model._meta.get_field(name)
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def _keyset_filter(ordering, position):
+        """
+        Строит условие «строго после позиции» для лексикографической
+        сортировки: ``a > x OR (a = x AND b > y) OR ...``.
+
+        Дополнительное условие ``a >= x`` не меняет результат, но даёт
+        планировщику границу диапазона для сканирования индекса.
+        """
+
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+
+        first = ordering[0].lstrip('-')
+        bound = 'lte' if ordering[0].startswith('-') else 'gte'
+        return Q(**{f'{first}__{bound}': position[0]}) & condition
+
+
+def estimate_count(queryset):
+    """Число строк выборки по оценке планировщика (``EXPLAIN``)."""
+
+    queryset = queryset.order_by().values('pk')
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        (plan,) = cursor.fetchone()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']['Plan Rows']
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор админки для больших таблиц.
+
+    ``COUNT(*)`` читает все строки выборки, поэтому число строк берётся
+    из оценки планировщика, а точно считается, только если оценка
+    меньше ``exact_count_limit``. На больших выборках число строк
+    и номер последней страницы приблизительны.
+    """
+
+    exact_count_limit = 10000
+
+    @cached_property
+    def count(self):
+        if not isinstance(self.object_list, QuerySet):
+            return super().count
+        estimate = estimate_count(self.object_list)
+        if estimate < self.exact_count_limit:
+            return super().count
+        return estimate
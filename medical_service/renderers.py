@@ -0,0 +1,71 @@
+"""
+JSON-рендерер на orjson.
+
+orjson — необязательная зависимость: без неё, а также для ответов
+с отступами и настроек DRF, которые orjson не воспроизводит,
+используется стандартный ``JSONRenderer``. Значения, которые orjson
+не сериализует сам (даты, ``Decimal``, ленивые строки), передаются
+кодировщику DRF.
+
+Вывод совпадает с выводом ``JSONRenderer`` побайтно, только если
+в данных нет чисел с плавающей точкой: orjson записывает ``1e16``
+и ``1e-7`` без знака и ведущего нуля в порядке, а ``NaN`` и
+бесконечность — как ``null`` вместо ошибки. Поэтому рендерер
+подключается не глобально, а к спискам и потокам консультаций,
+где таких чисел нет.
+"""
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    if orjson is not None
+    else 0
+)
+LINE_SEPARATORS = (
+    ('\u2028'.encode(), b'\\u2028'),
+    ('\u2029'.encode(), b'\\u2029'),
+)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """``JSONRenderer``, кодирующий ответ через orjson."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not self.use_orjson(accepted_media_type, renderer_context):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        if data is None:
+            return b''
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=ORJSON_OPTIONS,
+            )
+        except orjson.JSONEncodeError:
+            # Например, целые больше 64 бит.
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        for separator, escaped in LINE_SEPARATORS:
+            ret = ret.replace(separator, escaped)
+        return ret
+
+    def use_orjson(self, accepted_media_type, renderer_context):
+        """Совпадёт ли вывод orjson с выводом ``JSONRenderer``."""
+
+        return (
+            orjson is not None
+            and self.compact
+            and not self.ensure_ascii
+            and self.get_indent(accepted_media_type, renderer_context or {})
+            is None
+        )
@@ -0,0 +1,224 @@
+"""
+Чтение с реплик базы данных.
+
+Запросы на чтение уходят на реплики только внутри ``replica_reads()``:
+его включают безопасные запросы API консультаций и врачей
+(``ReplicaReadMixin``) и списки объектов в админке
+(``ReplicaAdminMixin``). Остальные чтения, в том числе внутри
+транзакций и при записи, выполняются на основной базе.
+
+После записи пользователь на ``READ_YOUR_WRITES_WINDOW`` секунд
+закрепляется за основной базой, чтобы сразу видеть свои изменения.
+Отставание реплик проверяется не чаще раза в
+``REPLICA_LAG_CHECK_INTERVAL`` секунд; реплика с отставанием больше
+``REPLICA_MAX_LAG`` секунд или недоступная реплика исключается
+из ротации до следующей проверки.
+"""
+
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+logger = logging.getLogger(__name__)
+
+# Отставание реплики в секундах. Если реплика воспроизвела весь
+# полученный WAL, отставания нет, даже если запись давно не было.
+REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+# Результаты проверки реплик: alias -> (время проверки, исправна ли).
+_replica_health = {}
+
+
+def replica_aliases():
+    return getattr(settings, 'REPLICA_DATABASES', ())
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """Разрешает чтение с реплик внутри блока."""
+
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def replica_reads_enabled():
+    """Разрешено ли сейчас чтение с реплик."""
+
+    return _replica_reads.get() and bool(replica_aliases())
+
+
+def replica_staleness():
+    """
+    Насколько данные реплики в ротации могут отставать от основной
+    базы: допустимое отставание плюс период его проверки.
+    """
+
+    return settings.REPLICA_MAX_LAG + settings.REPLICA_LAG_CHECK_INTERVAL
+
+
+def pinned_key(user_id):
+    return f'db:pinned:{user_id}'
+
+
+def pin_to_primary(user):
+    """Закрепляет чтения пользователя за основной базой после записи."""
+
+    if user.is_authenticated:
+        cache.set(
+            pinned_key(user.pk), True, settings.READ_YOUR_WRITES_WINDOW
+        )
+
+
+def can_read_replica(user):
+    return not (user.is_authenticated and cache.get(pinned_key(user.pk)))
+
+
+async def acan_read_replica(user):
+    """Асинхронный вариант ``can_read_replica``."""
+
+    return not (
+        user.is_authenticated and await cache.aget(pinned_key(user.pk))
+    )
+
+
+def replica_lag(alias):
+    """Отставание реплики в секундах или ``None``, если она недоступна."""
+
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(REPLICA_LAG_SQL)
+            (lag,) = cursor.fetchone()
+    except DatabaseError:
+        return None
+    return lag
+
+
+def is_replica_healthy(alias):
+    now = time.monotonic()
+    checked = _replica_health.get(alias)
+    if checked is not None and (
+        now - checked[0] < settings.REPLICA_LAG_CHECK_INTERVAL
+    ):
+        return checked[1]
+
+    lag = replica_lag(alias)
+    healthy = lag is not None and lag <= settings.REPLICA_MAX_LAG
+    if not healthy:
+        logger.warning(
+            'Реплика %s исключена из ротации, отставание: %s.', alias, lag
+        )
+    _replica_health[alias] = (now, healthy)
+    return healthy
+
+
+def reset_replica_health():
+    """Сбрасывает результаты проверок, чтобы реплики проверились заново."""
+
+    _replica_health.clear()
+
+
+def choose_replica():
+    """Случайная исправная реплика или основная база, если таких нет."""
+
+    healthy = [
+        alias for alias in replica_aliases() if is_replica_healthy(alias)
+    ]
+    return random.choice(healthy) if healthy else DEFAULT_DB_ALIAS
+
+
+class ReplicaRouter:
+    """
+    Маршрутизатор: чтение с реплик внутри ``replica_reads()``,
+    запись и миграции — в основной базе.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (
+            not _replica_reads.get()
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return choose_replica()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in replica_aliases()
+
+
+class ReplicaReadMixin:
+    """
+    Миксин для представлений DRF: безопасные запросы читают с реплик,
+    успешная запись закрепляет пользователя за основной базой.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS:
+            self._replica_reads = replica_reads(
+                can_read_replica(request.user)
+            )
+            self._replica_reads.__enter__()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        replica_context = getattr(self, '_replica_reads', None)
+        if replica_context is not None:
+            self._replica_reads = None
+            replica_context.__exit__(None, None, None)
+        elif (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+        ):
+            pin_to_primary(request.user)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class ReplicaAdminMixin:
+    """
+    Миксин для админки: списки объектов читаются с реплик,
+    изменения закрепляют пользователя за основной базой.
+    """
+
+    def changelist_view(self, request, extra_context=None):
+        if request.method not in SAFE_METHODS:
+            return super().changelist_view(request, extra_context)
+
+        with replica_reads(can_read_replica(request.user)):
+            response = super().changelist_view(request, extra_context)
+            if hasattr(response, 'render'):
+                response.render()
+        return response
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        pin_to_primary(request.user)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        pin_to_primary(request.user)
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        pin_to_primary(request.user)
@@ -33,15 +33,18 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'django_filters',
     'rest_framework_simplejwt',
     'consultations.apps.ConsultationsConfig',
     'clinics.apps.ClinicsConfig',
     'users.apps.UsersConfig',
+    'benchmarks.apps.BenchmarksConfig',
 ]
 
 MIDDLEWARE = [
+    'medical_service.instrumentation.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -86,6 +89,33 @@ DATABASES = {
     }
 }
 
+# Реплики только для чтения: хосты через запятую в DB_REPLICA_HOSTS.
+# В тестах реплики зеркалируют основную базу.
+REPLICA_DATABASES = []
+for index, host in enumerate(
+    filter(None, os.getenv('DB_REPLICA_HOSTS', default='').split(',')),
+    start=1,
+):
+    alias = f'replica_{index}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['medical_service.replicas.ReplicaRouter']
+
+# Сколько секунд после записи пользователь читает из основной базы.
+READ_YOUR_WRITES_WINDOW = int(
+    os.getenv('READ_YOUR_WRITES_WINDOW', default='5')
+)
+# Допустимое отставание реплики и период его проверки, в секундах.
+REPLICA_MAX_LAG = float(os.getenv('REPLICA_MAX_LAG', default='5'))
+REPLICA_LAG_CHECK_INTERVAL = float(
+    os.getenv('REPLICA_LAG_CHECK_INTERVAL', default='5')
+)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -110,17 +140,75 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.ClaimsJWTAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ],
 }
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_OBTAIN_SERIALIZER': (
+        'users.serializers.ClaimsTokenObtainPairSerializer'
+    ),
+    'TOKEN_REFRESH_SERIALIZER': (
+        'users.serializers.ClaimsTokenRefreshSerializer'
+    ),
 }
 
 AUTH_USER_MODEL = 'users.CustomUser'
 
+# Приложение запущено под ASGI (задаётся в medical_service/asgi.py).
+RUNNING_UNDER_ASGI = (
+    os.getenv('RUNNING_UNDER_ASGI', default='False') == 'True'
+)
+
+# Асинхронные представления чтения консультаций. Включаются
+# при запуске под ASGI (см. medical_service/asgi.py).
+ASYNC_READ_PATH = os.getenv('ASYNC_READ_PATH', default='False') == 'True'
+
+# Список консультаций без expand строится из values() без сериализатора.
+FAST_LIST_PATH = os.getenv('FAST_LIST_PATH', default='True') == 'True'
+
+# Брокер событий об изменении консультаций для потока
+# /api/v1/consultations/events/ (подключается под ASGI независимо
+# от ASYNC_READ_PATH) и интервал комментариев,
+# поддерживающих соединение, в секундах.
+CONSULTATION_EVENTS_BROKER = os.getenv(
+    'CONSULTATION_EVENTS_BROKER',
+    default='consultations.events.PostgresBroker',
+)
+CONSULTATION_EVENTS_HEARTBEAT = float(
+    os.getenv('CONSULTATION_EVENTS_HEARTBEAT', default='15')
+)
+
+# Число процессов для нормализации телефонов при импорте пациентов
+# через API. Больше одного — импорт запускает пул процессов из воркера.
+PATIENT_IMPORT_WORKERS = int(os.getenv('PATIENT_IMPORT_WORKERS', default='1'))
+
+# Напоминания о консультациях (см. consultations/reminders.py):
+# за сколько часов до начала консультации их отправлять и бэкенды
+# отправки по каналам.
+REMINDER_LEAD_TIME = timedelta(
+    hours=int(os.getenv('REMINDER_LEAD_HOURS', default='24'))
+)
+REMINDER_BACKENDS = {
+    'email': os.getenv(
+        'REMINDER_EMAIL_BACKEND',
+        default='consultations.reminders.EmailBackend',
+    ),
+    'sms': os.getenv(
+        'REMINDER_SMS_BACKEND',
+        default='consultations.reminders.ConsoleBackend',
+    ),
+}
+REMINDER_FILE_PATH = os.getenv(
+    'REMINDER_FILE_PATH', default=str(BASE_DIR / 'reminders.log')
+)
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
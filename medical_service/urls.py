@@ -18,4 +18,6 @@ urlpatterns = [
         name='token_refresh',
     ),
     path('api/', include('consultations.urls')),
+    path('api/', include('users.urls')),
+    path('api/', include('clinics.urls')),
 ]
@@ -0,0 +1,191 @@
+from contextlib import contextmanager
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from medical_service.instrumentation import QueryRecorder
+from users.models import CustomUser, Doctor, Patient
+
+
+REPLICA_ALIAS = 'replica'
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings():
+    """
+    Добавляет реплику, зеркалирующую основную тестовую базу:
+    маршрутизация проверяется по алиасу соединения.
+    """
+
+    default = connections.settings[DEFAULT_DB_ALIAS]
+    connections.settings[REPLICA_ALIAS] = {
+        **default,
+        'TEST': {**default['TEST'], 'MIRROR': DEFAULT_DB_ALIAS},
+    }
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Очищает кэш, чтобы тесты не зависели друг от друга."""
+
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Возвращает контекстный менеджер, проверяющий, что блок кода
+    выполняет не больше ``limit`` SQL-запросов.
+
+        with query_budget(2) as queries:
+            api_client.get(url)
+    """
+
+    @contextmanager
+    def budget(limit):
+        with QueryRecorder() as recorder:
+            yield recorder
+        assert recorder.count <= limit, (
+            f'Выполнено {recorder.count} SQL-запросов при бюджете {limit}:\n'
+            f'{recorder.report()}'
+        )
+
+    return budget
+
+
+@pytest.fixture
+def api_client():
+    """Возвращает экземпляр APIClient."""
+
+    return APIClient()
+
+
+@pytest.fixture
+def admin_user(db, django_user_model):
+    """Создаёт и возвращает пользователя-администратора."""
+
+    user = django_user_model.objects.create_user(
+        username='admin',
+        password='password',
+        role=CustomUser.UserRole.ADMIN.value,
+        first_name='Admin',
+        last_name='User',
+    )
+    return user
+
+
+@pytest.fixture
+def doctor_user(db, django_user_model):
+    """Создаёт и возвращает пользователя-врача с профилем Doctor."""
+
+    user = django_user_model.objects.create_user(
+        username='doctor',
+        password='password',
+        role=CustomUser.UserRole.DOCTOR.value,
+        first_name='John',
+        last_name='Doe',
+    )
+    doctor = Doctor.objects.create(user=user, specialization="Cardiology")
+    return doctor
+
+
+@pytest.fixture
+def other_doctor(db, django_user_model):
+    """Создаёт и возвращает другого пользователя-врача с профилем Doctor."""
+
+    user = django_user_model.objects.create_user(
+        username='doctor2',
+        password='password',
+        role=CustomUser.UserRole.DOCTOR.value,
+        first_name='Alice',
+        last_name='Smith',
+    )
+    doctor = Doctor.objects.create(user=user, specialization="Neurology")
+    return doctor
+
+
+@pytest.fixture
+def patient_user(db, django_user_model):
+    """Создаёт и возвращает пользователя-пациента с профилем Patient."""
+
+    user = django_user_model.objects.create_user(
+        username='patient',
+        password='password',
+        role=CustomUser.UserRole.PATIENT.value,
+        first_name='Jane',
+        last_name='Doe',
+    )
+    patient = Patient.objects.create(
+        user=user, phone='+71234567890', email='jane@example.com'
+    )
+    return patient
+
+
+@pytest.fixture
+def other_patient(db, django_user_model):
+    """
+    Создаёт и возвращает другого пользователя-пациента с профилем Patient.
+    """
+
+    user = django_user_model.objects.create_user(
+        username='patient2',
+        password='password',
+        role=CustomUser.UserRole.PATIENT.value,
+        first_name='Bob',
+        last_name='Brown',
+    )
+    patient = Patient.objects.create(
+        user=user, phone='+79876543210', email='bob@example.com'
+    )
+    return patient
+
+
+@pytest.fixture
+def consultation_payload(doctor_user, patient_user):
+    """Возвращает словарь с данными для создания Consultation."""
+
+    now = timezone.now() + timedelta(hours=1)
+    return {
+        'start_time': now.isoformat(),
+        'end_time': (now + timedelta(hours=1)).isoformat(),
+        'status': 'Waiting',
+        'doctor': doctor_user.pk,
+        'patient': patient_user.pk,
+    }
+
+
+@pytest.fixture
+def create_consultations(doctor_user, patient_user):
+    """
+    Возвращает функцию, создающую несколько непересекающихся
+    консультаций (по умолчанию — для doctor_user и patient_user).
+    """
+
+    from consultations.models import Consultation
+
+    start = timezone.now() + timedelta(days=1)
+    created = []
+
+    def create(count, **kwargs):
+        kwargs.setdefault('doctor', doctor_user)
+        kwargs.setdefault('patient', patient_user)
+        kwargs.setdefault('status', Consultation.Status.WAITING.value)
+        consultations = []
+        for _ in range(count):
+            offset = timedelta(hours=len(created))
+            consultation = Consultation.objects.create(
+                start_time=start + offset,
+                end_time=start + offset + timedelta(minutes=30),
+                **kwargs,
+            )
+            created.append(consultation)
+            consultations.append(consultation)
+        return consultations
+
+    return create
@@ -0,0 +1,166 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from django.contrib.admin.sites import site
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from consultations.models import Consultation
+from medical_service.pagination import EstimatedCountPaginator
+from users.models import Patient
+
+CHANGELIST_URL = '/admin/consultations/consultation/'
+PATIENTS_URL = '/admin/users/patient/'
+DOCTORS_URL = '/admin/users/doctor/'
+
+
+@pytest.fixture
+def admin_client(client, django_user_model):
+    """Клиент, вошедший в админку суперпользователем."""
+
+    superuser = django_user_model.objects.create_superuser(
+        username='superuser', password='password'
+    )
+    client.force_login(superuser)
+    return client
+
+
+@pytest.mark.django_db
+def test_changelist_queries_do_not_grow(
+    admin_client, create_consultations, other_doctor, patient_user
+):
+    """
+    Проверяет, что число запросов списка консультаций не зависит
+    от числа строк, а врачи и пациенты выбираются в фильтрах через
+    автодополнение, а не списком всех объектов.
+    """
+
+    create_consultations(2)
+    with CaptureQueriesContext(connection) as few:
+        response = admin_client.get(CHANGELIST_URL)
+    assert response.status_code == 200
+
+    create_consultations(5)
+    create_consultations(3, doctor=other_doctor)
+    with CaptureQueriesContext(connection) as many:
+        response = admin_client.get(CHANGELIST_URL)
+    assert response.status_code == 200
+    assert len(many) == len(few)
+
+    content = response.content.decode()
+    assert 'data-filter-parameter="doctor__id__exact"' in content
+    assert 'data-filter-parameter="patient__id__exact"' in content
+    assert 'consultations/js/autocomplete_filter.js' in content
+    assert '?doctor__id__exact=' not in content
+
+    response = admin_client.get(
+        CHANGELIST_URL, {'doctor__id__exact': other_doctor.pk}
+    )
+    assert response.status_code == 200
+    assert len(response.context['cl'].result_list) == 3
+    assert (
+        f'<option value="{other_doctor.pk}" selected>Alice Smith</option>'
+        in response.content.decode()
+    )
+
+
+@pytest.mark.django_db
+def test_date_hierarchy_walks_index(admin_client, doctor_user, patient_user):
+    """
+    Проверяет, что иерархия дат по ``start_time`` получает периоды
+    запросами по одному на непустой период и совпадает с ``datetimes()``.
+    """
+
+    for start in (
+        datetime(2031, 1, 15, 10, tzinfo=timezone.utc),
+        datetime(2031, 1, 20, 10, tzinfo=timezone.utc),
+        datetime(2031, 3, 1, 10, tzinfo=timezone.utc),
+        datetime(2031, 12, 31, 23, tzinfo=timezone.utc),
+        datetime(2032, 2, 1, 10, tzinfo=timezone.utc),
+    ):
+        Consultation.objects.create(
+            doctor=doctor_user,
+            patient=patient_user,
+            start_time=start,
+            end_time=start + timedelta(minutes=30),
+        )
+    model_admin = site.get_model_admin(Consultation)
+    request = RequestFactory().get(CHANGELIST_URL)
+    queryset = model_admin.get_queryset(request)
+
+    for kind, periods in (('year', 2), ('month', 4), ('day', 5)):
+        with CaptureQueriesContext(connection) as queries:
+            walked = queryset.datetimes('start_time', kind)
+        assert walked == list(
+            Consultation.objects.datetimes('start_time', kind)
+        )
+        assert len(walked) == periods
+        assert len(queries) == periods + 1
+
+    response = admin_client.get(CHANGELIST_URL, {'start_time__year': 2031})
+    assert response.status_code == 200
+    content = response.content.decode()
+    assert 'start_time__month=3' in content
+    assert 'start_time__month=2' not in content
+
+
+@pytest.mark.django_db
+def test_estimated_count_paginator(create_consultations, monkeypatch):
+    """
+    Проверяет, что большая выборка считается по оценке планировщика
+    без ``COUNT(*)``, а маленькая — точно.
+    """
+
+    create_consultations(3)
+    queryset = Consultation.objects.order_by('-created_at', '-pk')
+
+    assert EstimatedCountPaginator(queryset, 2).count == 3
+
+    monkeypatch.setattr(EstimatedCountPaginator, 'exact_count_limit', 0)
+    with CaptureQueriesContext(connection) as queries:
+        count = EstimatedCountPaginator(queryset, 2).count
+    assert count >= 0
+    assert [query['sql'].split()[0] for query in queries] == ['EXPLAIN']
+
+
+@pytest.mark.django_db
+def test_patient_search(admin_client, patient_user, django_user_model):
+    """
+    Проверяет, что пациенты в админке ищутся по телефону и e-mail
+    точным совпадением, а по остальным терминам — по ФИО.
+    """
+
+    user = django_user_model.objects.create_user(
+        username='patient2', first_name='Peter', last_name='Ivanov'
+    )
+    other = Patient.objects.create(
+        user=user, phone='+79990000000', email='petr@example.com'
+    )
+
+    for query, expected in (
+        ('8 (999) 000-00-00', [other]),
+        ('+7 999 000 00 00', [other]),
+        ('jane@EXAMPLE.com', [patient_user]),
+        ('ivANOV', [other]),
+        ('Jane Doe', [patient_user]),
+        ('example.com', []),
+    ):
+        response = admin_client.get(PATIENTS_URL, {'q': query})
+        assert response.status_code == 200
+        assert list(response.context['cl'].result_list) == expected, query
+
+
+@pytest.mark.django_db
+def test_doctor_search(admin_client, doctor_user, other_doctor):
+    """Проверяет поиск врачей в админке по ФИО и специализации."""
+
+    for query, expected in (
+        ('cardio', [doctor_user]),
+        ('NEUROLOGY', [other_doctor]),
+        ('smith', [other_doctor]),
+        ('Smith cardio', []),
+    ):
+        response = admin_client.get(DOCTORS_URL, {'q': query})
+        assert response.status_code == 200
+        assert list(response.context['cl'].result_list) == expected, query
@@ -0,0 +1,162 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import include, path
+from rest_framework.renderers import JSONRenderer
+from rest_framework.throttling import BaseThrottle
+from rest_framework_simplejwt.tokens import AccessToken
+
+from clinics.models import Clinic
+from consultations.models import Consultation
+from consultations.urls import async_urlpatterns
+from consultations.views import ConsultationViewSet
+from medical_service.renderers import ORJSONRenderer
+from users.serializers import ClaimsTokenObtainPairSerializer
+
+urlpatterns = [
+    path('async/', include(async_urlpatterns)),
+    path('', include('medical_service.urls')),
+]
+
+pytestmark = pytest.mark.urls(__name__)
+
+ASYNC_LIST_URL = '/async/consultations/'
+SYNC_LIST_URL = '/api/v1/consultations/'
+
+
+def auth_headers(user):
+    token = ClaimsTokenObtainPairSerializer.get_token(user).access_token
+    return {'Authorization': f'Bearer {token}'}
+
+
+def async_get(url, user=None, headers=None, **kwargs):
+    headers = {**(auth_headers(user) if user else {}), **(headers or {})}
+    return async_to_sync(AsyncClient().get)(url, headers=headers, **kwargs)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('expand', ('', 'doctor,patient', 'clinics'))
+def test_async_list_matches_sync(
+    api_client, doctor_user, create_consultations, expand
+):
+    """Проверяет, что async-список совпадает с синхронным."""
+
+    clinic = Clinic.objects.create(
+        name='Клиника', legal_address='ул. 1', physical_address='ул. 2'
+    )
+    doctor_user.clinics.add(clinic)
+    create_consultations(5)
+    params = {'page_size': 2, 'expand': expand}
+
+    response = async_get(ASYNC_LIST_URL, doctor_user.user, data=params)
+    api_client.credentials(
+        HTTP_AUTHORIZATION=auth_headers(doctor_user.user)['Authorization']
+    )
+    expected = api_client.get(SYNC_LIST_URL, params)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data['results'] == expected.json()['results']
+    assert data['next'].replace('/async', '/api/v1') == expected.json()['next']
+
+
+@pytest.mark.django_db
+def test_async_list_scoped_by_role(
+    patient_user, other_patient, create_consultations
+):
+    """Проверяет ограничение async-списка консультациями пациента."""
+
+    create_consultations(2, patient=other_patient)
+    own = create_consultations(1)
+
+    response = async_get(ASYNC_LIST_URL, patient_user.user)
+
+    assert [item['id'] for item in response.json()['results']] == [
+        own[0].pk
+    ]
+
+
+@pytest.mark.django_db
+def test_async_retrieve(doctor_user, create_consultations):
+    """Проверяет async-получение консультации и ответ 304 по ETag."""
+
+    consultation = create_consultations(1)[0]
+    url = f'{ASYNC_LIST_URL}{consultation.pk}/'
+
+    response = async_get(url, doctor_user.user)
+    assert response.status_code == 200
+    assert response.json()['id'] == consultation.pk
+
+    response = async_get(
+        url, doctor_user.user, headers={'If-None-Match': response['ETag']}
+    )
+    assert response.status_code == 304
+
+    response = async_get(f'{ASYNC_LIST_URL}0/', doctor_user.user)
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_async_permissions(admin_user, create_consultations):
+    """Проверяет аутентификацию и разрешения async-представлений."""
+
+    consultation = create_consultations(1)[0]
+
+    assert async_get(ASYNC_LIST_URL).status_code == 401
+
+    token = AccessToken.for_user(admin_user)
+    token['role'] = admin_user.role
+    token['ver'] = admin_user.token_version + 1
+    response = async_get(
+        ASYNC_LIST_URL, headers={'Authorization': f'Bearer {token}'}
+    )
+    assert response.status_code == 401
+
+    url = f'{ASYNC_LIST_URL}{consultation.pk}/'
+    assert async_get(url, admin_user).status_code == 403
+
+
+class DenyThrottle(BaseThrottle):
+    def allow_request(self, request, view):
+        return False
+
+
+@pytest.mark.django_db
+def test_async_negotiation_and_throttles(
+    doctor_user, create_consultations, monkeypatch
+):
+    """
+    Проверяет, что async-представление согласует формат ответа как DRF,
+    кодирует orjson только список и применяет ограничения частоты.
+    """
+
+    consultation = create_consultations(1)[0]
+    detail_url = f'{ASYNC_LIST_URL}{consultation.pk}/'
+
+    listed = async_get(ASYNC_LIST_URL, doctor_user.user)
+    detail = async_get(detail_url, doctor_user.user)
+    assert type(listed.accepted_renderer) is ORJSONRenderer
+    assert type(detail.accepted_renderer) is JSONRenderer
+
+    response = async_get(
+        ASYNC_LIST_URL, doctor_user.user, headers={'Accept': 'text/csv'}
+    )
+    assert response.status_code == 406
+
+    monkeypatch.setattr(ConsultationViewSet, 'throttle_classes', [DenyThrottle])
+    assert async_get(detail_url, doctor_user.user).status_code == 429
+
+
+@pytest.mark.django_db
+def test_async_view_delegates_writes(doctor_user, consultation_payload):
+    """Проверяет, что запись передаётся синхронному представлению."""
+
+    response = async_to_sync(AsyncClient().post)(
+        ASYNC_LIST_URL,
+        consultation_payload,
+        content_type='application/json',
+        headers=auth_headers(doctor_user.user),
+    )
+
+    assert response.status_code == 201
+    assert Consultation.objects.filter(pk=response.json()['id']).exists()
@@ -0,0 +1,131 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+
+def obtain_tokens(api_client, username):
+    response = api_client.post(
+        reverse('token_obtain_pair'),
+        data={'username': username, 'password': 'password'},
+        format='json',
+    )
+    assert response.status_code == 200, response.data
+    return response.json()
+
+
+@pytest.mark.django_db
+def test_token_contains_profile_claims(api_client, doctor_user):
+    """Проверяет, что токен содержит роль и профиль пользователя."""
+
+    tokens = obtain_tokens(api_client, doctor_user.user.username)
+    token = AccessToken(tokens['access'])
+
+    assert token['role'] == 'Doctor'
+    assert token['doctor_id'] == doctor_user.pk
+    assert token['patient_id'] is None
+    assert token['ver'] == doctor_user.user.token_version
+
+
+@pytest.mark.django_db
+def test_list_makes_no_auth_queries(
+    api_client, doctor_user, create_consultations
+):
+    """Проверяет, что аутентификация не обращается к таблице пользователей."""
+
+    create_consultations(2)
+    tokens = obtain_tokens(api_client, doctor_user.user.username)
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens["access"]}')
+    url = reverse('consultations:consultations-list')
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(url, format='json')
+
+    assert response.status_code == 200
+    assert len(response.json()['results']) == 2
+    assert not any(
+        'users_customuser' in query['sql'] or 'users_doctor' in query['sql']
+        for query in queries
+    )
+
+
+@pytest.mark.django_db
+def test_password_change_revokes_tokens(api_client, patient_user):
+    """Проверяет отзыв токенов при смене пароля."""
+
+    tokens = obtain_tokens(api_client, patient_user.user.username)
+    user = patient_user.user
+    user.set_password('new-password')
+    user.save()
+
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens["access"]}')
+    response = api_client.get(
+        reverse('consultations:consultations-list'), format='json'
+    )
+    refresh = api_client.post(
+        reverse('token_refresh'),
+        data={'refresh': tokens['refresh']},
+        format='json',
+    )
+
+    assert response.status_code == 401
+    assert refresh.status_code == 401
+
+
+@pytest.mark.django_db
+def test_deactivation_and_role_change_revoke_tokens(
+    api_client, doctor_user, other_doctor
+):
+    """Проверяет отзыв токенов при блокировке и смене роли."""
+
+    url = reverse('consultations:consultations-list')
+    blocked = obtain_tokens(api_client, doctor_user.user.username)
+    demoted = obtain_tokens(api_client, other_doctor.user.username)
+
+    doctor_user.user.is_active = False
+    doctor_user.user.save()
+    other_doctor.user.role = 'Patient'
+    other_doctor.user.save(update_fields=['role'])
+
+    for tokens in (blocked, demoted):
+        api_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {tokens["access"]}'
+        )
+        assert api_client.get(url, format='json').status_code == 401
+
+
+@pytest.mark.django_db
+def test_token_without_claims_is_accepted(api_client, admin_user):
+    """Проверяет, что токены старого формата продолжают работать."""
+
+    access = RefreshToken.for_user(admin_user).access_token
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+    response = api_client.get(
+        reverse('consultations:consultations-list'), format='json'
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_refresh_without_version_checks_user(api_client, patient_user):
+    """
+    Проверяет, что refresh-токен без версии обновляется для активного
+    пользователя и отклоняется для заблокированного или удалённого.
+    """
+
+    user = patient_user.user
+    refresh = RefreshToken.for_user(user)
+    url = reverse('token_refresh')
+
+    response = api_client.post(url, {'refresh': str(refresh)}, format='json')
+    assert response.status_code == 200, response.data
+
+    user.is_active = False
+    user.save()
+    response = api_client.post(url, {'refresh': str(refresh)}, format='json')
+    assert response.status_code == 401
+
+    user.delete()
+    response = api_client.post(url, {'refresh': str(refresh)}, format='json')
+    assert response.status_code == 401
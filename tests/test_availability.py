@@ -0,0 +1,183 @@
+from datetime import datetime, time, timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from consultations.availability import split_into_slots, subtract_intervals
+from consultations.models import Consultation
+from users.models import WorkingHours
+
+
+@pytest.fixture
+def next_monday():
+    """Ближайший будущий понедельник, 00:00 в текущем часовом поясе."""
+
+    today = timezone.localdate()
+    day = today + timedelta(days=7 - today.weekday())
+    return timezone.make_aware(datetime.combine(day, time()))
+
+
+@pytest.fixture
+def monday_hours(doctor_user):
+    """Рабочие часы врача: понедельник, 09:00–12:00."""
+
+    return WorkingHours.objects.create(
+        doctor=doctor_user,
+        weekday=WorkingHours.Weekday.MONDAY,
+        start_time=time(9),
+        end_time=time(12),
+    )
+
+
+def availability(api_client, doctor, start, **params):
+    url = reverse('users:doctors-availability', args=[doctor.pk])
+    params = {
+        'from': start.isoformat(),
+        'to': (start + timedelta(days=1)).isoformat(),
+        **params,
+    }
+    return api_client.get(url, params, format='json')
+
+
+def slot_hours(response):
+    return [
+        datetime.fromisoformat(slot['start_time']).strftime('%H:%M')
+        for slot in response.json()['slots']
+    ]
+
+
+def test_subtract_intervals():
+    """Проверяет вычитание занятых интервалов из свободных."""
+
+    free = [(0, 10), (20, 30)]
+    busy = [(2, 4), (8, 22), (25, 26)]
+    assert subtract_intervals(free, busy) == [
+        (0, 2),
+        (4, 8),
+        (22, 25),
+        (26, 30),
+    ]
+
+
+def test_split_into_slots():
+    """Проверяет нарезку интервалов на слоты."""
+
+    assert split_into_slots([(0, 7), (10, 12)], 3) == [(0, 3), (3, 6)]
+
+
+@pytest.mark.django_db
+def test_availability_excludes_consultations(
+    api_client, doctor_user, patient_user, monday_hours, next_monday
+):
+    """Проверяет, что занятое время не попадает в свободные слоты."""
+
+    Consultation.objects.create(
+        start_time=next_monday + timedelta(hours=10),
+        end_time=next_monday + timedelta(hours=11),
+        doctor=doctor_user,
+        patient=patient_user,
+    )
+    api_client.force_authenticate(user=patient_user.user)
+
+    response = availability(api_client, doctor_user, next_monday)
+
+    assert response.status_code == 200, response.data
+    assert response.json()['duration'] == 30
+    assert slot_hours(response) == ['09:00', '09:30', '11:00', '11:30']
+
+
+@pytest.mark.django_db
+def test_availability_cache_is_invalidated(
+    api_client,
+    doctor_user,
+    patient_user,
+    monday_hours,
+    next_monday,
+    django_assert_num_queries,
+):
+    """
+    Проверяет, что повторный запрос отдаётся из кэша без запросов к БД,
+    а создание консультации сбрасывает кэш.
+    """
+
+    api_client.force_authenticate(user=patient_user.user)
+    first = availability(api_client, doctor_user, next_monday, duration=60)
+    assert slot_hours(first) == ['09:00', '10:00', '11:00']
+
+    with django_assert_num_queries(0):
+        cached = availability(
+            api_client, doctor_user, next_monday, duration=60
+        )
+    assert cached.json() == first.json()
+
+    Consultation.objects.create(
+        start_time=next_monday + timedelta(hours=9),
+        end_time=next_monday + timedelta(hours=10),
+        doctor=doctor_user,
+        patient=patient_user,
+    )
+    response = availability(api_client, doctor_user, next_monday, duration=60)
+    assert slot_hours(response) == ['10:00', '11:00']
+
+
+@pytest.mark.django_db
+def test_availability_validates_params(
+    api_client, doctor_user, patient_user, next_monday
+):
+    """Проверяет валидацию параметров и ответ для несуществующего врача."""
+
+    api_client.force_authenticate(user=patient_user.user)
+    url = reverse('users:doctors-availability', args=[doctor_user.pk])
+
+    reversed_range = api_client.get(
+        url,
+        {
+            'from': next_monday.isoformat(),
+            'to': (next_monday - timedelta(days=1)).isoformat(),
+        },
+    )
+    too_long = api_client.get(
+        url,
+        {
+            'from': next_monday.isoformat(),
+            'to': (next_monday + timedelta(days=40)).isoformat(),
+        },
+    )
+    missing = api_client.get(
+        reverse('users:doctors-availability', args=[doctor_user.pk + 100])
+    )
+
+    assert reversed_range.status_code == 400
+    assert too_long.status_code == 400
+    assert missing.status_code == 404
+
+
+@pytest.mark.django_db
+def test_default_period_hits_cache(
+    api_client,
+    doctor_user,
+    patient_user,
+    monday_hours,
+    monkeypatch,
+    django_assert_num_queries,
+):
+    """
+    Проверяет, что запросы без ``from`` и ``to`` в пределах одной минуты
+    отдаются из одного ключа кэша.
+    """
+
+    now = timezone.now().replace(second=10, microsecond=123456)
+    url = reverse('users:doctors-availability', args=[doctor_user.pk])
+    api_client.force_authenticate(user=patient_user.user)
+
+    monkeypatch.setattr(timezone, 'now', lambda: now)
+    first = api_client.get(url, format='json')
+    assert first.status_code == 200
+
+    monkeypatch.setattr(
+        timezone, 'now', lambda: now + timedelta(seconds=30, microseconds=7)
+    )
+    with django_assert_num_queries(0):
+        cached = api_client.get(url, format='json')
+    assert cached.json() == first.json()
@@ -0,0 +1,43 @@
+import pytest
+
+from benchmarks.dataset import DatasetSize, build_dataset, existing_size
+from benchmarks.runner import SCENARIOS, compare, percentile, run_suite
+from consultations.models import Consultation
+from consultations.search import build_search_name
+
+
+def test_percentile():
+    """Проверяет вычисление процентилей по ближайшему рангу."""
+
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile([7], 95) == 7
+
+
+@pytest.mark.django_db
+def test_benchmark_suite():
+    """Проверяет генерацию данных и прогон всех сценариев."""
+
+    size = DatasetSize(consultations=60, doctors=3, patients=5, clinics=2)
+    build_dataset(size, batch_size=25)
+    assert existing_size() == size
+    consultation = Consultation.objects.select_related(
+        'doctor__user', 'patient__user'
+    ).first()
+    assert consultation.doctor_search_name == build_search_name(
+        consultation.doctor.user
+    )
+    assert consultation.patient_search_name == build_search_name(
+        consultation.patient.user
+    )
+
+    results = run_suite(iterations=3, warmup=1, profile_iterations=2)
+
+    assert set(results) == set(SCENARIOS)
+    for result in results.values():
+        assert result['time_ms']['p95'] >= result['time_ms']['p50'] > 0
+        assert result['queries']['max'] >= 1
+
+    current = {'scenarios': results}
+    assert not any(row[-1] for row in compare(current, current))
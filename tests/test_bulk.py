@@ -0,0 +1,267 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from consultations.models import Consultation
+
+
+@pytest.fixture
+def bulk_url():
+    return reverse('consultations:consultations-bulk')
+
+
+@pytest.fixture
+def make_items(doctor_user, patient_user):
+    """Возвращает функцию, строящую пакет непересекающихся консультаций."""
+
+    start = (timezone.now() + timedelta(days=3)).replace(microsecond=0)
+
+    def make(count, **kwargs):
+        return [
+            {
+                'start_time': (start + timedelta(hours=index)).isoformat(),
+                'end_time': (
+                    start + timedelta(hours=index, minutes=45)
+                ).isoformat(),
+                'doctor': doctor_user.pk,
+                'patient': patient_user.pk,
+                **kwargs,
+            }
+            for index in range(count)
+        ]
+
+    return make
+
+
+@pytest.mark.django_db
+def test_bulk_create(api_client, admin_user, bulk_url, make_items):
+    """Проверяет пакетное создание консультаций."""
+
+    api_client.force_authenticate(user=admin_user)
+    response = api_client.post(bulk_url, make_items(3), format='json')
+
+    assert response.status_code == 201, response.data
+    assert len(response.json()['results']) == 3
+    assert Consultation.objects.count() == 3
+    assert set(
+        Consultation.objects.values_list('doctor_search_name', flat=True)
+    ) == {'doe john'}
+
+
+@pytest.mark.django_db
+def test_bulk_reports_errors_per_item(
+    api_client, admin_user, bulk_url, make_items
+):
+    """
+    Проверяет, что ошибки возвращаются по позициям пакета,
+    а при ошибках ничего не сохраняется.
+    """
+
+    items = make_items(4)
+    items[1]['doctor'] = 999999
+    items[3]['start_time'] = items[2]['start_time']
+    api_client.force_authenticate(user=admin_user)
+
+    response = api_client.post(bulk_url, items, format='json')
+
+    assert response.status_code == 400
+    errors = response.json()['errors']
+    assert errors[0] is None
+    assert 'doctor' in errors[1]
+    assert errors[2] == errors[3] == {
+        'non_field_errors': ['У врача уже есть консультация в это время.']
+    }
+    assert not Consultation.objects.exists()
+
+
+@pytest.mark.django_db
+def test_bulk_detects_conflicts_with_stored(
+    api_client, admin_user, bulk_url, make_items, create_consultations
+):
+    """Проверяет пересечение с уже сохранённой консультацией."""
+
+    stored = create_consultations(1)[0]
+    item = make_items(1)[0]
+    item['start_time'] = stored.start_time.isoformat()
+    item['end_time'] = stored.end_time.isoformat()
+    api_client.force_authenticate(user=admin_user)
+
+    response = api_client.post(bulk_url, [item], format='json')
+
+    assert response.status_code == 400
+    assert response.json()['errors'][0] is not None
+
+
+@pytest.mark.django_db
+def test_bulk_update(
+    api_client, doctor_user, other_doctor, bulk_url, create_consultations
+):
+    """
+    Проверяет пакетное обновление: сдвиг собственной консультации
+    разрешён, изменение чужой — нет.
+    """
+
+    own = create_consultations(1)[0]
+    foreign = create_consultations(1, doctor=other_doctor)[0]
+    api_client.force_authenticate(user=doctor_user.user)
+
+    def item(consultation):
+        return {
+            'id': consultation.pk,
+            'start_time': (
+                consultation.start_time + timedelta(minutes=10)
+            ).isoformat(),
+            'end_time': (
+                consultation.end_time + timedelta(minutes=10)
+            ).isoformat(),
+            'status': 'Confirmed',
+            'doctor': consultation.doctor_id,
+            'patient': consultation.patient_id,
+        }
+
+    forbidden = api_client.post(bulk_url, [item(foreign)], format='json')
+    assert forbidden.status_code == 400
+    assert 'id' in forbidden.json()['errors'][0]
+
+    response = api_client.post(bulk_url, [item(own)], format='json')
+    assert response.status_code == 200, response.data
+    own.refresh_from_db()
+    assert own.status == 'Confirmed'
+
+
+@pytest.mark.django_db
+def test_bulk_enforces_status_transitions(
+    api_client, admin_user, bulk_url, create_consultations
+):
+    """
+    Проверяет, что пакет меняет статус только по разрешённым
+    переходам, а элемент без статуса сохраняет текущий.
+    """
+
+    paid, waiting = create_consultations(2)
+    Consultation.objects.filter(pk=paid.pk).update(
+        status=Consultation.Status.PAID.value
+    )
+    api_client.force_authenticate(user=admin_user)
+
+    def item(consultation, **kwargs):
+        return {
+            'id': consultation.pk,
+            'start_time': consultation.start_time.isoformat(),
+            'end_time': consultation.end_time.isoformat(),
+            'doctor': consultation.doctor_id,
+            'patient': consultation.patient_id,
+            **kwargs,
+        }
+
+    response = api_client.post(
+        bulk_url,
+        [item(paid, status='Waiting'), item(waiting, status='Confirmed')],
+        format='json',
+    )
+    assert response.status_code == 400
+    errors = response.json()['errors']
+    assert 'status' in errors[0]
+    assert errors[1] is None
+    assert Consultation.objects.get(pk=paid.pk).status == 'Paid'
+
+    response = api_client.post(bulk_url, [item(paid)], format='json')
+    assert response.status_code == 200, response.data
+    assert Consultation.objects.get(pk=paid.pk).status == 'Paid'
+
+
+@pytest.mark.django_db
+def test_bulk_reuses_freed_slots(
+    api_client, admin_user, bulk_url, create_consultations
+):
+    """
+    Проверяет, что в одном пакете можно занять время, которое
+    освобождает обновляемая консультация, и поменять местами две
+    консультации: ограничение проверяется по итогу пакета.
+    """
+
+    first, second = create_consultations(2)
+    api_client.force_authenticate(user=admin_user)
+
+    def item(consultation, start_time, end_time, **kwargs):
+        return {
+            'start_time': start_time.isoformat(),
+            'end_time': end_time.isoformat(),
+            'doctor': consultation.doctor_id,
+            'patient': consultation.patient_id,
+            **kwargs,
+        }
+
+    later = first.start_time + timedelta(hours=5)
+    response = api_client.post(
+        bulk_url,
+        [
+            item(
+                first,
+                later,
+                later + timedelta(minutes=30),
+                id=first.pk,
+            ),
+            item(first, first.start_time, first.end_time),
+        ],
+        format='json',
+    )
+    assert response.status_code == 201, response.data
+    assert Consultation.objects.filter(start_time=first.start_time).exists()
+
+    response = api_client.post(
+        bulk_url,
+        [
+            item(
+                second, second.start_time, second.end_time, id=first.pk
+            ),
+            item(second, later, later + timedelta(minutes=30), id=second.pk),
+        ],
+        format='json',
+    )
+    assert response.status_code == 200, response.data
+    first.refresh_from_db()
+    second.refresh_from_db()
+    assert first.start_time < second.start_time
+
+
+@pytest.mark.django_db
+def test_bulk_query_count_does_not_grow(
+    api_client, admin_user, bulk_url, make_items
+):
+    """Проверяет, что число запросов не зависит от размера пакета."""
+
+    api_client.force_authenticate(user=admin_user)
+    items = make_items(12)
+
+    with CaptureQueriesContext(connection) as small:
+        api_client.post(bulk_url, items[:2], format='json')
+    with CaptureQueriesContext(connection) as large:
+        response = api_client.post(bulk_url, items[2:], format='json')
+
+    assert response.status_code == 201, response.data
+    assert len(large) == len(small)
+
+
+@pytest.mark.django_db
+def test_bulk_forbidden_for_patient(
+    api_client, patient_user, bulk_url, make_items
+):
+    """Проверяет, что пациенту пакетная запись недоступна."""
+
+    api_client.force_authenticate(user=patient_user.user)
+    response = api_client.post(bulk_url, make_items(1), format='json')
+    assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_bulk_rejects_non_list(api_client, admin_user, bulk_url):
+    """Проверяет, что тело запроса должно быть списком."""
+
+    api_client.force_authenticate(user=admin_user)
+    response = api_client.post(bulk_url, {'a': 1}, format='json')
+    assert response.status_code == 400
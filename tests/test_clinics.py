@@ -0,0 +1,95 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from clinics.models import Clinic
+
+LIST_URL = reverse('clinics:clinics-list')
+
+
+@pytest.fixture
+def clinics(doctor_user, other_doctor):
+    """Три клиники: у первой два врача, у второй один."""
+
+    created = [
+        Clinic.objects.create(
+            name=f'Клиника {number}',
+            legal_address=f'ул. {number}',
+            physical_address=f'ул. {number}',
+        )
+        for number in range(3)
+    ]
+    created[0].clinic_doctors.add(doctor_user, other_doctor)
+    created[1].clinic_doctors.add(doctor_user)
+    return created
+
+
+@pytest.mark.django_db
+def test_clinic_list_with_doctors(
+    api_client, patient_user, clinics, doctor_user, other_doctor
+):
+    """Проверяет список клиник с врачами и курсорную пагинацию."""
+
+    api_client.force_authenticate(user=patient_user.user)
+
+    first = api_client.get(LIST_URL, {'page_size': 2})
+    second = api_client.get(first.json()['next'])
+
+    assert first.status_code == 200
+    results = first.json()['results']
+    assert [clinic['name'] for clinic in results] == [
+        'Клиника 0',
+        'Клиника 1',
+    ]
+    assert [doctor['id'] for doctor in results[0]['doctors']] == [
+        doctor_user.pk,
+        other_doctor.pk,
+    ]
+    assert results[0]['doctors'][0]['user']['last_name'] == 'Doe'
+    assert [clinic['doctors'] for clinic in second.json()['results']] == [[]]
+
+
+@pytest.mark.django_db
+def test_clinic_list_query_budget(
+    api_client, patient_user, clinics, query_budget
+):
+    """
+    Проверяет, что список выполняет два запроса независимо от числа
+    клиник и врачей, а повторный запрос читается из кэша процесса.
+    """
+
+    api_client.force_authenticate(user=patient_user.user)
+    with query_budget(2):
+        response = api_client.get(LIST_URL)
+    assert len(response.json()['results']) == 3
+
+    with CaptureQueriesContext(connection) as queries:
+        cached = api_client.get(LIST_URL)
+    assert cached.json() == response.json()
+    assert len(queries) == 0
+
+
+@pytest.mark.django_db
+def test_clinic_cache_invalidation(
+    api_client, patient_user, clinics, other_doctor
+):
+    """Проверяет сброс кэша при изменении связей врачей и клиник."""
+
+    api_client.force_authenticate(user=patient_user.user)
+    url = reverse('clinics:clinics-detail', args=[clinics[2].pk])
+    assert api_client.get(url).json()['doctors'] == []
+
+    clinics[2].clinic_doctors.add(other_doctor)
+    assert [
+        doctor['id'] for doctor in api_client.get(url).json()['doctors']
+    ] == [other_doctor.pk]
+
+    clinics[2].name = 'Новая клиника'
+    clinics[2].save()
+    assert api_client.get(url).json()['name'] == 'Новая клиника'
+
+    other_doctor.user.last_name = 'Brown'
+    other_doctor.user.save()
+    doctors = api_client.get(url).json()['doctors']
+    assert doctors[0]['user']['last_name'] == 'Brown'
@@ -0,0 +1,163 @@
+import asyncio
+import json
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import AsyncClient, override_settings
+from django.urls import URLResolver, include, path
+from django.urls.resolvers import RegexPattern
+from django.utils import timezone
+
+from consultations.events import UPDATED, PostgresBroker, build_event
+from consultations.models import Consultation
+from consultations.async_views import ConsultationEventsView
+from consultations.urls import async_urlpatterns, build_urlpatterns
+from users.serializers import ClaimsTokenObtainPairSerializer
+
+urlpatterns = [
+    path('async/', include(async_urlpatterns)),
+    path('', include('medical_service.urls')),
+]
+
+pytestmark = pytest.mark.urls(__name__)
+
+EVENTS_URL = '/async/consultations/events/'
+IN_MEMORY_BROKER = 'consultations.events.InMemoryBroker'
+
+
+def auth_headers(user):
+    token = ClaimsTokenObtainPairSerializer.get_token(user).access_token
+    return {'Authorization': f'Bearer {token}'}
+
+
+def parse_event(chunk):
+    fields = dict(
+        line.split(': ', 1) for line in chunk.decode().strip().split('\n')
+    )
+    return fields['event'], json.loads(fields['data'])
+
+
+async def next_chunk(stream):
+    return await asyncio.wait_for(anext(stream), timeout=5)
+
+
+@pytest.mark.django_db
+def test_events_stream_scoped_by_role(
+    doctor_user,
+    other_doctor,
+    patient_user,
+    create_consultations,
+    django_capture_on_commit_callbacks,
+    settings,
+):
+    """
+    Проверяет, что врач получает события только о своих консультациях,
+    включая переназначенную другому врачу, а поток поддерживает
+    соединение комментариями.
+    """
+
+    settings.CONSULTATION_EVENTS_BROKER = IN_MEMORY_BROKER
+    settings.CONSULTATION_EVENTS_HEARTBEAT = 0.1
+    start = timezone.now() + timedelta(days=3)
+    headers = auth_headers(doctor_user.user)
+
+    def change_consultations():
+        with django_capture_on_commit_callbacks(execute=True):
+            other = Consultation.objects.create(
+                doctor=other_doctor,
+                patient=patient_user,
+                start_time=start,
+                end_time=start + timedelta(minutes=30),
+            )
+            own, = create_consultations(1)
+            own.transition_to(Consultation.Status.CONFIRMED.value)
+            own = Consultation.objects.get(pk=own.pk)
+            own.doctor = other_doctor
+            own.save()
+            other.delete()
+        return own
+
+    async def scenario():
+        response = await AsyncClient().get(EVENTS_URL, headers=headers)
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'text/event-stream'
+        stream = aiter(response.streaming_content)
+        try:
+            assert await next_chunk(stream) == b'retry: 3000\n\n'
+            own = await sync_to_async(change_consultations)()
+            received = [
+                parse_event(await next_chunk(stream)) for _ in range(3)
+            ]
+            assert await next_chunk(stream) == b': keepalive\n\n'
+        finally:
+            await stream.aclose()
+        return own, received
+
+    own, received = async_to_sync(scenario)()
+
+    assert [(event, data['id']) for event, data in received] == [
+        ('created', own.pk),
+        ('updated', own.pk),
+        ('updated', own.pk),
+    ]
+    assert received[1][1]['status'] == 'Confirmed'
+    assert received[2][1]['doctor'] == other_doctor.pk
+
+
+@pytest.mark.parametrize(
+    'asgi, async_reads, registered',
+    [
+        (True, False, True),
+        (True, True, True),
+        (False, True, False),
+    ],
+)
+def test_events_route_follows_asgi(asgi, async_reads, registered):
+    """
+    Проверяет, что поток событий подключается под ASGI независимо
+    от ASYNC_READ_PATH.
+    """
+
+    with override_settings(
+        RUNNING_UNDER_ASGI=asgi, ASYNC_READ_PATH=async_reads
+    ):
+        patterns = build_urlpatterns()
+    resolver = URLResolver(RegexPattern(r'^'), patterns)
+    match = resolver.resolve('v1/consultations/events/')
+
+    view_class = getattr(match.func, 'view_class', None)
+    assert (view_class is ConsultationEventsView) == registered
+
+
+@pytest.mark.django_db
+def test_events_stream_requires_authentication():
+    """Проверяет, что поток событий доступен только с токеном."""
+
+    response = async_to_sync(AsyncClient().get)(EVENTS_URL)
+
+    assert response.status_code == 401
+
+
+@pytest.mark.django_db(transaction=True)
+def test_postgres_broker_fans_out_notifications(create_consultations):
+    """
+    Проверяет, что события, опубликованные через NOTIFY, доходят
+    до всех подписчиков процесса.
+    """
+
+    consultation, = create_consultations(1)
+    event = build_event(UPDATED, consultation)
+    broker = PostgresBroker()
+
+    async def scenario():
+        async with broker.subscribe() as first, broker.subscribe() as second:
+            await sync_to_async(broker.publish)(event)
+            received = [
+                await asyncio.wait_for(anext(subscription), timeout=5)
+                for subscription in (first, second)
+            ]
+        return received
+
+    assert async_to_sync(scenario)() == [event, event]
+    assert broker.listener is None
@@ -0,0 +1,128 @@
+import pytest
+from django.urls import reverse
+
+from clinics.models import Clinic
+from users.models import CustomUser, Doctor, Patient
+
+DOCTORS_URL = reverse('users:doctors-list')
+PATIENTS_URL = reverse('users:patients-list')
+
+
+@pytest.fixture
+def directory(db, django_user_model, doctor_user, other_doctor):
+    """Две клиники и три врача: два кардиолога и невролог."""
+
+    first = Clinic.objects.create(
+        name='Первая', legal_address='ул. 1', physical_address='ул. 1'
+    )
+    second = Clinic.objects.create(
+        name='Вторая', legal_address='ул. 2', physical_address='ул. 2'
+    )
+    user = django_user_model.objects.create_user(
+        username='doctor3',
+        password='password',
+        role=CustomUser.UserRole.DOCTOR.value,
+        first_name='Bob',
+        last_name='Adams',
+    )
+    third = Doctor.objects.create(user=user, specialization='Cardiology')
+    doctor_user.clinics.add(first, second)
+    other_doctor.clinics.add(first)
+    third.clinics.add(second)
+    return {'first': first, 'second': second, 'third': third}
+
+
+@pytest.mark.django_db
+def test_doctor_directory_with_facets(
+    api_client, patient_user, directory, doctor_user, query_budget
+):
+    """Проверяет сортировку по ФИО, фильтры и фасеты справочника врачей."""
+
+    api_client.force_authenticate(user=patient_user.user)
+
+    with query_budget(3):
+        response = api_client.get(DOCTORS_URL)
+    filtered = api_client.get(
+        DOCTORS_URL, {'clinic': directory['second'].pk}
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [doctor['user']['last_name'] for doctor in data['results']] == [
+        'Adams',
+        'Doe',
+        'Smith',
+    ]
+    assert data['facets']['specialization'] == [
+        {'value': 'Cardiology', 'count': 2},
+        {'value': 'Neurology', 'count': 1},
+    ]
+    assert data['facets']['clinic'] == [
+        {'id': directory['second'].pk, 'name': 'Вторая', 'count': 2},
+        {'id': directory['first'].pk, 'name': 'Первая', 'count': 2},
+    ]
+
+    assert [doctor['id'] for doctor in filtered.json()['results']] == [
+        directory['third'].pk,
+        doctor_user.pk,
+    ]
+    # Фасет клиник не сужается фильтром по клинике.
+    assert filtered.json()['facets'] == {
+        'specialization': [{'value': 'Cardiology', 'count': 2}],
+        'clinic': data['facets']['clinic'],
+    }
+
+
+@pytest.mark.django_db
+def test_doctor_directory_pagination(api_client, patient_user, directory):
+    """Проверяет курсорную пагинацию справочника врачей."""
+
+    api_client.force_authenticate(user=patient_user.user)
+
+    first = api_client.get(
+        DOCTORS_URL, {'specialization': 'Cardiology', 'page_size': 1}
+    )
+    second = api_client.get(first.json()['next'])
+    # Фасеты отдаются только на первой странице.
+    assert 'facets' in first.json()
+    assert 'facets' not in second.json()
+
+    doctors = [*first.json()['results'], *second.json()['results']]
+    assert [doctor['user']['last_name'] for doctor in doctors] == [
+        'Adams',
+        'Doe',
+    ]
+    assert second.json()['next'] is None
+
+
+@pytest.mark.django_db
+def test_patient_lookup(api_client, doctor_user, patient_user, query_budget):
+    """Проверяет точный поиск пациента по телефону и e-mail."""
+
+    api_client.force_authenticate(user=doctor_user.user)
+    patient = Patient.objects.get(pk=patient_user.pk)
+
+    with query_budget(1):
+        by_phone = api_client.get(
+            PATIENTS_URL, {'phone': '8 (123) 456-78-90'}
+        )
+    by_email = api_client.get(PATIENTS_URL, {'email': patient.email})
+    missing = api_client.get(PATIENTS_URL, {'phone': 'не телефон'})
+
+    assert [item['id'] for item in by_phone.json()['results']] == [
+        patient.pk
+    ]
+    assert by_phone.json()['results'][0]['phone'] == patient.phone.as_e164
+    assert [item['id'] for item in by_email.json()['results']] == [
+        patient.pk
+    ]
+    assert missing.json()['results'] == []
+
+
+@pytest.mark.django_db
+def test_patient_directory_forbidden_for_patients(api_client, patient_user):
+    """Проверяет, что пациенты не видят справочник пациентов."""
+
+    api_client.force_authenticate(user=patient_user.user)
+
+    assert api_client.get(PATIENTS_URL).status_code == 403
@@ -0,0 +1,89 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from clinics.models import Clinic
+
+
+@pytest.mark.django_db
+def test_expand_doctor_and_patient(
+    api_client, admin_user, doctor_user, patient_user, create_consultations
+):
+    """Проверяет вложенные данные врача и пациента при expand."""
+
+    create_consultations(1)
+    url = reverse('consultations:consultations-list')
+    api_client.force_authenticate(user=admin_user)
+    response = api_client.get(
+        url, {'expand': 'doctor,patient'}, format='json'
+    )
+    assert response.status_code == 200
+    item = response.json()['results'][0]
+    assert item['doctor']['id'] == doctor_user.pk
+    assert item['doctor']['user']['last_name'] == 'Doe'
+    assert 'clinics' not in item['doctor']
+    assert item['patient']['email'] == patient_user.email
+
+
+@pytest.mark.django_db
+def test_expand_clinics(
+    api_client, admin_user, doctor_user, create_consultations
+):
+    """Проверяет раскрытие клиник врача."""
+
+    clinic = Clinic.objects.create(
+        name='Клиника', legal_address='Адрес 1', physical_address='Адрес 2'
+    )
+    doctor_user.clinics.add(clinic)
+    create_consultations(1)
+    url = reverse('consultations:consultations-list')
+    api_client.force_authenticate(user=admin_user)
+    response = api_client.get(url, {'expand': 'clinics'}, format='json')
+    item = response.json()['results'][0]
+    assert item['doctor']['clinics'] == [
+        {
+            'id': clinic.pk,
+            'name': 'Клиника',
+            'legal_address': 'Адрес 1',
+            'physical_address': 'Адрес 2',
+        }
+    ]
+
+
+@pytest.mark.django_db
+def test_without_expand_returns_ids(
+    api_client, admin_user, doctor_user, create_consultations
+):
+    """Проверяет, что без expand возвращаются идентификаторы."""
+
+    create_consultations(1)
+    url = reverse('consultations:consultations-list')
+    api_client.force_authenticate(user=admin_user)
+    response = api_client.get(url, {'expand': 'unknown'}, format='json')
+    assert response.json()['results'][0]['doctor'] == doctor_user.pk
+
+
+@pytest.mark.django_db
+def test_expand_query_count_does_not_grow(
+    api_client, admin_user, create_consultations
+):
+    """
+    Проверяет, что число запросов на страницу не зависит
+    от количества строк.
+    """
+
+    url = reverse('consultations:consultations-list')
+    params = {'expand': 'doctor,patient,clinics'}
+    api_client.force_authenticate(user=admin_user)
+
+    create_consultations(1)
+    with CaptureQueriesContext(connection) as one_row:
+        api_client.get(url, params, format='json')
+
+    create_consultations(5)
+    with CaptureQueriesContext(connection) as many_rows:
+        response = api_client.get(url, params, format='json')
+
+    assert len(response.json()['results']) == 6
+    assert len(many_rows) == len(one_row)
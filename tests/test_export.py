@@ -0,0 +1,73 @@
+import csv
+import io
+import json
+
+import pytest
+from django.urls import reverse
+
+from clinics.models import Clinic
+
+EXPORT_URL = reverse('consultations:consultations-export')
+
+
+def read_content(response):
+    return b''.join(response.streaming_content).decode('utf-8')
+
+
+@pytest.mark.django_db
+def test_export_csv(api_client, admin_user, doctor_user, create_consultations):
+    """Проверяет выгрузку консультаций в CSV с именами и клиниками."""
+
+    for name in ('Клиника Б', 'Клиника А'):
+        clinic = Clinic.objects.create(
+            name=name, legal_address='ул. 1', physical_address='ул. 2'
+        )
+        doctor_user.clinics.add(clinic)
+    consultations = create_consultations(3)
+    api_client.force_authenticate(user=admin_user)
+
+    response = api_client.get(EXPORT_URL)
+
+    assert response.status_code == 200
+    assert response.streaming
+    assert response['Content-Type'].startswith('text/csv')
+    rows = list(csv.DictReader(io.StringIO(read_content(response))))
+    assert [int(row['id']) for row in rows] == [
+        consultation.pk for consultation in reversed(consultations)
+    ]
+    assert rows[0]['doctor_name'] == 'Doe John'
+    assert rows[0]['patient_name'] == 'Doe Jane'
+    assert rows[0]['clinics'] == 'Клиника А, Клиника Б'
+
+
+@pytest.mark.django_db
+def test_export_ndjson_scoped_and_filtered(
+    api_client, patient_user, other_patient, create_consultations
+):
+    """Проверяет NDJSON-выгрузку с фильтрами и ограничением по роли."""
+
+    create_consultations(2, patient=other_patient)
+    create_consultations(1, status='Confirmed')
+    expected = create_consultations(2)
+    api_client.force_authenticate(user=patient_user.user)
+
+    response = api_client.get(
+        EXPORT_URL, {'file_format': 'ndjson', 'status': 'Waiting'}
+    )
+
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in read_content(response).splitlines()]
+    assert {row['id'] for row in rows} == {item.pk for item in expected}
+    assert {row['patient_id'] for row in rows} == {patient_user.pk}
+
+
+@pytest.mark.django_db
+def test_export_unknown_format(api_client, admin_user):
+    """Проверяет ошибку для неизвестного формата выгрузки."""
+
+    api_client.force_authenticate(user=admin_user)
+
+    response = api_client.get(EXPORT_URL, {'file_format': 'xml'})
+
+    assert response.status_code == 400
+    assert 'file_format' in response.json()
@@ -0,0 +1,98 @@
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from consultations.models import Consultation
+from consultations.rows import RowRepresentation
+from consultations.serializers import ConsultationSerializer
+from medical_service.renderers import ORJSONRenderer
+
+LIST_URL = reverse('consultations:consultations-list')
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('tz', ('UTC', 'Europe/Moscow'))
+def test_rows_render_like_serializer(create_consultations, tz):
+    """
+    Проверяет, что представление из values() с orjson побайтно
+    совпадает с ConsultationSerializer и JSONRenderer.
+    """
+
+    create_consultations(3, status='Confirmed')
+    queryset = Consultation.objects.order_by('id')
+
+    with timezone.override(tz):
+        serializer = ConsultationSerializer(queryset, many=True)
+        expected = JSONRenderer().render(serializer.data)
+        rows = RowRepresentation(ConsultationSerializer())
+        fast = ORJSONRenderer().render(
+            rows(queryset.values(*rows.columns))
+        )
+
+    assert fast == expected
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('params', ({}, {'status': 'Waiting'}))
+def test_fast_list_matches_serializer(
+    api_client, doctor_user, create_consultations, settings, params
+):
+    """Проверяет, что ответ списка не зависит от FAST_LIST_PATH."""
+
+    create_consultations(5)
+    api_client.force_authenticate(user=doctor_user.user)
+    params = {**params, 'page_size': 2}
+
+    fast = api_client.get(LIST_URL, params)
+    cache.clear()
+    settings.FAST_LIST_PATH = False
+    expected = api_client.get(LIST_URL, params)
+
+    assert fast.status_code == 200
+    assert fast.content == expected.content
+
+
+def test_orjson_renderer_matches_json_renderer():
+    """Проверяет побайтное совпадение рендереров на сложных значениях."""
+
+    data = {
+        'text': 'Приём врача "№1"\n\t\\ \u2028 \x01',
+        'created_at': datetime(2025, 3, 10, 10, 0, 0, 123456, dt_timezone.utc),
+        'day': datetime(2025, 3, 10).date(),
+        'amount': Decimal('10.50'),
+        'lazy': gettext_lazy('Консультация'),
+        1: [None, True, 1.5, 2**40],
+    }
+    # Целые больше 64 бит orjson не кодирует.
+    huge = {'value': 2**70}
+
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+    assert ORJSONRenderer().render(huge) == JSONRenderer().render(huge)
+    assert ORJSONRenderer().render(
+        data, 'application/json; indent=2'
+    ) == JSONRenderer().render(data, 'application/json; indent=2')
+
+
+@pytest.mark.django_db
+def test_orjson_only_for_list(api_client, doctor_user, create_consultations):
+    """
+    Проверяет, что orjson кодирует только список консультаций, а
+    остальные ответы кодирует JSONRenderer.
+    """
+
+    consultation = create_consultations(1)[0]
+    api_client.force_authenticate(user=doctor_user.user)
+
+    listed = api_client.get(LIST_URL)
+    detail = api_client.get(
+        reverse('consultations:consultations-detail', args=[consultation.pk])
+    )
+
+    assert type(listed.accepted_renderer) is ORJSONRenderer
+    assert type(detail.accepted_renderer) is JSONRenderer
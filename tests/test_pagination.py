@@ -0,0 +1,131 @@
+import json
+from base64 import urlsafe_b64encode
+
+import pytest
+from django.urls import reverse
+
+
+def collect_pages(api_client, url, params):
+    """Обходит все страницы по ссылкам next и возвращает id записей."""
+
+    ids = []
+    response = api_client.get(url, params, format='json')
+    while True:
+        assert response.status_code == 200, response.data
+        data = response.json()
+        ids.extend(item['id'] for item in data['results'])
+        if not data['next']:
+            return ids
+        response = api_client.get(data['next'], format='json')
+
+
+@pytest.mark.django_db
+def test_list_is_paginated_by_cursor(
+    api_client, admin_user, create_consultations
+):
+    """Проверяет обход списка курсором без пропусков и повторов."""
+
+    consultations = create_consultations(5)
+    url = reverse('consultations:consultations-list')
+    api_client.force_authenticate(user=admin_user)
+
+    ids = collect_pages(api_client, url, {'page_size': 2})
+
+    assert ids == [item.pk for item in reversed(consultations)]
+
+
+@pytest.mark.django_db
+def test_cursor_previous_link(api_client, admin_user, create_consultations):
+    """Проверяет, что ссылка previous возвращает предыдущую страницу."""
+
+    create_consultations(5)
+    url = reverse('consultations:consultations-list')
+    api_client.force_authenticate(user=admin_user)
+
+    first = api_client.get(url, {'page_size': 2}, format='json').json()
+    assert first['previous'] is None
+    second = api_client.get(first['next'], format='json').json()
+    back = api_client.get(second['previous'], format='json').json()
+
+    assert [item['id'] for item in back['results']] == [
+        item['id'] for item in first['results']
+    ]
+
+
+@pytest.mark.django_db
+def test_cursor_respects_ordering_and_filters(
+    api_client, admin_user, create_consultations
+):
+    """Проверяет, что курсор учитывает параметры ordering и status."""
+
+    consultations = create_consultations(3)
+    confirmed = consultations[:2]
+    for consultation in confirmed:
+        consultation.status = 'Confirmed'
+        consultation.save()
+    url = reverse('consultations:consultations-list')
+    api_client.force_authenticate(user=admin_user)
+
+    ids = collect_pages(
+        api_client,
+        url,
+        {'page_size': 1, 'ordering': 'created_at', 'status': 'Confirmed'},
+    )
+
+    assert ids == [item.pk for item in confirmed]
+
+
+@pytest.mark.django_db
+def test_invalid_cursor(api_client, admin_user):
+    """Проверяет ответ на некорректный курсор."""
+
+    url = reverse('consultations:consultations-list')
+    api_client.force_authenticate(user=admin_user)
+    response = api_client.get(url, {'cursor': 'broken'}, format='json')
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'position',
+    [
+        ['not-a-date', 1],
+        ['2025-01-01T00:00:00Z', 'x'],
+        [{'a': 1}, 1],
+        [None, 1],
+        ['2025-01-01T00:00:00Z'],
+        'x',
+    ],
+)
+def test_tampered_cursor(api_client, admin_user, create_consultations, position):
+    """
+    Проверяет, что курсор с подменёнными значениями позиции даёт 404,
+    а не ошибку сервера.
+    """
+
+    create_consultations(1)
+    url = reverse('consultations:consultations-list')
+    api_client.force_authenticate(user=admin_user)
+    cursor = urlsafe_b64encode(json.dumps({'p': position}).encode()).decode()
+
+    response = api_client.get(url, {'cursor': cursor}, format='json')
+
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_cursor_values_are_typed(api_client, admin_user, create_consultations):
+    """Проверяет, что корректный курсор, собранный вручную, принимается."""
+
+    consultations = create_consultations(3)
+    newest = max(consultations, key=lambda item: (item.created_at, item.pk))
+    url = reverse('consultations:consultations-list')
+    api_client.force_authenticate(user=admin_user)
+    position = [newest.created_at.isoformat(), str(newest.pk)]
+    cursor = urlsafe_b64encode(json.dumps({'p': position}).encode()).decode()
+
+    response = api_client.get(url, {'cursor': cursor}, format='json')
+
+    assert response.status_code == 200
+    assert newest.pk not in [item['id'] for item in response.json()['results']]
+    assert len(response.json()['results']) == 2
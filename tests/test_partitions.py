@@ -0,0 +1,224 @@
+import threading
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from psycopg2 import errorcodes
+
+from consultations.models import (
+    Consultation,
+    ConsultationStats,
+    ConsultationTombstone,
+)
+from consultations.partitions import (
+    ARCHIVE_SCHEMA,
+    DEFAULT_PARTITION,
+    detach_partition,
+    ensure_partitions,
+    month_start,
+    partition_name,
+)
+
+
+def partition_of(consultation):
+    """Секция, в которой хранится консультация."""
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT tableoid::regclass::text FROM consultations_consultation '
+            'WHERE id = %s',
+            [consultation.pk],
+        )
+        return cursor.fetchone()[0]
+
+
+def table_exists(name):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT to_regclass(%s) IS NOT NULL', [name])
+        return cursor.fetchone()[0]
+
+
+@pytest.fixture
+def create_at(doctor_user, patient_user):
+    """Возвращает функцию, создающую консультацию в указанное время."""
+
+    def create(start_time, **kwargs):
+        return Consultation.objects.create(
+            doctor=doctor_user,
+            patient=patient_user,
+            start_time=start_time,
+            end_time=start_time + timedelta(minutes=30),
+            **kwargs,
+        )
+
+    return create
+
+
+@pytest.mark.django_db
+def test_consultations_stored_in_monthly_partitions(
+    create_consultations, create_at
+):
+    """
+    Проверяет, что консультации попадают в секцию своего месяца,
+    а вне созданных месяцев — в секцию по умолчанию.
+    """
+
+    upcoming = create_consultations(1)[0]
+    distant = create_at(datetime(2040, 5, 1, 10, tzinfo=timezone.utc))
+
+    assert partition_of(upcoming) == partition_name(
+        month_start(upcoming.start_time)
+    )
+    assert partition_of(distant) == DEFAULT_PARTITION
+
+    upcoming.status = Consultation.Status.CONFIRMED.value
+    upcoming.save()
+    assert Consultation.objects.get(pk=upcoming.pk).status == 'Confirmed'
+
+
+@pytest.mark.django_db
+def test_new_partition_takes_rows_from_default(create_at):
+    """
+    Проверяет перенос строк из секции по умолчанию в новую секцию
+    без записей в ленту изменений.
+    """
+
+    consultation = create_at(datetime(2040, 5, 1, 10, tzinfo=timezone.utc))
+    sync_xid = Consultation.objects.get(pk=consultation.pk).sync_xid
+
+    created = ensure_partitions(date(2040, 4, 1), date(2040, 5, 1))
+
+    assert created == [
+        partition_name(date(2040, 4, 1)),
+        partition_name(date(2040, 5, 1)),
+    ]
+    assert partition_of(consultation) == partition_name(date(2040, 5, 1))
+    assert Consultation.objects.get(pk=consultation.pk) == consultation
+    assert Consultation.objects.get(pk=consultation.pk).sync_xid == sync_xid
+    assert not ConsultationTombstone.objects.exists()
+    assert ensure_partitions(date(2040, 4, 1), date(2040, 5, 1)) == []
+
+
+@pytest.mark.django_db
+def test_command_archives_old_partitions(create_at):
+    """
+    Проверяет, что команда архивирует старые секции, а секции
+    с незавершёнными консультациями отсоединяет только с --force.
+    """
+
+    paid = create_at(
+        datetime(2020, 1, 10, tzinfo=timezone.utc),
+        status=Consultation.Status.PAID.value,
+    )
+    waiting = create_at(datetime(2020, 2, 10, tzinfo=timezone.utc))
+    ensure_partitions(date(2020, 1, 1), date(2020, 2, 1))
+
+    with pytest.raises(CommandError):
+        call_command(
+            'consultation_partitions', detach_older_than=12, archive=True
+        )
+
+    assert table_exists(f'{ARCHIVE_SCHEMA}.{partition_name(date(2020, 1, 1))}')
+    assert not Consultation.objects.filter(pk=paid.pk).exists()
+    assert Consultation.objects.filter(pk=waiting.pk).exists()
+
+    call_command('consultation_partitions', detach_older_than=12, force=True)
+
+    assert not Consultation.objects.filter(pk=waiting.pk).exists()
+    assert table_exists(partition_name(date(2020, 2, 1)))
+
+
+@pytest.mark.django_db
+def test_detached_rows_leave_stats_and_feed(create_at):
+    """
+    Проверяет, что консультации отсоединённой секции вычитаются
+    из статистики и попадают в ленту изменений как удалённые.
+    """
+
+    old = create_at(
+        datetime(2020, 3, 10, tzinfo=timezone.utc),
+        status=Consultation.Status.PAID.value,
+    )
+    kept = create_at(datetime(2020, 4, 10, tzinfo=timezone.utc))
+    ensure_partitions(date(2020, 3, 1), date(2020, 4, 1))
+
+    detach_partition(partition_name(date(2020, 3, 1)))
+
+    assert list(
+        ConsultationStats.objects.filter(count__gt=0).values_list(
+            'status', 'count'
+        )
+    ) == [(kept.status, 1)]
+    tombstone = ConsultationTombstone.objects.get()
+    assert (tombstone.consultation_id, tombstone.reassigned) == (
+        old.pk,
+        False,
+    )
+
+
+@pytest.mark.django_db
+def test_overlap_across_partitions_rejected(create_at):
+    """
+    Проверяет, что база данных отклоняет пересечение консультаций
+    врача из секций соседних месяцев и повтор ``id`` в другой секции.
+    """
+
+    ensure_partitions(date(2040, 1, 1), date(2040, 2, 1))
+    evening = create_at(datetime(2040, 1, 31, 23, 30, tzinfo=timezone.utc))
+    Consultation.objects.filter(pk=evening.pk).update(
+        end_time=datetime(2040, 2, 1, 1, 30, tzinfo=timezone.utc)
+    )
+    night = create_at(datetime(2040, 2, 1, 0, 0, tzinfo=timezone.utc))
+    assert partition_of(evening) != partition_of(night)
+
+    with pytest.raises(IntegrityError) as error:
+        with transaction.atomic():
+            connection.check_constraints()
+    assert error.value.__cause__.pgcode == errorcodes.EXCLUSION_VIOLATION
+
+    night.delete()
+    with pytest.raises(IntegrityError) as error:
+        with transaction.atomic():
+            create_at(
+                datetime(2040, 2, 10, tzinfo=timezone.utc), id=evening.pk
+            )
+            connection.check_constraints()
+    assert error.value.__cause__.pgcode == errorcodes.UNIQUE_VIOLATION
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_overlap_across_partitions(create_at):
+    """
+    Проверяет, что параллельные транзакции не могут записать
+    пересекающиеся консультации врача в соседние секции.
+    """
+
+    ensure_partitions(date(2040, 1, 1), date(2040, 2, 1))
+    checked, released = threading.Event(), threading.Event()
+
+    def hold_evening():
+        try:
+            with transaction.atomic():
+                create_at(datetime(2040, 1, 31, 23, 50, tzinfo=timezone.utc))
+                connection.check_constraints()
+                checked.set()
+                released.wait(timeout=10)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=hold_evening)
+    thread.start()
+    try:
+        assert checked.wait(timeout=10)
+        # Проверка ждёт фиксации параллельной транзакции.
+        threading.Timer(0.5, released.set).start()
+        with pytest.raises(IntegrityError):
+            with transaction.atomic():
+                create_at(datetime(2040, 2, 1, 0, 0, tzinfo=timezone.utc))
+                connection.check_constraints()
+    finally:
+        released.set()
+        thread.join()
+
+    assert Consultation.objects.count() == 1
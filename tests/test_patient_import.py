@@ -0,0 +1,107 @@
+import io
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+
+from users.imports import PatientImport
+from users.models import CustomUser, Patient
+
+IMPORT_URL = reverse('users:patients-import')
+
+HEADER = 'last_name,first_name,patronymic,phone,email\n'
+
+
+def csv_file(*lines):
+    return HEADER + ''.join(f'{line}\n' for line in lines)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('workers', (1, 2))
+def test_import_dedupes_and_reports_rejects(patient_user, workers):
+    """
+    Проверяет создание пациентов порциями, нормализацию телефонов
+    и отчёт о строках с ошибками и повторами в файле и в базе.
+    """
+
+    data = csv_file(
+        'Иванов,Иван,Иванович,8 (900) 111-22-33,ivan@example.com',
+        'Петров,Пётр,,+7 900 111 22 44,petr@EXAMPLE.com',
+        'Повтор,Телефона,,89001112233,other@example.com',
+        'Сидоров,Сидор,,не телефон,sidor@example.com',
+        f'Занят,Email,,+79005556677,{patient_user.email}',
+        'Без,Почты,,+79005556688,',
+        'Смирнов,Семён,,+79005556699,semen@example.com',
+    )
+
+    result = PatientImport(workers=workers, chunk_size=2).run(
+        io.StringIO(data)
+    )
+
+    assert result.created == 3
+    rejects = sorted(
+        (reject['line'], reject['error']) for reject in result.rejects
+    )
+    assert rejects == [
+        (4, 'Повтор phone в файле.'),
+        (5, 'Некорректный номер телефона.'),
+        (6, 'email уже существует.'),
+        (7, 'Введите правильный адрес электронной почты.'),
+    ]
+    petr = Patient.objects.select_related('user').get(email='petr@example.com')
+    assert str(petr.phone) == '+79001112244'
+    assert petr.user.username == 'petr@example.com'
+    assert petr.user.role == CustomUser.UserRole.PATIENT.value
+    assert not petr.user.has_usable_password()
+    assert Patient.objects.filter(phone='+79001112233').exists()
+
+
+@pytest.mark.django_db
+def test_import_command(tmp_path):
+    """Проверяет команду импорта и файл отчёта."""
+
+    source = tmp_path / 'patients.csv'
+    source.write_text(
+        csv_file(
+            'Иванов,Иван,,89001112233,ivan@example.com',
+            'Иванов,Иван,,89001112233,ivan@example.com',
+        ),
+        encoding='utf-8-sig',
+    )
+    rejects = tmp_path / 'rejects.csv'
+
+    call_command(
+        'import_patients', str(source), workers=1, rejects=str(rejects)
+    )
+
+    assert Patient.objects.count() == 1
+    assert rejects.read_text(encoding='utf-8').splitlines()[1].startswith(
+        '3,Повтор phone в файле.'
+    )
+
+
+@pytest.mark.django_db
+def test_import_endpoint(api_client, admin_user, doctor_user):
+    """Проверяет импорт через API и права доступа."""
+
+    upload = SimpleUploadedFile(
+        'patients.csv',
+        csv_file('Иванов,Иван,,89001112233,ivan@example.com').encode(),
+        content_type='text/csv',
+    )
+
+    api_client.force_authenticate(user=doctor_user.user)
+    assert api_client.post(IMPORT_URL, {'file': upload}).status_code == 403
+
+    upload.seek(0)
+    api_client.force_authenticate(user=admin_user)
+    response = api_client.post(IMPORT_URL, {'file': upload})
+    bad_header = api_client.post(
+        IMPORT_URL,
+        {'file': SimpleUploadedFile('bad.csv', b'name,phone\n')},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {'created': 1, 'rejected': 0, 'rejects': []}
+    assert bad_header.status_code == 400
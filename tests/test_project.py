@@ -3,111 +3,8 @@ from datetime import timedelta
 import pytest
 from django.urls import reverse
 from django.utils import timezone
-from rest_framework.test import APIClient
 
 from consultations.models import Consultation
-from users.models import CustomUser, Doctor, Patient
-
-
-@pytest.fixture
-def api_client():
-    """Возвращает экземпляр APIClient."""
-
-    return APIClient()
-
-
-@pytest.fixture
-def admin_user(db, django_user_model):
-    """Создаёт и возвращает пользователя-администратора."""
-
-    user = django_user_model.objects.create_user(
-        username='admin',
-        password='password',
-        role=CustomUser.UserRole.ADMIN.value,
-        first_name='Admin',
-        last_name='User',
-    )
-    return user
-
-
-@pytest.fixture
-def doctor_user(db, django_user_model):
-    """Создаёт и возвращает пользователя-врача с профилем Doctor."""
-
-    user = django_user_model.objects.create_user(
-        username='doctor',
-        password='password',
-        role=CustomUser.UserRole.DOCTOR.value,
-        first_name='John',
-        last_name='Doe',
-    )
-    doctor = Doctor.objects.create(user=user, specialization="Cardiology")
-    return doctor
-
-
-@pytest.fixture
-def other_doctor(db, django_user_model):
-    """Создаёт и возвращает другого пользователя-врача с профилем Doctor."""
-
-    user = django_user_model.objects.create_user(
-        username='doctor2',
-        password='password',
-        role=CustomUser.UserRole.DOCTOR.value,
-        first_name='Alice',
-        last_name='Smith',
-    )
-    doctor = Doctor.objects.create(user=user, specialization="Neurology")
-    return doctor
-
-
-@pytest.fixture
-def patient_user(db, django_user_model):
-    """Создаёт и возвращает пользователя-пациента с профилем Patient."""
-
-    user = django_user_model.objects.create_user(
-        username='patient',
-        password='password',
-        role=CustomUser.UserRole.PATIENT.value,
-        first_name='Jane',
-        last_name='Doe',
-    )
-    patient = Patient.objects.create(
-        user=user, phone='+71234567890', email='jane@example.com'
-    )
-    return patient
-
-
-@pytest.fixture
-def other_patient(db, django_user_model):
-    """
-    Создаёт и возвращает другого пользователя-пациента с профилем Patient.
-    """
-
-    user = django_user_model.objects.create_user(
-        username='patient2',
-        password='password',
-        role=CustomUser.UserRole.PATIENT.value,
-        first_name='Bob',
-        last_name='Brown',
-    )
-    patient = Patient.objects.create(
-        user=user, phone='+79876543210', email='bob@example.com'
-    )
-    return patient
-
-
-@pytest.fixture
-def consultation_payload(doctor_user, patient_user):
-    """Возвращает словарь с данными для создания Consultation."""
-
-    now = timezone.now() + timedelta(hours=1)
-    return {
-        'start_time': now.isoformat(),
-        'end_time': (now + timedelta(hours=1)).isoformat(),
-        'status': 'Waiting',
-        'doctor': doctor_user.pk,
-        'patient': patient_user.pk,
-    }
 
 
 @pytest.mark.django_db
@@ -243,7 +140,7 @@ def test_list_consultations_as_doctor(
     api_client.force_authenticate(user=doctor_user.user)
     response = api_client.get(url, format='json')
     assert response.status_code == 200
-    data = response.json()
+    data = response.json()['results']
     assert any(item['id'] == consultation1.pk for item in data)
     assert not any(item['id'] == consultation2.pk for item in data)
 
@@ -273,7 +170,7 @@ def test_list_consultations_as_patient(
     api_client.force_authenticate(user=patient_user.user)
     response = api_client.get(url, format='json')
     assert response.status_code == 200
-    data = response.json()
+    data = response.json()['results']
     assert any(item['id'] == consultation1.pk for item in data)
     assert not any(item['id'] == consultation2.pk for item in data)
 
@@ -434,18 +331,18 @@ def test_search_filter_ordering(
     api_client.force_authenticate(user=admin_user)
     response_search = api_client.get(url, {'search': 'Alice'}, format='json')
     assert response_search.status_code == 200
-    data_search = response_search.json()
+    data_search = response_search.json()['results']
     assert any(item['id'] == consultation2.pk for item in data_search)
     response_filter = api_client.get(
         url, {'status': 'Confirmed'}, format='json'
     )
     assert response_filter.status_code == 200
-    data_filter = response_filter.json()
+    data_filter = response_filter.json()['results']
     assert all(item['status'] == 'Confirmed' for item in data_filter)
     response_order = api_client.get(
         url, {'ordering': 'created_at'}, format='json'
     )
     assert response_order.status_code == 200
-    data_order = response_order.json()
+    data_order = response_order.json()['results']
     created_dates = [item['created_at'] for item in data_order]
     assert created_dates == sorted(created_dates)
@@ -0,0 +1,144 @@
+import pytest
+from django.urls import reverse
+
+from medical_service.instrumentation import (
+    DUPLICATE_QUERIES_HEADER,
+    QUERY_COUNT_HEADER,
+    QUERY_TIME_HEADER,
+)
+
+LIST_URL = reverse('consultations:consultations-list')
+
+
+@pytest.fixture
+def doctor_client(api_client, doctor_user):
+    """Клиент с JWT-токеном врача."""
+
+    response = api_client.post(
+        reverse('token_obtain_pair'),
+        data={'username': doctor_user.user.username, 'password': 'password'},
+        format='json',
+    )
+    api_client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {response.json()["access"]}'
+    )
+    return api_client
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'expand, budget',
+    (('', 1), ('doctor,patient', 1), ('clinics', 2)),
+)
+def test_list_query_budget(
+    doctor_client, create_consultations, query_budget, expand, budget
+):
+    """Проверяет, что число запросов списка не растёт с размером страницы."""
+
+    create_consultations(25)
+    counts = []
+    for page_size in (5, 20):
+        with query_budget(budget) as queries:
+            response = doctor_client.get(
+                LIST_URL, {'page_size': page_size, 'expand': expand}
+            )
+        assert response.status_code == 200
+        assert len(response.json()['results']) == page_size
+        counts.append(queries.count)
+
+    assert counts[0] == counts[1]
+
+
+@pytest.mark.django_db
+def test_retrieve_query_budget(
+    doctor_client, create_consultations, query_budget
+):
+    """Проверяет бюджет запросов для деталей консультации."""
+
+    consultation = create_consultations(1)[0]
+    url = reverse(
+        'consultations:consultations-detail', args=[consultation.pk]
+    )
+
+    with query_budget(1):
+        response = doctor_client.get(url, {'expand': 'doctor,patient'})
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_create_query_budget(
+    doctor_client, consultation_payload, query_budget
+):
+    """Проверяет бюджет запросов для создания консультации."""
+
+    # Включая обновление статистики консультаций и проверку
+    # отложенного ограничения-исключения.
+    with query_budget(9):
+        response = doctor_client.post(
+            LIST_URL, consultation_payload, format='json'
+        )
+
+    assert response.status_code == 201
+
+
+@pytest.mark.django_db
+def test_update_query_budget(
+    doctor_client, create_consultations, query_budget
+):
+    """
+    Проверяет бюджет запросов для изменения консультации без смены
+    врача и пациента: их ФИО не пересчитываются.
+    """
+
+    consultation = create_consultations(1)[0]
+    url = reverse(
+        'consultations:consultations-detail', args=[consultation.pk]
+    )
+
+    with query_budget(10):
+        response = doctor_client.patch(
+            url, {'status': 'Confirmed'}, format='json'
+        )
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_change_status_query_budget(
+    doctor_client, create_consultations, query_budget
+):
+    """Проверяет бюджет запросов для смены статуса."""
+
+    consultation = create_consultations(1)[0]
+    url = reverse(
+        'consultations:consultations-change-status', args=[consultation.pk]
+    )
+
+    with query_budget(3):
+        response = doctor_client.patch(
+            url, {'status': 'Confirmed'}, format='json'
+        )
+
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_query_headers_in_debug(
+    settings, doctor_client, create_consultations
+):
+    """Проверяет заголовки с учётом SQL-запросов в режиме отладки."""
+
+    create_consultations(3)
+    settings.DEBUG = True
+
+    response = doctor_client.get(LIST_URL)
+
+    assert response[QUERY_COUNT_HEADER] == '1'
+    assert float(response[QUERY_TIME_HEADER]) >= 0
+    assert response[DUPLICATE_QUERIES_HEADER] == '0'
+
+    settings.DEBUG = False
+    response = doctor_client.get(LIST_URL, {'page_size': 2})
+
+    assert QUERY_COUNT_HEADER not in response
@@ -0,0 +1,33 @@
+import pytest
+from django.core.management import call_command
+
+from consultations.models import Consultation
+from consultations.query_plans import (
+    check_query_plans,
+    explain,
+    plan_problems,
+)
+
+
+@pytest.mark.django_db
+def test_query_plans_use_indexes(create_consultations):
+    """
+    Проверяет, что запросы списка для всех ролей, фильтров и сортировок
+    обслуживаются индексами без последовательного чтения и сортировки.
+    """
+
+    create_consultations(3)
+
+    assert check_query_plans() == {}
+    call_command('check_query_plans')
+
+
+@pytest.mark.django_db
+def test_plan_check_detects_sort():
+    """Проверяет, что сортировка без индекса считается регрессией."""
+
+    queryset = Consultation.objects.order_by('-end_time')[:20]
+
+    assert any(
+        problem.startswith('Sort') for problem in plan_problems(explain(queryset))
+    )
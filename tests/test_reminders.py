@@ -0,0 +1,165 @@
+import io
+import json
+import threading
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection, transaction
+
+from consultations.models import Consultation, ConsultationReminder
+from consultations.reminders import (
+    ConsoleBackend,
+    EmailBackend,
+    ReminderScheduler,
+)
+
+FILE_BACKEND = 'consultations.reminders.FileBackend'
+
+
+def read_messages(path):
+    with open(path, encoding='utf-8') as stream:
+        return [json.loads(line) for line in stream]
+
+
+@pytest.mark.django_db
+def test_send_reminders_once(create_consultations, settings, tmp_path):
+    """
+    Проверяет, что команда отправляет напоминания по обоим каналам
+    только о консультациях в пределах упреждения и не повторяет их.
+    """
+
+    settings.REMINDER_FILE_PATH = tmp_path / 'reminders.log'
+    settings.REMINDER_BACKENDS = {'email': FILE_BACKEND, 'sms': FILE_BACKEND}
+    due = create_consultations(3)
+    create_consultations(1, status=Consultation.Status.FINISHED.value)
+    # Начинается позже упреждения.
+    create_consultations(1)
+
+    options = {'lead_hours': 27, 'window_minutes': 90, 'batch_size': 2}
+    call_command('send_reminders', **options)
+    call_command('send_reminders', **options)
+
+    messages = read_messages(settings.REMINDER_FILE_PATH)
+    assert sorted(
+        (message['consultation_id'], message['channel'])
+        for message in messages
+    ) == sorted(
+        (consultation.pk, channel)
+        for consultation in due
+        for channel in ('email', 'sms')
+    )
+    assert {message['recipient'] for message in messages} == {
+        'jane@example.com',
+        '+71234567890',
+    }
+    assert ConsultationReminder.objects.count() == len(messages)
+
+
+@pytest.mark.django_db
+def test_undelivered_reminders_are_retried(create_consultations):
+    """
+    Проверяет, что e-mail уходит через почтовый бэкенд Django,
+    а недоставленное сообщение отправляется при следующем запуске.
+    """
+
+    class FailingBackend(ConsoleBackend):
+        fail = True
+
+        def send_messages(self, messages):
+            return [] if self.fail else super().send_messages(messages)
+
+    consultation, = create_consultations(1)
+    sms = FailingBackend(stream=io.StringIO())
+    scheduler = ReminderScheduler(
+        lead_time=timedelta(days=2),
+        backends={'email': EmailBackend(), 'sms': sms},
+    )
+
+    assert scheduler.run() == 1
+    assert len(mail.outbox) == 1
+    assert mail.outbox[0].to == ['jane@example.com']
+
+    sms.fail = False
+    assert scheduler.run() == 1
+    assert len(mail.outbox) == 1
+    assert set(
+        consultation.reminders.values_list('channel', flat=True)
+    ) == {'email', 'sms'}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_locked_consultations_are_skipped(create_consultations):
+    """
+    Проверяет, что планировщик пропускает консультации, заблокированные
+    другим планировщиком, вместо того чтобы ждать их.
+    """
+
+    consultations = create_consultations(3)
+    locked, released = threading.Event(), threading.Event()
+
+    def hold_lock():
+        try:
+            with transaction.atomic():
+                Consultation.objects.select_for_update().get(
+                    pk=consultations[0].pk
+                )
+                locked.set()
+                released.wait(timeout=10)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=hold_lock)
+    thread.start()
+    try:
+        assert locked.wait(timeout=10)
+        first = ReminderScheduler(
+            lead_time=timedelta(days=2),
+            backends={'email': ConsoleBackend(stream=io.StringIO())},
+        ).run()
+    finally:
+        released.set()
+        thread.join()
+
+    assert first == 2
+    assert not consultations[0].reminders.exists()
+
+    assert ReminderScheduler(
+        lead_time=timedelta(days=2),
+        backends={'email': ConsoleBackend(stream=io.StringIO())},
+    ).run() == 1
+    assert consultations[0].reminders.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reminders_sent_after_commit(create_consultations):
+    """
+    Проверяет, что сообщения отправляются после фиксации записей
+    о них, а записи сообщений, на которых бэкенд упал, удаляются.
+    """
+
+    class CheckingBackend(ConsoleBackend):
+        fail = True
+
+        def send_messages(self, messages):
+            assert not connection.in_atomic_block
+            assert ConsultationReminder.objects.filter(
+                consultation_id__in=[m.consultation_id for m in messages]
+            ).count() == len(messages)
+            if self.fail:
+                raise ConnectionError('sms')
+            return super().send_messages(messages)
+
+    consultation, = create_consultations(1)
+    sms = CheckingBackend(stream=io.StringIO())
+    scheduler = ReminderScheduler(
+        lead_time=timedelta(days=2), backends={'sms': sms}
+    )
+
+    assert scheduler.run() == 0
+    assert not consultation.reminders.exists()
+
+    sms.fail = False
+    assert scheduler.run() == 1
+    assert consultation.reminders.get().channel == 'sms'
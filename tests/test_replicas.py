@@ -0,0 +1,157 @@
+import pytest
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from consultations.models import Consultation
+from medical_service import replicas
+from medical_service.instrumentation import QueryRecorder
+from medical_service.replicas import replica_reads, reset_replica_health
+
+from .conftest import REPLICA_ALIAS
+
+LIST_URL = '/api/v1/consultations/'
+CONSULTATION_TABLE = Consultation._meta.db_table
+
+pytestmark = pytest.mark.django_db(
+    transaction=True, databases=[DEFAULT_DB_ALIAS, REPLICA_ALIAS]
+)
+
+
+@pytest.fixture(autouse=True)
+def replica_settings(settings):
+    settings.REPLICA_DATABASES = [REPLICA_ALIAS]
+    reset_replica_health()
+    yield
+    reset_replica_health()
+
+
+def consultation_aliases(recorder):
+    """Базы данных, из которых читались консультации."""
+
+    return {
+        query['alias']
+        for query in recorder.queries
+        if CONSULTATION_TABLE in query['sql']
+    }
+
+
+def get_list(api_client, user, **params):
+    api_client.force_authenticate(user=user)
+    with QueryRecorder() as recorder:
+        response = api_client.get(LIST_URL, params)
+    assert response.status_code == 200
+    return consultation_aliases(recorder)
+
+
+def test_safe_requests_read_from_replica(
+    api_client, doctor_user, create_consultations
+):
+    """Проверяет, что список консультаций читается с реплики."""
+
+    create_consultations(2)
+    cache.clear()
+
+    assert get_list(api_client, doctor_user.user) == {REPLICA_ALIAS}
+
+
+def test_recent_changes_read_from_primary(
+    api_client, doctor_user, create_consultations
+):
+    """
+    Проверяет, что сразу после изменения данных ответ, который
+    попадёт в кэш, строится по основной базе.
+    """
+
+    create_consultations(2)
+
+    assert get_list(api_client, doctor_user.user) == {DEFAULT_DB_ALIAS}
+
+
+def test_writer_sticks_to_primary(
+    api_client, settings, admin_user, doctor_user, consultation_payload
+):
+    """
+    Проверяет, что после записи чтения пользователя идут в основную
+    базу, а чтения других пользователей — на реплику.
+    """
+
+    # Без защиты свежих изменений: проверяется только закрепление.
+    settings.REPLICA_MAX_LAG = settings.REPLICA_LAG_CHECK_INTERVAL = 0
+    cache.clear()
+    api_client.force_authenticate(user=doctor_user.user)
+    response = api_client.post(LIST_URL, consultation_payload)
+    assert response.status_code == 201
+
+    assert get_list(api_client, doctor_user.user) == {DEFAULT_DB_ALIAS}
+    assert get_list(api_client, admin_user) == {REPLICA_ALIAS}
+
+
+@pytest.mark.parametrize('lag', (60, None))
+def test_lagging_replica_leaves_rotation(
+    api_client, doctor_user, create_consultations, monkeypatch, lag
+):
+    """
+    Проверяет, что отстающая или недоступная реплика исключается
+    из ротации, а проверка отставания кэшируется.
+    """
+
+    checks = []
+
+    def replica_lag(alias):
+        checks.append(alias)
+        return lag
+
+    monkeypatch.setattr(replicas, 'replica_lag', replica_lag)
+    create_consultations(1)
+    cache.clear()
+
+    assert get_list(api_client, doctor_user.user) == {DEFAULT_DB_ALIAS}
+    assert get_list(api_client, doctor_user.user, page_size=5) == {
+        DEFAULT_DB_ALIAS
+    }
+    assert checks == [REPLICA_ALIAS]
+
+
+def test_transactions_read_from_primary(doctor_user, create_consultations):
+    """Проверяет, что внутри транзакции чтение идёт из основной базы."""
+
+    create_consultations(1)
+
+    with replica_reads():
+        assert Consultation.objects.all().db == REPLICA_ALIAS
+        with transaction.atomic():
+            assert Consultation.objects.all().db == DEFAULT_DB_ALIAS
+
+
+def test_admin_changelist_reads_from_replica(
+    client, django_user_model, create_consultations
+):
+    """Проверяет, что список консультаций в админке читается с реплики."""
+
+    create_consultations(2)
+    superuser = django_user_model.objects.create_superuser(
+        username='superuser', password='password'
+    )
+    client.force_login(superuser)
+
+    with QueryRecorder() as recorder:
+        response = client.get('/admin/consultations/consultation/')
+
+    assert response.status_code == 200
+    assert consultation_aliases(recorder) == {REPLICA_ALIAS}
+
+
+def test_doctor_facets_read_with_page(api_client, patient_user, doctor_user):
+    """
+    Проверяет, что фасеты справочника врачей читаются из той же базы,
+    что и страница.
+    """
+
+    cache.clear()
+    api_client.force_authenticate(user=patient_user.user)
+    with QueryRecorder() as recorder:
+        response = api_client.get('/api/v1/doctors/')
+
+    assert response.status_code == 200
+    assert response.json()['facets']['specialization']
+    assert {query['alias'] for query in recorder.queries} == {REPLICA_ALIAS}
@@ -0,0 +1,103 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+
+def authorize(api_client, user):
+    response = api_client.post(
+        reverse('token_obtain_pair'),
+        data={'username': user.username, 'password': 'password'},
+        format='json',
+    )
+    api_client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {response.json()["access"]}'
+    )
+
+
+@pytest.mark.django_db
+def test_list_not_modified_without_queries(
+    api_client, doctor_user, create_consultations
+):
+    """Проверяет ответ 304 на If-None-Match без SQL-запросов."""
+
+    create_consultations(2)
+    authorize(api_client, doctor_user.user)
+    url = reverse('consultations:consultations-list')
+
+    response = api_client.get(url)
+    etag = response['ETag']
+    assert response.status_code == 200
+    assert etag
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response['ETag'] == etag
+    assert len(queries) == 0
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(url)
+    assert response.status_code == 200
+    assert len(response.json()['results']) == 2
+    assert len(queries) == 0
+
+
+@pytest.mark.django_db
+def test_list_invalidated_on_create(
+    api_client, doctor_user, create_consultations
+):
+    """Проверяет смену ETag и списка после создания консультации."""
+
+    create_consultations(1)
+    authorize(api_client, doctor_user.user)
+    url = reverse('consultations:consultations-list')
+    etag = api_client.get(url)['ETag']
+
+    create_consultations(1)
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+    assert len(response.json()['results']) == 2
+
+
+@pytest.mark.django_db
+def test_list_cached_per_user(
+    api_client, doctor_user, other_doctor, create_consultations
+):
+    """Проверяет, что врачи не получают закэшированные списки друг друга."""
+
+    create_consultations(2)
+    url = reverse('consultations:consultations-list')
+
+    authorize(api_client, doctor_user.user)
+    etag = api_client.get(url)['ETag']
+
+    authorize(api_client, other_doctor.user)
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+    assert response.json()['results'] == []
+
+
+@pytest.mark.django_db
+def test_retrieve_invalidated_on_update(
+    api_client, doctor_user, create_consultations
+):
+    """Проверяет сброс кэша консультации после её изменения."""
+
+    consultation = create_consultations(1)[0]
+    authorize(api_client, doctor_user.user)
+    url = reverse(
+        'consultations:consultations-detail', args=[consultation.pk]
+    )
+    etag = api_client.get(url)['ETag']
+
+    consultation.status = consultation.Status.CONFIRMED.value
+    consultation.save()
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 200
+    assert response.json()['status'] == consultation.Status.CONFIRMED.value
@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+import pytest
+from django.db import IntegrityError, connection
+from django.urls import reverse
+from django.utils import timezone
+
+from consultations.models import Consultation
+
+
+@pytest.fixture
+def slot_start():
+    """Начало интервала для проверок пересечения."""
+
+    return (timezone.now() + timedelta(days=2)).replace(
+        minute=0, second=0, microsecond=0
+    )
+
+
+def payload(doctor, patient, start, minutes=60):
+    return {
+        'start_time': start.isoformat(),
+        'end_time': (start + timedelta(minutes=minutes)).isoformat(),
+        'status': 'Waiting',
+        'doctor': doctor.pk,
+        'patient': patient.pk,
+    }
+
+
+@pytest.mark.django_db
+def test_overlapping_consultation_is_rejected(
+    api_client, doctor_user, patient_user, other_patient, slot_start
+):
+    """Проверяет, что пересекающийся приём у того же врача отклоняется."""
+
+    url = reverse('consultations:consultations-list')
+    api_client.force_authenticate(user=doctor_user.user)
+    first = api_client.post(
+        url, payload(doctor_user, patient_user, slot_start), format='json'
+    )
+    assert first.status_code == 201, first.data
+
+    response = api_client.post(
+        url,
+        payload(
+            doctor_user, other_patient, slot_start + timedelta(minutes=30)
+        ),
+        format='json',
+    )
+
+    assert response.status_code == 400
+    assert 'У врача уже есть консультация в это время.' in str(
+        response.data
+    )
+
+
+@pytest.mark.django_db
+def test_adjacent_and_other_doctor_slots_are_allowed(
+    api_client, doctor_user, other_doctor, patient_user, slot_start
+):
+    """Проверяет, что смежный приём и приём у другого врача разрешены."""
+
+    url = reverse('consultations:consultations-list')
+    api_client.force_authenticate(user=doctor_user.user)
+    for data in (
+        payload(doctor_user, patient_user, slot_start),
+        payload(doctor_user, patient_user, slot_start + timedelta(hours=1)),
+        payload(other_doctor, patient_user, slot_start),
+    ):
+        response = api_client.post(url, data, format='json')
+        assert response.status_code == 201, response.data
+
+
+@pytest.mark.django_db
+def test_update_does_not_conflict_with_itself(
+    api_client, doctor_user, patient_user, slot_start
+):
+    """Проверяет, что сдвиг консультации не конфликтует с ней самой."""
+
+    consultation = Consultation.objects.create(
+        start_time=slot_start,
+        end_time=slot_start + timedelta(hours=1),
+        doctor=doctor_user,
+        patient=patient_user,
+    )
+    url = reverse('consultations:consultations-detail', args=[consultation.pk])
+    api_client.force_authenticate(user=doctor_user.user)
+
+    response = api_client.patch(
+        url,
+        {
+            'start_time': (slot_start + timedelta(minutes=30)).isoformat(),
+            'end_time': (slot_start + timedelta(minutes=90)).isoformat(),
+        },
+        format='json',
+    )
+
+    assert response.status_code == 200, response.data
+
+
+@pytest.mark.django_db
+def test_database_rejects_overlap(doctor_user, patient_user, slot_start):
+    """Проверяет ограничение-исключение на уровне базы данных."""
+
+    Consultation.objects.create(
+        start_time=slot_start,
+        end_time=slot_start + timedelta(hours=1),
+        doctor=doctor_user,
+        patient=patient_user,
+    )
+    Consultation.objects.create(
+        start_time=slot_start + timedelta(minutes=30),
+        end_time=slot_start + timedelta(minutes=90),
+        doctor=doctor_user,
+        patient=patient_user,
+    )
+    # Ограничение отложено до конца транзакции.
+    with pytest.raises(IntegrityError):
+        connection.check_constraints()
@@ -0,0 +1,125 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from consultations.models import Consultation
+
+
+@pytest.mark.django_db
+def test_search_names_are_denormalized(create_consultations):
+    """Проверяет заполнение поисковых полей при создании консультации."""
+
+    consultation = create_consultations(1)[0]
+    assert consultation.doctor_search_name == 'doe john'
+    assert consultation.patient_search_name == 'doe jane'
+
+
+@pytest.mark.django_db
+def test_search_names_follow_participants(
+    create_consultations, other_doctor
+):
+    """
+    Проверяет, что ФИО пересчитываются при смене врача, а сохранение
+    без смены участников не загружает пользователей.
+    """
+
+    consultation = Consultation.objects.get(pk=create_consultations(1)[0].pk)
+    consultation.status = 'Confirmed'
+    with CaptureQueriesContext(connection) as queries:
+        consultation.save()
+    assert not any('users_customuser' in q['sql'] for q in queries)
+
+    consultation.doctor = other_doctor
+    consultation.save(update_fields=['doctor'])
+    consultation.refresh_from_db()
+    assert consultation.doctor_search_name == 'smith alice'
+
+
+@pytest.mark.django_db
+def test_search_names_follow_user_rename(
+    api_client, admin_user, patient_user, create_consultations
+):
+    """Проверяет, что переименование пользователя обновляет поиск."""
+
+    consultation = create_consultations(1)[0]
+    user = patient_user.user
+    user.last_name = 'Ёлкина'
+    user.patronymic = 'Петровна'
+    user.save()
+
+    consultation.refresh_from_db()
+    assert consultation.patient_search_name == 'елкина jane петровна'
+
+    url = reverse('consultations:consultations-list')
+    api_client.force_authenticate(user=admin_user)
+    response = api_client.get(url, {'search': 'ЁЛКИН'}, format='json')
+    assert [item['id'] for item in response.json()['results']] == [
+        consultation.pk
+    ]
+
+
+@pytest.mark.django_db
+def test_search_requires_every_term(
+    api_client, admin_user, create_consultations
+):
+    """Проверяет, что каждый термин поиска должен найтись в ФИО."""
+
+    create_consultations(1)
+    url = reverse('consultations:consultations-list')
+    api_client.force_authenticate(user=admin_user)
+
+    found = api_client.get(url, {'search': 'john jane'}, format='json')
+    missing = api_client.get(url, {'search': 'john bob'}, format='json')
+
+    assert len(found.json()['results']) == 1
+    assert missing.json()['results'] == []
+
+
+@pytest.mark.django_db
+def test_ranked_search(
+    api_client,
+    admin_user,
+    doctor_user,
+    other_doctor,
+    other_patient,
+    create_consultations,
+):
+    """Проверяет ранжированный поиск: лучшее совпадение идёт первым."""
+
+    best = create_consultations(1, doctor=other_doctor)[0]
+    other = create_consultations(1, patient=other_patient)[0]
+    url = reverse('consultations:consultations-ranked-search')
+    api_client.force_authenticate(user=admin_user)
+
+    response = api_client.get(url, {'q': 'Smith Alice'}, format='json')
+
+    assert response.status_code == 200
+    results = response.json()['results']
+    assert results[0]['id'] == best.pk
+    assert other.pk not in [item['id'] for item in results]
+    assert results[0]['rank'] > 0
+
+
+@pytest.mark.django_db
+def test_ranked_search_is_scoped(
+    api_client, other_doctor, other_patient, create_consultations
+):
+    """Проверяет, что ранжированный поиск учитывает роль пользователя."""
+
+    create_consultations(1, doctor=other_doctor)
+    url = reverse('consultations:consultations-ranked-search')
+    api_client.force_authenticate(user=other_patient.user)
+
+    response = api_client.get(url, {'q': 'Alice'}, format='json')
+
+    assert response.json()['results'] == []
+
+
+@pytest.mark.django_db
+def test_ranked_search_requires_query(api_client, admin_user):
+    """Проверяет, что без запроса ранжированный поиск возвращает 400."""
+
+    url = reverse('consultations:consultations-ranked-search')
+    api_client.force_authenticate(user=admin_user)
+    assert api_client.get(url, format='json').status_code == 400
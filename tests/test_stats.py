@@ -0,0 +1,248 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from clinics.models import Clinic
+from consultations.models import Consultation, ConsultationStats
+from consultations import signals
+from consultations.stats import rebuild_stats
+
+STATS_URL = reverse('consultations:consultations-stats')
+
+
+def stats_snapshot():
+    """Ненулевые счётчики статистики."""
+
+    return set(
+        ConsultationStats.objects.exclude(count=0).values_list(
+            'doctor_id', 'day', 'status', 'count'
+        )
+    )
+
+
+def assert_matches_rebuild():
+    """Проверяет, что статистика совпадает с пересчитанной с нуля."""
+
+    incremental = stats_snapshot()
+    rebuild_stats(chunk_size=1)
+    assert incremental == stats_snapshot()
+
+
+@pytest.mark.django_db
+def test_stats_follow_changes(
+    api_client, doctor_user, other_doctor, create_consultations
+):
+    """
+    Проверяет, что статистика обновляется при создании, смене статуса,
+    переносе и удалении консультаций.
+    """
+
+    first, second, third = create_consultations(3)
+    api_client.force_authenticate(user=doctor_user.user)
+    url = reverse(
+        'consultations:consultations-change-status', args=[first.pk]
+    )
+    response = api_client.patch(url, {'status': 'Confirmed'}, format='json')
+    assert response.status_code == 200
+
+    second.doctor = other_doctor
+    second.start_time += timedelta(days=2)
+    second.end_time += timedelta(days=2)
+    second.save()
+    # Повторное сохранение того же объекта.
+    second.status = Consultation.Status.PAID.value
+    second.save(update_fields=['status'])
+    third.delete()
+
+    day = timezone.localdate(first.start_time)
+    assert stats_snapshot() == {
+        (doctor_user.pk, day, 'Confirmed', 1),
+        (
+            other_doctor.pk,
+            timezone.localdate(second.start_time),
+            'Paid',
+            1,
+        ),
+    }
+    assert_matches_rebuild()
+
+
+@pytest.mark.django_db
+def test_bulk_updates_stats(
+    api_client, admin_user, doctor_user, patient_user, create_consultations
+):
+    """Проверяет обновление статистики пакетной записью."""
+
+    existing = create_consultations(
+        1, status=Consultation.Status.STARTED.value
+    )[0]
+    start = existing.start_time + timedelta(hours=5)
+    items = [
+        {
+            'id': existing.pk,
+            'start_time': existing.start_time.isoformat(),
+            'end_time': existing.end_time.isoformat(),
+            'status': 'Finished',
+            'doctor': doctor_user.pk,
+            'patient': patient_user.pk,
+        },
+        {
+            'start_time': start.isoformat(),
+            'end_time': (start + timedelta(minutes=30)).isoformat(),
+            'doctor': doctor_user.pk,
+            'patient': patient_user.pk,
+        },
+    ]
+    api_client.force_authenticate(user=admin_user)
+
+    response = api_client.post(
+        reverse('consultations:consultations-bulk'), items, format='json'
+    )
+
+    assert response.status_code == 201
+    statuses = {
+        status: count for _, _, status, count in stats_snapshot()
+    }
+    assert statuses == {'Finished': 1, 'Waiting': 1}
+    assert_matches_rebuild()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_failed_stats_roll_back_write(
+    api_client,
+    admin_user,
+    doctor_user,
+    patient_user,
+    create_consultations,
+    monkeypatch,
+):
+    """
+    Проверяет, что ошибка обновления статистики откатывает запись
+    консультации: одиночную, пакетную и удаление.
+    """
+
+    existing = create_consultations(1)[0]
+
+    def fail(**changes):
+        raise RuntimeError('stats')
+
+    monkeypatch.setattr(signals, 'record_changes', fail)
+    start = existing.start_time + timedelta(hours=5)
+
+    with pytest.raises(RuntimeError):
+        Consultation.objects.create(
+            doctor=doctor_user,
+            patient=patient_user,
+            start_time=start,
+            end_time=start + timedelta(minutes=30),
+        )
+    with pytest.raises(RuntimeError):
+        existing.delete()
+
+    api_client.force_authenticate(user=admin_user)
+    item = {
+        'start_time': start.isoformat(),
+        'end_time': (start + timedelta(minutes=30)).isoformat(),
+        'doctor': doctor_user.pk,
+        'patient': patient_user.pk,
+    }
+    with pytest.raises(RuntimeError):
+        api_client.post(
+            reverse('consultations:consultations-bulk'),
+            [item],
+            format='json',
+        )
+
+    assert list(Consultation.objects.values_list('pk', flat=True)) == [
+        existing.pk
+    ]
+    monkeypatch.undo()
+    assert_matches_rebuild()
+
+
+@pytest.mark.django_db
+def test_stats_endpoint(
+    api_client, admin_user, doctor_user, other_doctor, create_consultations
+):
+    """Проверяет группировку статистики по врачам, клиникам и дням."""
+
+    clinic = Clinic.objects.create(
+        name='Клиника', legal_address='ул. 1', physical_address='ул. 2'
+    )
+    doctor_user.clinics.add(clinic)
+    other_doctor.clinics.add(clinic)
+    consultations = [
+        *create_consultations(2),
+        *create_consultations(1, doctor=other_doctor, status='Paid'),
+    ]
+    days = [timezone.localdate(item.start_time) for item in consultations]
+    api_client.force_authenticate(user=admin_user)
+    period = {
+        'date_from': min(days).isoformat(),
+        'date_to': max(days).isoformat(),
+    }
+
+    by_doctor = api_client.get(STATS_URL, {**period, 'group_by': 'doctor'})
+    by_clinic = api_client.get(STATS_URL, {**period, 'group_by': 'clinic'})
+    filtered = api_client.get(
+        STATS_URL, {**period, 'group_by': 'day', 'doctor': other_doctor.pk}
+    )
+
+    assert by_doctor.status_code == 200
+    assert [
+        (row['doctor'], row['counts']['Waiting'], row['total'])
+        for row in by_doctor.json()['results']
+    ] == [(doctor_user.pk, 2, 2), (other_doctor.pk, 0, 1)]
+    assert by_clinic.json()['results'] == [
+        {
+            'clinic': clinic.pk,
+            'counts': {
+                'Confirmed': 0,
+                'Waiting': 2,
+                'Started': 0,
+                'Finished': 0,
+                'Paid': 1,
+            },
+            'total': 3,
+        }
+    ]
+    assert [row['total'] for row in filtered.json()['results']] == [1]
+
+
+@pytest.mark.django_db
+def test_stats_endpoint_validation(api_client, admin_user, doctor_user):
+    """Проверяет права доступа и параметры запроса статистики."""
+
+    api_client.force_authenticate(user=doctor_user.user)
+    assert api_client.get(STATS_URL).status_code == 403
+
+    api_client.force_authenticate(user=admin_user)
+    assert api_client.get(STATS_URL, {'group_by': 'patient'}).status_code == (
+        400
+    )
+    assert (
+        api_client.get(
+            STATS_URL, {'date_from': '2024-01-01', 'date_to': '2025-06-01'}
+        ).status_code
+        == 400
+    )
+
+
+@pytest.mark.django_db
+def test_rebuild_command(create_consultations):
+    """Проверяет пересчёт статистики командой после изменений в обход ORM."""
+
+    create_consultations(3)
+    expected = stats_snapshot()
+    Consultation.objects.update(status='Started')
+    ConsultationStats.objects.update(count=100)
+
+    call_command('rebuild_consultation_stats', chunk_size=1)
+
+    assert stats_snapshot() == {
+        (doctor_id, day, 'Started', count)
+        for doctor_id, day, _, count in expected
+    }
@@ -0,0 +1,146 @@
+import pytest
+from django.db import transaction
+from django.urls import reverse
+
+from consultations import signals
+from consultations.models import Consultation, StatusConflict
+from consultations.views import ConsultationViewSet
+from medical_service.instrumentation import QueryRecorder
+
+
+def change_status_url(consultation):
+    return reverse(
+        'consultations:consultations-change-status', args=[consultation.pk]
+    )
+
+
+@pytest.mark.django_db
+def test_status_follows_transition_graph(
+    api_client, doctor_user, create_consultations
+):
+    """Проверяет, что статус меняется только по графу переходов."""
+
+    consultation = create_consultations(1)[0]
+    url = change_status_url(consultation)
+    api_client.force_authenticate(user=doctor_user.user)
+
+    skipped = api_client.patch(url, {'status': 'Paid'}, format='json')
+    assert skipped.status_code == 400
+
+    for status in ('Confirmed', 'Started', 'Finished', 'Paid'):
+        response = api_client.patch(url, {'status': status}, format='json')
+        assert response.status_code == 200
+        assert response.json()['status'] == status
+
+    backwards = api_client.patch(url, {'status': 'Waiting'}, format='json')
+    assert backwards.status_code == 400
+    consultation.refresh_from_db()
+    assert consultation.status == 'Paid'
+
+
+@pytest.mark.django_db
+def test_transition_is_conditional_update(create_consultations):
+    """
+    Проверяет, что переход — один UPDATE статуса с условием на прежний
+    статус, а проигравший гонку получает StatusConflict.
+    """
+
+    consultation = create_consultations(1)[0]
+    stale = Consultation.objects.get(pk=consultation.pk)
+
+    with QueryRecorder() as recorder:
+        consultation.transition_to('Confirmed')
+
+    (update,) = [
+        query['sql']
+        for query in recorder.queries
+        if query['sql'].startswith('UPDATE "consultations_consultation"')
+    ]
+    assert 'SET "status"' in update
+    assert '"start_time" =' not in update.split('WHERE')[0]
+    assert '"status" =' in update.split('WHERE')[1]
+
+    with pytest.raises(StatusConflict):
+        stale.transition_to('Confirmed')
+    assert stale.status == 'Waiting'
+
+
+@pytest.mark.django_db
+def test_conflict_keeps_outer_transaction(create_consultations):
+    """
+    Проверяет, что StatusConflict не ставит отметку отката внешней
+    транзакции и её можно продолжать.
+    """
+
+    consultation = create_consultations(1)[0]
+    stale = Consultation.objects.get(pk=consultation.pk)
+    consultation.transition_to('Confirmed')
+
+    with transaction.atomic():
+        with pytest.raises(StatusConflict):
+            stale.transition_to('Confirmed')
+        assert not transaction.get_rollback()
+        consultation.transition_to('Started')
+
+    consultation.refresh_from_db()
+    assert consultation.status == 'Started'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_failed_receiver_rolls_back_transition(
+    create_consultations, monkeypatch
+):
+    """
+    Проверяет, что ошибка обработчика post_save откатывает переход
+    вместе со статистикой.
+    """
+
+    consultation = create_consultations(1)[0]
+
+    def fail(**changes):
+        raise RuntimeError('stats')
+
+    monkeypatch.setattr(signals, 'record_changes', fail)
+    with pytest.raises(RuntimeError):
+        consultation.transition_to('Confirmed')
+
+    assert consultation.status == 'Waiting'
+    consultation.refresh_from_db()
+    assert consultation.status == 'Waiting'
+
+
+@pytest.mark.django_db
+def test_lost_race_returns_conflict(
+    api_client, doctor_user, create_consultations, monkeypatch
+):
+    """Проверяет ответ 409, если статус изменили параллельно."""
+
+    consultation = create_consultations(1)[0]
+    stale = Consultation.objects.get(pk=consultation.pk)
+    consultation.transition_to('Confirmed')
+    monkeypatch.setattr(ConsultationViewSet, 'get_object', lambda self: stale)
+    api_client.force_authenticate(user=doctor_user.user)
+
+    response = api_client.patch(
+        change_status_url(consultation), {'status': 'Confirmed'}, format='json'
+    )
+
+    assert response.status_code == 409
+    consultation.refresh_from_db()
+    assert consultation.status == 'Confirmed'
+
+
+@pytest.mark.django_db
+def test_update_rejects_invalid_transition(
+    api_client, doctor_user, create_consultations
+):
+    """Проверяет граф переходов при изменении консультации через PATCH."""
+
+    consultation = create_consultations(1)[0]
+    url = reverse('consultations:consultations-detail', args=[consultation.pk])
+    api_client.force_authenticate(user=doctor_user.user)
+
+    response = api_client.patch(url, {'status': 'Finished'}, format='json')
+
+    assert response.status_code == 400
+    assert 'status' in response.json()
@@ -0,0 +1,135 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+
+from consultations.models import Consultation
+from consultations.sync import decode_token
+
+CHANGES_URL = reverse('consultations:consultations-changes')
+
+
+def sync(api_client, user, since=None, **params):
+    api_client.force_authenticate(user=user)
+    if since is not None:
+        params['since'] = since
+    response = api_client.get(CHANGES_URL, params)
+    assert response.status_code == 200, response.data
+    return response.data
+
+
+def changed_ids(data):
+    return [item['id'] for item in data['changed']]
+
+
+def apply(state, data):
+    """Применяет страницу ленты так, как это делает клиент."""
+
+    for pk in data['deleted']:
+        state.pop(pk, None)
+    for item in data['changed']:
+        state[item['id']] = item
+    return state
+
+
+@pytest.mark.django_db(transaction=True)
+def test_changes_feed_returns_only_new_changes(
+    api_client, doctor_user, other_doctor, patient_user, create_consultations
+):
+    """
+    Проверяет постраничную первую синхронизацию и то, что следующая
+    синхронизация возвращает только изменения и удаления после токена
+    в пределах консультаций врача.
+    """
+
+    first, second, third = create_consultations(3)
+
+    page = sync(api_client, doctor_user.user, page_size=2)
+    assert page['has_more']
+    rest = sync(api_client, doctor_user.user, page['token'], page_size=2)
+    assert not rest['has_more']
+    assert changed_ids(page) + changed_ids(rest) == [
+        first.pk,
+        second.pk,
+        third.pk,
+    ]
+    assert page['changed'][0]['updated_at']
+
+    first.transition_to(Consultation.Status.CONFIRMED.value)
+    Consultation.objects.filter(pk=second.pk).delete()
+    create_consultations(1, doctor=other_doctor)
+
+    delta = sync(api_client, doctor_user.user, rest['token'])
+    assert changed_ids(delta) == [first.pk]
+    assert delta['changed'][0]['status'] == 'Confirmed'
+    assert delta['deleted'] == [second.pk]
+    assert not delta['has_more']
+
+    empty = sync(api_client, doctor_user.user, delta['token'])
+    assert empty['changed'] == empty['deleted'] == []
+    assert decode_token(empty['token']) >= decode_token(delta['token'])
+
+
+@pytest.mark.django_db(transaction=True)
+def test_move_between_partitions_keeps_consultation(
+    api_client, doctor_user, create_consultations
+):
+    """
+    Проверяет, что перенос консультации в секцию другого месяца
+    (удаление и вставка строки) не удаляет её у клиента.
+    """
+
+    (consultation,) = create_consultations(1)
+    data = sync(api_client, doctor_user.user)
+    state = apply({}, data)
+
+    consultation = Consultation.objects.get(pk=consultation.pk)
+    consultation.start_time += timedelta(days=40)
+    consultation.end_time += timedelta(days=40)
+    consultation.save()
+
+    state = apply(state, sync(api_client, doctor_user.user, data['token']))
+    assert list(state) == [consultation.pk]
+    assert state[consultation.pk]['start_time'] == (
+        consultation.start_time.isoformat().replace('+00:00', 'Z')
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reassigned_consultation_leaves_previous_doctor_feed(
+    api_client, admin_user, doctor_user, other_doctor, create_consultations
+):
+    """
+    Проверяет, что переназначенная консультация удаляется из ленты
+    прежнего врача и появляется в ленте нового, а для пациента
+    и администратора остаётся изменённой.
+    """
+
+    (consultation,) = create_consultations(1)
+    patient = consultation.patient.user
+    tokens = {
+        user: sync(api_client, user)['token']
+        for user in (doctor_user.user, other_doctor.user, patient, admin_user)
+    }
+
+    consultation = Consultation.objects.get(pk=consultation.pk)
+    consultation.doctor = other_doctor
+    consultation.save()
+
+    previous = sync(api_client, doctor_user.user, tokens[doctor_user.user])
+    assert (previous['changed'], previous['deleted']) == ([], [consultation.pk])
+    for user in (other_doctor.user, patient, admin_user):
+        delta = sync(api_client, user, tokens[user])
+        assert changed_ids(delta) == [consultation.pk]
+        assert delta['deleted'] == []
+
+
+@pytest.mark.django_db
+def test_changes_feed_rejects_invalid_token(api_client, doctor_user):
+    """Проверяет ответ на некорректный токен синхронизации."""
+
+    api_client.force_authenticate(user=doctor_user.user)
+    response = api_client.get(CHANGES_URL, {'since': 'not-a-token'})
+
+    assert response.status_code == 400
+    assert 'since' in response.data
@@ -1,13 +1,18 @@
 from django.contrib import admin
+from django.contrib.auth.base_user import BaseUserManager
 
-from .models import CustomUser, Doctor, Patient
+from medical_service.pagination import EstimatedCountPaginator
+from medical_service.replicas import ReplicaAdminMixin
+
+from .imports import normalize_phone
+from .models import CustomUser, Doctor, Patient, WorkingHours
 
 EMPTY_VALUE = '-ПУСТО-'
 
 
 # Регистрация кастомного пользователя
 @admin.register(CustomUser)
-class CustomUserAdmin(admin.ModelAdmin):
+class CustomUserAdmin(ReplicaAdminMixin, admin.ModelAdmin):
     list_display = (
         'username',
         'first_name',
@@ -23,23 +28,57 @@ class CustomUserAdmin(admin.ModelAdmin):
     empty_value_display = EMPTY_VALUE
 
 
+class WorkingHoursInline(admin.TabularInline):
+    model = WorkingHours
+    extra = 0
+
+
 # Регистрация врача
 @admin.register(Doctor)
-class DoctorAdmin(admin.ModelAdmin):
+class DoctorAdmin(ReplicaAdminMixin, admin.ModelAdmin):
+    inlines = (WorkingHoursInline,)
     list_display = (
         'user',
         'specialization',
     )
+    list_select_related = ('user',)
+    # Условия по ФИО обслуживают триграммные индексы пользователей,
+    # специализация ищется по небольшой таблице врачей.
     search_fields = ('user__first_name', 'user__last_name', 'specialization')
     list_filter = ('specialization',)
     ordering = ('user__last_name', 'user__first_name')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = EMPTY_VALUE
 
+    def get_queryset(self, request):
+        # Врач выводится по ФИО и в автодополнении.
+        return super().get_queryset(request).select_related('user')
+
 
 # Регистрация пациента
 @admin.register(Patient)
-class PatientAdmin(admin.ModelAdmin):
+class PatientAdmin(ReplicaAdminMixin, admin.ModelAdmin):
     list_display = ('user', 'phone', 'email')
-    search_fields = ('user__first_name', 'user__last_name', 'phone', 'email')
+    list_select_related = ('user',)
+    search_fields = ('user__first_name', 'user__last_name')
     ordering = ('user__last_name', 'user__first_name')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = EMPTY_VALUE
+
+    def get_queryset(self, request):
+        # Пациент выводится по ФИО и в автодополнении.
+        return super().get_queryset(request).select_related('user')
+
+    def get_search_results(self, request, queryset, search_term):
+        # Телефон и e-mail ищутся точным совпадением по уникальным
+        # индексам, остальное — по ФИО.
+        term = search_term.strip()
+        if '@' in term:
+            email = BaseUserManager.normalize_email(term)
+            return queryset.filter(email=email), False
+        phone = normalize_phone(term)
+        if phone is not None:
+            return queryset.filter(phone=phone), False
+        return super().get_search_results(request, queryset, search_term)
@@ -0,0 +1,188 @@
+"""
+JWT-аутентификация без обращения к базе данных.
+
+Access-токен содержит роль пользователя и идентификаторы профилей
+врача и пациента, поэтому пользователь запроса собирается из claims
+без загрузки ``CustomUser``. Отзыв токенов реализован через версию:
+токен хранит ``token_version`` на момент выдачи, а актуальная версия
+пользователя лежит в кэше и обновляется при сохранении пользователя.
+В базу данных аутентификация обращается только при промахе кэша.
+"""
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import CustomUser
+
+ROLE_CLAIM = 'role'
+DOCTOR_ID_CLAIM = 'doctor_id'
+PATIENT_ID_CLAIM = 'patient_id'
+VERSION_CLAIM = 'ver'
+
+TOKEN_VERSION_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Версия для удалённых и неактивных пользователей:
+# не совпадает ни с одной выданной.
+REVOKED_VERSION = -1
+
+TOKEN_REVOKED_MESSAGE = 'Токен отозван.'
+
+
+def token_version_cache_key(user_id):
+    return f'auth:token_version:{user_id}'
+
+
+def store_token_version(user):
+    """Сохраняет в кэш актуальную версию токенов пользователя."""
+
+    version = user.token_version if user.is_active else REVOKED_VERSION
+    cache.set(
+        token_version_cache_key(user.pk),
+        version,
+        TOKEN_VERSION_CACHE_TIMEOUT,
+    )
+
+
+def revoke_cached_token_version(user_id):
+    cache.set(
+        token_version_cache_key(user_id),
+        REVOKED_VERSION,
+        TOKEN_VERSION_CACHE_TIMEOUT,
+    )
+
+
+def get_token_version(user_id):
+    """Актуальная версия токенов пользователя (из кэша или БД)."""
+
+    key = token_version_cache_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        row = (
+            CustomUser.objects.filter(pk=user_id)
+            .values_list('token_version', 'is_active')
+            .first()
+        )
+        if row is None or not row[1]:
+            version = REVOKED_VERSION
+        else:
+            version = row[0]
+        cache.set(key, version, TOKEN_VERSION_CACHE_TIMEOUT)
+    return version
+
+
+async def aget_token_version(user_id):
+    """Асинхронный вариант ``get_token_version``."""
+
+    key = token_version_cache_key(user_id)
+    version = await cache.aget(key)
+    if version is None:
+        row = await (
+            CustomUser.objects.filter(pk=user_id)
+            .values_list('token_version', 'is_active')
+            .afirst()
+        )
+        if row is None or not row[1]:
+            version = REVOKED_VERSION
+        else:
+            version = row[0]
+        await cache.aset(key, version, TOKEN_VERSION_CACHE_TIMEOUT)
+    return version
+
+
+def is_token_current(token):
+    """Проверяет, что токен выдан для актуальной версии пользователя."""
+
+    user_id = token.get(api_settings.USER_ID_CLAIM)
+    if user_id is None:
+        return False
+    return token.get(VERSION_CLAIM) == get_token_version(user_id)
+
+
+async def ais_token_current(token):
+    """Асинхронный вариант ``is_token_current``."""
+
+    user_id = token.get(api_settings.USER_ID_CLAIM)
+    if user_id is None:
+        return False
+    return token.get(VERSION_CLAIM) == await aget_token_version(user_id)
+
+
+def add_user_claims(token, user):
+    """Добавляет в токен claims, нужные для работы без БД."""
+
+    token['username'] = user.username
+    token[ROLE_CLAIM] = user.role
+    token[DOCTOR_ID_CLAIM] = user.doctor_id
+    token[PATIENT_ID_CLAIM] = user.patient_id
+    token[VERSION_CLAIM] = user.token_version
+    return token
+
+
+class ClaimsUser(TokenUser):
+    """Пользователь запроса, собранный из claims access-токена."""
+
+    UserRole = CustomUser.UserRole
+
+    def __str__(self):
+        return f'ClaimsUser {self.id}'
+
+    @cached_property
+    def role(self):
+        return self.token[ROLE_CLAIM]
+
+    @cached_property
+    def doctor_id(self):
+        return self.token.get(DOCTOR_ID_CLAIM)
+
+    @cached_property
+    def patient_id(self):
+        return self.token.get(PATIENT_ID_CLAIM)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Аутентификация по JWT без загрузки пользователя из базы данных.
+
+    Токены, выданные до появления claims роли, обрабатываются
+    как обычно — с загрузкой пользователя.
+    """
+
+    def get_user(self, validated_token):
+        if ROLE_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+
+        if not is_token_current(validated_token):
+            raise AuthenticationFailed(
+                TOKEN_REVOKED_MESSAGE, code='token_revoked'
+            )
+        return ClaimsUser(validated_token)
+
+    async def aauthenticate(self, request):
+        """
+        Асинхронный вариант ``authenticate`` для async-представлений.
+        Разбор и проверка подписи токена не обращаются к базе данных.
+        """
+
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        if ROLE_CLAIM not in validated_token:
+            return await sync_to_async(super().get_user)(validated_token)
+
+        if not await ais_token_current(validated_token):
+            raise AuthenticationFailed(
+                TOKEN_REVOKED_MESSAGE, code='token_revoked'
+            )
+        return ClaimsUser(validated_token)
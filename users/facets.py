@@ -0,0 +1,83 @@
+"""
+Фасеты справочника врачей: число врачей по специализациям и клиникам.
+
+Оба счётчика считаются одним запросом с ``GROUPING SETS``. Счётчики
+каждого измерения учитывают фильтр по другому измерению, но не по
+своему: при выбранной клинике видно, сколько врачей каждой
+специализации в ней работает, и наоборот.
+"""
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from clinics.models import Clinic
+
+from .models import Doctor
+
+FACETS_SQL = '''
+SELECT
+    GROUPING(clinic.id) = 1,
+    doctor.specialization,
+    clinic.id,
+    clinic.name,
+    CASE WHEN GROUPING(clinic.id) = 1
+        THEN COUNT(DISTINCT doctor.id) FILTER (WHERE {clinic_filter})
+        ELSE COUNT(DISTINCT doctor.id) FILTER (WHERE {specialization_filter})
+    END
+FROM {doctor_table} AS doctor
+LEFT JOIN {through_table} AS doctor_clinic
+    ON doctor_clinic.{doctor_column} = doctor.id
+LEFT JOIN {clinic_table} AS clinic
+    ON clinic.id = doctor_clinic.{clinic_column}
+GROUP BY GROUPING SETS ((doctor.specialization), (clinic.id, clinic.name))
+'''
+
+
+def doctor_facets(specialization=None, clinic_id=None, using=DEFAULT_DB_ALIAS):
+    """
+    Возвращает ``{'specialization': [...], 'clinic': [...]}``,
+    значения упорядочены по убыванию числа врачей. Запрос выполняется
+    в базе данных ``using``.
+    """
+
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    through = Doctor.clinics.through._meta
+    params = []
+    clinic_filter = specialization_filter = 'TRUE'
+    if clinic_id is not None:
+        clinic_filter = (
+            f'doctor_clinic.{quote(through.get_field("clinic").column)} = %s'
+        )
+        params.append(clinic_id)
+    if specialization is not None:
+        specialization_filter = 'doctor.specialization = %s'
+        params.append(specialization)
+
+    sql = FACETS_SQL.format(
+        clinic_filter=clinic_filter,
+        specialization_filter=specialization_filter,
+        doctor_table=quote(Doctor._meta.db_table),
+        through_table=quote(through.db_table),
+        clinic_table=quote(Clinic._meta.db_table),
+        doctor_column=quote(through.get_field('doctor').column),
+        clinic_column=quote(through.get_field('clinic').column),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    facets = {'specialization': [], 'clinic': []}
+    for by_specialization, value, clinic, name, count in rows:
+        if not count:
+            continue
+        if by_specialization:
+            facets['specialization'].append({'value': value, 'count': count})
+        elif clinic is not None:
+            facets['clinic'].append(
+                {'id': clinic, 'name': name, 'count': count}
+            )
+    facets['specialization'].sort(
+        key=lambda item: (-item['count'], item['value'])
+    )
+    facets['clinic'].sort(key=lambda item: (-item['count'], item['name']))
+    return facets
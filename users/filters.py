@@ -0,0 +1,39 @@
+from django_filters import rest_framework as filters
+from phonenumber_field.phonenumber import PhoneNumber
+from phonenumbers import NumberParseException
+
+from .models import Doctor, Patient
+
+
+class DoctorFilter(filters.FilterSet):
+    """Фильтры справочника врачей."""
+
+    specialization = filters.CharFilter()
+    clinic = filters.NumberFilter(field_name='clinics')
+
+    class Meta:
+        model = Doctor
+        fields = ('specialization', 'clinic')
+
+
+class PatientFilter(filters.FilterSet):
+    """
+    Точный поиск пациента по телефону или e-mail. Оба поля уникальны,
+    поэтому поиск идёт по их уникальным индексам.
+    """
+
+    phone = filters.CharFilter(method='filter_phone')
+    email = filters.CharFilter()
+
+    class Meta:
+        model = Patient
+        fields = ('phone', 'email')
+
+    def filter_phone(self, queryset, name, value):
+        # Номер хранится в формате E.164, поэтому «8 (900) 000-00-00»
+        # и «+79000000000» находят одного пациента.
+        try:
+            phone = PhoneNumber.from_string(value, region='RU')
+        except NumberParseException:
+            return queryset.none()
+        return queryset.filter(**{name: phone.as_e164})
@@ -0,0 +1,241 @@
+"""
+Пакетный импорт пациентов из CSV.
+
+Файл читается потоково порциями по ``chunk_size`` строк. Для каждой
+порции:
+
+- телефоны приводятся к E.164 библиотекой ``phonenumbers`` в пуле
+  процессов (разбор номеров — самая дорогая часть импорта);
+- строки проверяются и сверяются с уже встреченными в файле ключами
+  и с существующими телефонами, e-mail и логинами — одним запросом
+  на ключ для всей порции;
+- пользователи и пациенты создаются через ``bulk_create`` в одной
+  транзакции.
+
+Отклонённые строки попадают в отчёт с номером строки и причиной.
+Импорт не отправляет ``post_save``: у новых пользователей нет ни
+токенов, ни консультаций, поэтому сбрасывать нечего.
+"""
+
+import csv
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from operator import itemgetter
+
+import phonenumbers
+from django.contrib.auth.models import BaseUserManager
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+from .models import CustomUser, Patient
+
+IMPORT_CHUNK_SIZE = 1000
+PHONE_REGION = 'RU'
+REQUIRED_COLUMNS = ('last_name', 'first_name', 'phone', 'email')
+OPTIONAL_COLUMNS = ('patronymic', 'username')
+REJECT_COLUMNS = ('line', 'error', *REQUIRED_COLUMNS, *OPTIONAL_COLUMNS)
+
+
+class ImportFormatError(Exception):
+    """Файл импорта нельзя прочитать как CSV с нужными столбцами."""
+
+
+def normalize_phone(value):
+    """Телефон в формате E.164 или ``None``, если номер некорректен."""
+
+    try:
+        number = phonenumbers.parse(value, PHONE_REGION)
+    except phonenumbers.NumberParseException:
+        return None
+    if not phonenumbers.is_valid_number(number):
+        return None
+    return phonenumbers.format_number(
+        number, phonenumbers.PhoneNumberFormat.E164
+    )
+
+
+class PatientImport:
+    """Импорт пациентов из CSV с отчётом об отклонённых строках."""
+
+    username_field = CustomUser._meta.get_field('username')
+
+    def __init__(self, workers=1, chunk_size=IMPORT_CHUNK_SIZE):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.created = 0
+        self.rejects = []
+        # Ключи, уже встреченные в файле.
+        self.seen = {'phone': set(), 'email': set(), 'username': set()}
+
+    def run(self, stream):
+        """Импортирует пациентов из текстового потока ``stream``."""
+
+        reader = csv.DictReader(stream)
+        missing = set(REQUIRED_COLUMNS) - set(reader.fieldnames or ())
+        if missing:
+            raise ImportFormatError(
+                f'Нет обязательных столбцов: {", ".join(sorted(missing))}.'
+            )
+
+        pool = (
+            ProcessPoolExecutor(max_workers=self.workers)
+            if self.workers > 1
+            else nullcontext()
+        )
+        with pool as executor:
+            chunk = []
+            for row in reader:
+                # Номер строки файла с учётом заголовка.
+                chunk.append((reader.line_num, row))
+                if len(chunk) >= self.chunk_size:
+                    self.import_chunk(chunk, executor)
+                    chunk = []
+            if chunk:
+                self.import_chunk(chunk, executor)
+        # Повторы ключей в базе находятся после проверки всей порции.
+        self.rejects.sort(key=itemgetter('line'))
+        return self
+
+    def import_chunk(self, chunk, executor):
+        phones = [(row.get('phone') or '').strip() for _, row in chunk]
+        if executor is None:
+            normalized = list(map(normalize_phone, phones))
+        else:
+            normalized = list(
+                executor.map(
+                    normalize_phone,
+                    phones,
+                    chunksize=max(1, len(phones) // (self.workers * 4)),
+                )
+            )
+
+        candidates = []
+        for (line, row), phone in zip(chunk, normalized):
+            try:
+                candidates.append((line, row, self.clean(row, phone)))
+            except ValidationError as error:
+                self.reject(line, row, ' '.join(error.messages))
+
+        # Параллельный импорт мог занять ключи после проверки:
+        # тогда порция проверяется заново.
+        for attempt in range(2):
+            candidates = self.exclude_existing(candidates)
+            try:
+                self.save([values for *_, values in candidates])
+                break
+            except IntegrityError:
+                if attempt:
+                    raise
+
+    def clean(self, row, phone):
+        """Проверенные значения строки или ``ValidationError``."""
+
+        values = {
+            column: (row.get(column) or '').strip()
+            for column in (*REQUIRED_COLUMNS, *OPTIONAL_COLUMNS)
+        }
+        for column in ('last_name', 'first_name'):
+            if not values[column]:
+                raise ValidationError(f'Не заполнено поле {column}.')
+        if phone is None:
+            raise ValidationError('Некорректный номер телефона.')
+        values['phone'] = phone
+        values['email'] = BaseUserManager.normalize_email(values['email'])
+        validate_email(values['email'])
+        values['username'] = values['username'] or values['email']
+        self.username_field.run_validators(values['username'])
+
+        for key in self.seen:
+            if values[key] in self.seen[key]:
+                raise ValidationError(f'Повтор {key} в файле.')
+        for key in self.seen:
+            self.seen[key].add(values[key])
+        return values
+
+    def exclude_existing(self, candidates):
+        """
+        Отклоняет строки, ключи которых уже заняты в базе данных,
+        и возвращает остальные.
+        """
+
+        def values_of(key):
+            return [values[key] for *_, values in candidates]
+
+        taken = {
+            'phone': {
+                phone.as_e164
+                for phone in Patient.objects.filter(
+                    phone__in=values_of('phone')
+                ).values_list('phone', flat=True)
+            },
+            'email': set(
+                Patient.objects.filter(
+                    email__in=values_of('email')
+                ).values_list('email', flat=True)
+            ),
+            'username': set(
+                CustomUser.objects.filter(
+                    username__in=values_of('username')
+                ).values_list('username', flat=True)
+            ),
+        }
+
+        accepted = []
+        for line, row, values in candidates:
+            duplicate = next(
+                (key for key in taken if values[key] in taken[key]), None
+            )
+            if duplicate is None:
+                accepted.append((line, row, values))
+            else:
+                self.reject(line, row, f'{duplicate} уже существует.')
+        return accepted
+
+    @transaction.atomic
+    def save(self, rows):
+        users = CustomUser.objects.bulk_create(
+            [self.build_user(values) for values in rows]
+        )
+        Patient.objects.bulk_create(
+            [
+                Patient(
+                    user=user, phone=values['phone'], email=values['email']
+                )
+                for user, values in zip(users, rows)
+            ]
+        )
+        self.created += len(rows)
+
+    @staticmethod
+    def build_user(values):
+        user = CustomUser(
+            username=values['username'],
+            first_name=values['first_name'],
+            last_name=values['last_name'],
+            patronymic=values['patronymic'] or None,
+            email=values['email'],
+            role=CustomUser.UserRole.PATIENT.value,
+        )
+        # Пароль пациент задаёт сам через восстановление пароля.
+        user.set_unusable_password()
+        return user
+
+    def reject(self, line, row, error):
+        self.rejects.append(
+            {
+                'line': line,
+                'error': error,
+                **{
+                    column: row.get(column) or ''
+                    for column in (*REQUIRED_COLUMNS, *OPTIONAL_COLUMNS)
+                },
+            }
+        )
+
+    def write_rejects(self, stream):
+        """Записывает отчёт об отклонённых строках в CSV."""
+
+        writer = csv.DictWriter(stream, fieldnames=REJECT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(self.rejects)
@@ -0,0 +1,70 @@
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.imports import IMPORT_CHUNK_SIZE, ImportFormatError, PatientImport
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует пациентов из CSV (столбцы last_name, first_name, '
+        'phone, email, необязательные patronymic и username).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Путь к CSV-файлу или «-» для стандартного ввода.'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Число процессов для нормализации телефонов.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=IMPORT_CHUNK_SIZE,
+            help='Число строк в одной порции.',
+        )
+        parser.add_argument(
+            '--rejects',
+            metavar='PATH',
+            help='Записать отклонённые строки в CSV-файл.',
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['chunk_size'] < 1:
+            raise CommandError(
+                'Число процессов и размер порции должны быть '
+                'положительными.'
+            )
+        patient_import = PatientImport(
+            workers=options['workers'], chunk_size=options['chunk_size']
+        )
+        try:
+            if options['path'] == '-':
+                patient_import.run(sys.stdin)
+            else:
+                with open(
+                    options['path'], encoding='utf-8-sig', newline=''
+                ) as stream:
+                    patient_import.run(stream)
+        except (ImportFormatError, UnicodeDecodeError) as error:
+            raise CommandError(str(error))
+
+        if options['rejects']:
+            with open(
+                options['rejects'], 'w', encoding='utf-8', newline=''
+            ) as stream:
+                patient_import.write_rejects(stream)
+        elif options['verbosity'] > 1:
+            patient_import.write_rejects(self.stdout)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Создано пациентов: {patient_import.created}, '
+                f'отклонено строк: {len(patient_import.rejects)}.'
+            )
+        )
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.6 on 2026-10-17 02:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkingHours',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Понедельник'), (1, 'Вторник'), (2, 'Среда'), (3, 'Четверг'), (4, 'Пятница'), (5, 'Суббота'), (6, 'Воскресенье')], verbose_name='День недели')),
+                ('start_time', models.TimeField(verbose_name='Начало работы')),
+                ('end_time', models.TimeField(verbose_name='Окончание работы')),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='working_hours', to='users.doctor', verbose_name='Врач')),
+            ],
+            options={
+                'verbose_name': 'Рабочие часы',
+                'verbose_name_plural': 'Рабочие часы',
+                'ordering': ('doctor', 'weekday', 'start_time'),
+                'constraints': [models.CheckConstraint(condition=models.Q(('start_time__lt', models.F('end_time'))), name='working_hours_start_before_end')],
+            },
+        ),
+    ]
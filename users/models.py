@@ -1,6 +1,9 @@
 from django.contrib.auth.models import AbstractUser
-from django.core.exceptions import ValidationError
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.db import models
+from django.db.models.functions import Upper
+from django.utils.functional import cached_property
 from phonenumber_field.modelfields import PhoneNumberField
 
 from clinics.models import Clinic
@@ -28,10 +31,84 @@ class CustomUser(AbstractUser):
         blank=True,
         null=True,
     )
+    token_version = models.PositiveIntegerField(
+        'Версия токенов',
+        default=0,
+        editable=False,
+    )
+
+    class Meta(AbstractUser.Meta):
+        indexes = (
+            # Сортировка справочников врачей и пациентов по ФИО.
+            models.Index(
+                fields=['last_name', 'first_name', 'id'],
+                name='user_name_idx',
+            ),
+            # Поиск ``icontains`` в админке (``UPPER(...) LIKE '%...%'``).
+            GinIndex(
+                OpClass(Upper('first_name'), name='gin_trgm_ops'),
+                name='user_first_name_trgm_idx',
+            ),
+            GinIndex(
+                OpClass(Upper('last_name'), name='gin_trgm_ops'),
+                name='user_last_name_trgm_idx',
+            ),
+        )
 
     def __str__(self):
         return f'{self.first_name} {self.last_name}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_role = dict(zip(field_names, values)).get('role')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Роль передаётся в токенах, поэтому её смена отзывает токены.
+        loaded_role = getattr(self, '_loaded_role', None)
+        role_changed = loaded_role is not None and loaded_role != self.role
+        if role_changed:
+            self.token_version += 1
+
+        # set_password меняет версию токенов вместе с паролем.
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and (
+            role_changed or 'password' in update_fields
+        ):
+            kwargs['update_fields'] = {*update_fields, 'token_version'}
+
+        super().save(*args, **kwargs)
+        self._loaded_role = self.role
+
+    def set_password(self, raw_password):
+        super().set_password(raw_password)
+        self.token_version += 1
+
+    def revoke_tokens(self):
+        """Отзывает все выданные пользователю JWT-токены."""
+
+        self.token_version += 1
+        self.save(update_fields=['token_version'])
+
+    @cached_property
+    def doctor_id(self):
+        """Идентификатор профиля врача или ``None``."""
+
+        try:
+            return self.doctor_profile.pk
+        except ObjectDoesNotExist:
+            return None
+
+    @cached_property
+    def patient_id(self):
+        """Идентификатор профиля пациента или ``None``."""
+
+        try:
+            return self.patient_profile.pk
+        except ObjectDoesNotExist:
+            return None
+
 
 class Doctor(models.Model):
     """Модель для врача."""
@@ -92,3 +169,46 @@ class Patient(models.Model):
     def clean(self):
         if self.user.role != CustomUser.UserRole.PATIENT.value:
             raise ValidationError('Пользователь должен иметь роль "Пациент".')
+
+
+class WorkingHours(models.Model):
+    """Рабочие часы врача в определённый день недели."""
+
+    class Weekday(models.IntegerChoices):
+        MONDAY = 0, 'Понедельник'
+        TUESDAY = 1, 'Вторник'
+        WEDNESDAY = 2, 'Среда'
+        THURSDAY = 3, 'Четверг'
+        FRIDAY = 4, 'Пятница'
+        SATURDAY = 5, 'Суббота'
+        SUNDAY = 6, 'Воскресенье'
+
+    doctor = models.ForeignKey(
+        Doctor,
+        verbose_name='Врач',
+        on_delete=models.CASCADE,
+        related_name='working_hours',
+    )
+    weekday = models.PositiveSmallIntegerField(
+        'День недели',
+        choices=Weekday.choices,
+    )
+    start_time = models.TimeField('Начало работы')
+    end_time = models.TimeField('Окончание работы')
+
+    class Meta:
+        verbose_name = 'Рабочие часы'
+        verbose_name_plural = 'Рабочие часы'
+        ordering = ('doctor', 'weekday', 'start_time')
+        constraints = (
+            models.CheckConstraint(
+                condition=models.Q(start_time__lt=models.F('end_time')),
+                name='working_hours_start_before_end',
+            ),
+        )
+
+    def __str__(self):
+        return (
+            f'{self.get_weekday_display()} '
+            f'{self.start_time:%H:%M}–{self.end_time:%H:%M}'
+        )
@@ -0,0 +1,14 @@
+from medical_service.pagination import KeysetPagination
+
+
+class DirectoryPagination(KeysetPagination):
+    """
+    Курсорная пагинация справочников врачей и пациентов по ФИО.
+
+    Последним полем идёт ``user_id``: он уникален для профиля и входит
+    в индекс ``user_name_idx``, поэтому сортировка берётся из индекса
+    пользователей без сортировки выборки.
+    """
+
+    ordering = ('user__last_name', 'user__first_name', 'user_id')
+    tiebreaker = 'user_id'
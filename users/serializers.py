@@ -1,6 +1,22 @@
+from datetime import timedelta
+
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
 
+from clinics.serializers import ClinicSerializer
+from users.authentication import (
+    TOKEN_REVOKED_MESSAGE,
+    VERSION_CLAIM,
+    add_user_claims,
+    is_token_current,
+)
 from users.models import Doctor, Patient
 
 User = get_user_model()
@@ -35,3 +51,101 @@ class PatientSerializer(serializers.ModelSerializer):
     class Meta:
         model = Patient
         fields = ('id', 'user', 'phone', 'email')
+
+
+class DoctorWithClinicsSerializer(DoctorSerializer):
+    """Сериализатор врача вместе со списком его клиник."""
+
+    clinics = ClinicSerializer(many=True, read_only=True)
+
+    class Meta(DoctorSerializer.Meta):
+        fields = DoctorSerializer.Meta.fields + ('clinics',)
+
+
+class ClinicWithDoctorsSerializer(ClinicSerializer):
+    """Сериализатор клиники вместе со списком её врачей."""
+
+    doctors = DoctorSerializer(
+        source='clinic_doctors', many=True, read_only=True
+    )
+
+    class Meta(ClinicSerializer.Meta):
+        fields = ClinicSerializer.Meta.fields + ('doctors',)
+
+
+class AvailabilityQuerySerializer(serializers.Serializer):
+    """Параметры запроса свободных слотов врача."""
+
+    max_range = timedelta(days=31)
+    default_range = timedelta(days=7)
+
+    @staticmethod
+    def default_start():
+        """
+        Начало следующей минуты: период по умолчанию совпадает у всех
+        запросов в пределах минуты, и они попадают в один ключ кэша.
+        """
+
+        now = timezone.now()
+        return now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+
+    def get_fields(self):
+        # «from» — зарезервированное слово, поэтому поля объявлены здесь.
+        return {
+            'from': serializers.DateTimeField(required=False),
+            'to': serializers.DateTimeField(required=False),
+            'duration': serializers.IntegerField(
+                required=False, default=30, min_value=5, max_value=480
+            ),
+        }
+
+    def validate(self, data):
+        start = data.get('from') or self.default_start()
+        end = data.get('to') or start + self.default_range
+
+        if start >= end:
+            raise serializers.ValidationError(
+                'Начало периода должно быть раньше его окончания.'
+            )
+        if end - start > self.max_range:
+            raise serializers.ValidationError(
+                'Период не может быть длиннее 31 дня.'
+            )
+
+        return {
+            'start': start,
+            'end': end,
+            'duration': timedelta(minutes=data['duration']),
+        }
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Выдаёт токены с ролью и профилями пользователя в claims."""
+
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(super().get_token(user), user)
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Обновление токена с проверкой, что он не отозван."""
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        if VERSION_CLAIM not in refresh:
+            # Токены, выданные до появления версии, проверяются
+            # как access-токены старого формата — по пользователю.
+            user_id = refresh.get(api_settings.USER_ID_CLAIM)
+            user = User.objects.filter(
+                **{api_settings.USER_ID_FIELD: user_id}
+            ).first()
+            if user is None or not user.is_active:
+                raise AuthenticationFailed(
+                    self.error_messages['no_active_account'],
+                    code='no_active_account',
+                )
+        elif not is_token_current(refresh):
+            raise AuthenticationFailed(
+                TOKEN_REVOKED_MESSAGE, code='token_revoked'
+            )
+        return super().validate(attrs)
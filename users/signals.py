@@ -0,0 +1,43 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import revoke_cached_token_version, store_token_version
+from .models import CustomUser, Doctor, Patient
+
+
+@receiver(post_save, sender=CustomUser)
+def update_token_version(sender, instance, **kwargs):
+    """Обновляет версию токенов пользователя в кэше."""
+
+    store_token_version(instance)
+
+
+@receiver(post_delete, sender=CustomUser)
+def revoke_deleted_user_tokens(sender, instance, **kwargs):
+    """Отзывает токены удалённого пользователя."""
+
+    revoke_cached_token_version(instance.pk)
+
+
+@receiver(post_save, sender=Doctor)
+@receiver(post_save, sender=Patient)
+def revoke_tokens_on_profile_created(sender, instance, created, **kwargs):
+    """
+    Токены содержат идентификаторы профилей, поэтому появление
+    профиля отзывает ранее выданные токены.
+    """
+
+    if created:
+        instance.user.revoke_tokens()
+
+
+@receiver(post_delete, sender=Doctor)
+@receiver(post_delete, sender=Patient)
+def revoke_tokens_on_profile_deleted(sender, instance, **kwargs):
+    """Отзывает токены при удалении профиля врача или пациента."""
+
+    try:
+        user = CustomUser.objects.get(pk=instance.user_id)
+    except CustomUser.DoesNotExist:
+        return
+    user.revoke_tokens()
@@ -0,0 +1,14 @@
+from django.urls import include, path
+from rest_framework.routers import SimpleRouter
+
+from .views import DoctorViewSet, PatientViewSet
+
+app_name = 'users'
+
+v1_router = SimpleRouter()
+v1_router.register('doctors', DoctorViewSet, basename='doctors')
+v1_router.register('patients', PatientViewSet, basename='patients')
+
+urlpatterns = [
+    path('v1/', include(v1_router.urls)),
+]
@@ -0,0 +1,155 @@
+import io
+
+from django.conf import settings
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import mixins, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+
+from consultations.availability import (
+    get_availability,
+    get_cached_availability,
+)
+from consultations.permissions import IsAdmin, IsAdminOrDoctor
+from medical_service.replicas import ReplicaReadMixin
+
+from .facets import doctor_facets
+from .filters import DoctorFilter, PatientFilter
+from .imports import ImportFormatError, PatientImport
+from .models import Doctor, Patient
+from .pagination import DirectoryPagination
+from .serializers import (
+    AvailabilityQuerySerializer,
+    DoctorWithClinicsSerializer,
+    PatientSerializer,
+)
+
+
+class DoctorViewSet(
+    ReplicaReadMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    ViewSet для врачей: справочник с фильтрами по специализации
+    и клинике и свободные слоты врача.
+    """
+
+    queryset = Doctor.objects.all()
+    serializer_class = DoctorWithClinicsSerializer
+    pagination_class = DirectoryPagination
+    filter_backends = (DjangoFilterBackend,)
+    filterset_class = DoctorFilter
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.select_related('user').prefetch_related(
+                'clinics'
+            )
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        """
+        Страница врачей и, на первой странице, фасеты — число врачей
+        по специализациям и клиникам с учётом фильтров.
+        """
+
+        queryset = self.filter_queryset(self.get_queryset())
+        # Страница и фасеты читаются из одной базы данных.
+        queryset = queryset.using(queryset.db)
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        response = self.get_paginated_response(serializer.data)
+
+        # Фасеты не зависят от страницы: клиент получает их с первой.
+        if request.query_params.get(self.paginator.cursor_query_param):
+            return response
+        filterset = DoctorFilter(request.query_params)
+        # Параметры уже проверены при фильтрации выборки.
+        filterset.is_valid()
+        filters = filterset.form.cleaned_data
+        response.data['facets'] = doctor_facets(
+            specialization=filters.get('specialization') or None,
+            clinic_id=filters.get('clinic'),
+            using=queryset.db,
+        )
+        return response
+
+    @action(detail=True, methods=['get'])
+    def availability(self, request, pk=None):
+        """
+        Свободные слоты врача в периоде ``from``–``to``
+        длительностью ``duration`` минут.
+        """
+
+        serializer = AvailabilityQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        # Закэшированный ответ отдаётся без обращения к базе данных.
+        if pk is not None and pk.isdigit():
+            data = get_cached_availability(int(pk), **params)
+            if data is not None:
+                return Response(data)
+
+        doctor = self.get_object()
+        return Response(get_availability(doctor.pk, **params))
+
+
+class PatientViewSet(
+    ReplicaReadMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Справочник пациентов для администраторов и врачей с точным
+    поиском по телефону и e-mail.
+    """
+
+    queryset = Patient.objects.select_related('user')
+    serializer_class = PatientSerializer
+    pagination_class = DirectoryPagination
+    permission_classes = (IsAdminOrDoctor,)
+    filter_backends = (DjangoFilterBackend,)
+    filterset_class = PatientFilter
+
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='import',
+        url_name='import',
+        permission_classes=[IsAdmin],
+        parser_classes=[MultiPartParser],
+    )
+    def import_patients(self, request):
+        """
+        Импорт пациентов из CSV-файла в поле ``file``. Возвращает
+        число созданных пациентов и отклонённые строки с причинами.
+        """
+
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': 'Файл не передан.'})
+
+        patient_import = PatientImport(
+            workers=settings.PATIENT_IMPORT_WORKERS
+        )
+        stream = io.TextIOWrapper(
+            upload.file, encoding='utf-8-sig', newline=''
+        )
+        try:
+            patient_import.run(stream)
+        except (ImportFormatError, UnicodeDecodeError) as error:
+            raise ValidationError({'file': str(error)})
+        return Response(
+            {
+                'created': patient_import.created,
+                'rejected': len(patient_import.rejects),
+                'rejects': patient_import.rejects,
+            }
+        )